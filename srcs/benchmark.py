@@ -0,0 +1,341 @@
+from modules.parser import int_range, float_range, validate_extention
+from modules.environment import Board, BoardElements, MoveTo
+from modules.batch_environment import BatchBoard
+from modules.gym_env import make_vector_env
+from modules.agent import QLearningAgent
+from modules.tabular_agent import TabularQAgent
+from modules.replay_buffer import ReplayBuffer
+
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import numpy as np
+
+import torch
+
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+BOARD_SIZES = [10, 20, 40]
+SNAKE_FILL = [25, 50]  # percent of the board covered by the longer snakes
+BATCH_SIZES = [32, 256]
+NUM_ENVS = [16]
+
+
+def hamiltonian_cycle(board_size: int) -> list:
+    """
+    Closed path through every cell of an even sized board:
+    right along row 0, zigzag through columns 1.. on the other rows, back up column 0.
+    A snake laid on the cycle and moved along it never collides.
+    """
+    if board_size % 2 != 0:
+        raise ValueError(f"Error: Board size must be even: {board_size}")
+
+    cycle = [(0, x) for x in range(board_size)]
+    for y in range(1, board_size):
+        columns = range(board_size - 1, 0, -1) if y % 2 == 1 else range(1, board_size)
+        cycle.extend((y, x) for x in columns)
+    cycle.extend((y, 0) for y in range(board_size - 1, 0, -1))
+    return cycle
+
+
+class CycleWalker:
+    """
+    Board whose snake follows the hamiltonian cycle, so step() can be timed
+    for a long time without the game ending.
+    There are no apples, so the snake keeps its length.
+    """
+    def __init__(self, board_size: int, snake_len: int, seed=0):
+        cycle = hamiltonian_cycle(board_size)
+        self.board = Board(board_size=board_size, seed=seed)
+        self.board.green_apples = []
+        self.board.red_apples = []
+        self.board.snake = deque(reversed(cycle[:snake_len]))  # head first
+
+        self.moves = {}
+        for current, following in zip(cycle, cycle[1:] + cycle[:1]):
+            direction = (following[0] - current[0], following[1] - current[1])
+            self.moves[current] = next(to for to in MoveTo if to.direction == direction)
+
+    def step(self):
+        return self.board.step(self.moves[self.board.snake[0]])
+
+
+def _snake_lengths(board_size: int) -> list:
+    cells = board_size * board_size
+    return [3] + [cells * percent // 100 for percent in SNAKE_FILL]
+
+
+def measure(func, min_time: float, repeat: int) -> dict:
+    """
+    Call func() in a loop of `number` calls, `repeat` times.
+    `number` is calibrated so that one loop lasts at least `min_time` seconds.
+    return seconds per call of the loops
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if min_time <= elapsed:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    timings = np.array(timings)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min": float(timings.min()),
+        "median": float(np.median(timings)),
+        "mean": float(timings.mean()),
+        "std": float(timings.std()),
+        "ops_per_sec": float(1.0 / np.median(timings)),
+    }
+
+
+def bench_board_reset(board_size):
+    board = Board(board_size=board_size, seed=0)
+    return board.reset
+
+
+def bench_board_step(board_size, snake_len):
+    return CycleWalker(board_size, snake_len).step
+
+
+def bench_encode_state(board_size, snake_len):
+    return CycleWalker(board_size, snake_len).board._encode_state
+
+
+def bench_put_apple(board_size, snake_len):
+    board = CycleWalker(board_size, snake_len).board
+
+    def put_and_remove():
+        board._put_apple(BoardElements.GREEN_APPLE)
+        board._set_cell(board.green_apples.pop(), BoardElements.EMPTY.code)
+
+    return put_and_remove
+
+
+def bench_get_action(fused_inference=False):
+    agent = QLearningAgent(seed=0, fused_inference=fused_inference)
+    agent.epsilon = agent.epsilon_min = 0.0  # always the forward pass
+    state = Board(seed=0).reset()
+    return lambda: agent.get_action(state)
+
+
+def bench_get_actions(num_envs, fused_inference=False):
+    agent = QLearningAgent(seed=0, fused_inference=fused_inference)
+    agent.epsilon = agent.epsilon_min = 0.0
+    states = BatchBoard(num_envs=num_envs, seed=0).reset()
+    return lambda: agent.get_actions(states)
+
+
+def bench_update():
+    agent = QLearningAgent(seed=0)
+    board = Board(seed=0)
+    state = board.reset()
+    next_state, reward, done = board.step(MoveTo.UP)
+    return lambda: agent.update(state, MoveTo.UP.id, reward, next_state, done)
+
+
+def bench_tabular_get_action():
+    agent = TabularQAgent(seed=0)
+    agent.epsilon = agent.epsilon_min = 0.0  # always the table lookup
+    state = Board(seed=0).reset()
+    return lambda: agent.get_action(state)
+
+
+def bench_tabular_update():
+    agent = TabularQAgent(seed=0)
+    board = Board(seed=0)
+    state = board.reset()
+    next_state, reward, done = board.step(MoveTo.UP)
+    return lambda: agent.update(state, MoveTo.UP.id, reward, next_state, done)
+
+
+def bench_update_batch(batch_size):
+    agent = QLearningAgent(seed=0)
+    buffer = ReplayBuffer(capacity=batch_size, seed=0)
+    rng = np.random.default_rng(0)
+    buffer.add_batch(
+        rng.random((batch_size, 16), dtype=np.float32),
+        rng.integers(0, 4, size=batch_size),
+        rng.random(batch_size, dtype=np.float32),
+        rng.random((batch_size, 16), dtype=np.float32),
+        np.zeros(batch_size, dtype=bool),
+    )
+    batch = buffer.sample(batch_size)
+    return lambda: agent.update_batch(*batch)
+
+
+def bench_gym_vector_step(num_envs):
+    """
+    Gymnasium SyncVectorEnv of SnakeEnv, one call steps every env
+    """
+    envs = make_vector_env(num_envs)
+    envs.reset(seed=0)
+    rng = np.random.default_rng(0)
+    return lambda: envs.step(rng.integers(0, 4, size=num_envs))
+
+
+def bench_batch_board_step(num_envs):
+    board = BatchBoard(num_envs=num_envs, seed=0)
+    rng = np.random.default_rng(0)
+    return lambda: board.step(rng.integers(0, 4, size=num_envs))
+
+
+def cases(board_sizes: list) -> list:
+    """
+    return (name, params, factory) of every benchmark
+    factory() returns the function to time
+    """
+    result = []
+    for board_size in board_sizes:
+        result.append(("board_reset", {"board_size": board_size},
+                       lambda b=board_size: bench_board_reset(b)))
+        for snake_len in _snake_lengths(board_size):
+            params = {"board_size": board_size, "snake_len": snake_len}
+            result.append(("board_step", params,
+                           lambda b=board_size, s=snake_len: bench_board_step(b, s)))
+            result.append(("encode_state", params,
+                           lambda b=board_size, s=snake_len: bench_encode_state(b, s)))
+            result.append(("put_apple", params,
+                           lambda b=board_size, s=snake_len: bench_put_apple(b, s)))
+    result.append(("get_action", {}, bench_get_action))
+    result.append(("get_action_fused", {}, lambda: bench_get_action(fused_inference=True)))
+    result.append(("update", {}, bench_update))
+    result.append(("tabular_get_action", {}, bench_tabular_get_action))
+    result.append(("tabular_update", {}, bench_tabular_update))
+    for batch_size in BATCH_SIZES:
+        result.append(("update_batch", {"batch_size": batch_size},
+                       lambda b=batch_size: bench_update_batch(b)))
+    for num_envs in NUM_ENVS:
+        result.append(("gym_vector_step", {"num_envs": num_envs},
+                       lambda n=num_envs: bench_gym_vector_step(n)))
+        result.append(("batch_board_step", {"num_envs": num_envs},
+                       lambda n=num_envs: bench_batch_board_step(n)))
+        result.append(("get_actions", {"num_envs": num_envs},
+                       lambda n=num_envs: bench_get_actions(n)))
+        result.append(("get_actions_fused", {"num_envs": num_envs},
+                       lambda n=num_envs: bench_get_actions(n, fused_inference=True)))
+    return result
+
+
+def case_id(name: str, params: dict) -> str:
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def run(board_sizes=None, min_time=0.2, repeat=5, pattern=None) -> dict:
+    """
+    Run every benchmark whose id contains `pattern`
+    return {"environment": .., "results": [{"id", "name", "params", timings..}]}
+    """
+    torch.manual_seed(0)
+    results = []
+    for name, params, factory in cases(board_sizes or BOARD_SIZES):
+        bench_id = case_id(name, params)
+        if pattern is not None and pattern not in bench_id:
+            continue
+        timings = measure(factory(), min_time=min_time, repeat=repeat)
+        results.append({"id": bench_id, "name": name, "params": params, **timings})
+    return {"environment": environment(), "results": results}
+
+
+def print_results(report: dict, baseline: dict = None):
+    """
+    One line per benchmark; with a baseline, the speedup of the median (>1: faster)
+    """
+    before = {} if baseline is None else {r["id"]: r for r in baseline["results"]}
+    print(f"{'benchmark':55} {'median':>12} {'ops/s':>12}" + (" speedup" if before else ""))
+    for result in report["results"]:
+        line = (f"{result['id']:55} {result['median'] * 1e6:10.2f}us "
+                f"{result['ops_per_sec']:12.0f}")
+        if result["id"] in before:
+            line += f" {before[result['id']]['median'] / result['median']:7.2f}x"
+        print(line)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Snake benchmarks"
+    )
+    parser.add_argument(
+        "-output",
+        type=validate_extention([".json"]),
+        help="Write the results to a JSON file"
+    )
+    parser.add_argument(
+        "-compare",
+        type=validate_extention([".json"]),
+        help="JSON results of an earlier run to compare against"
+    )
+    parser.add_argument(
+        "-filter",
+        type=str,
+        help="Only run the benchmarks whose id contains this string"
+    )
+    parser.add_argument(
+        "-repeat",
+        type=int_range(1, 1000),
+        default=5,
+        help="Number of timed loops per benchmark"
+    )
+    parser.add_argument(
+        "-min_time",
+        type=float_range(0.001, 60.0),
+        default=0.2,
+        help="Minimum duration of one timed loop in seconds"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = run(min_time=args.min_time, repeat=args.repeat, pattern=args.filter)
+    print_results(report, baseline)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,207 @@
+import copy
+import numpy as np
+import queue
+
+import torch
+import torch.multiprocessing as mp
+
+from .agent import QLearningAgent
+from .environment import Board, MoveTo
+from .replay_buffer import ReplayBuffer
+
+
+def _put(transitions: mp.Queue, message, stop):
+    while not stop.is_set():
+        try:
+            transitions.put(message, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _actor(
+        seed, shared_qnet, weights_lock, weights_version, transitions, stop, chunk_size,
+        env_options, agent_options
+):
+    """
+    Actor process: play with a local copy of the shared QNet and
+    send every `chunk_size` transitions to the learner
+    message: (states, actions, rewards, next_states, dones, finished episodes)
+    finished episode: (snake length, total reward, steps)
+    """
+    torch.set_num_threads(1)
+
+    env_seed, agent_seed = seed.spawn(2)
+    env = Board(seed=env_seed, **env_options)
+    # actors only act: greedy actions come from a NumPy snapshot of the weights
+    agent = QLearningAgent(seed=agent_seed, **{**agent_options, "fused_inference": True})
+    local_version = -1
+
+    state = env.reset()
+    total_reward = 0
+    itr = 0
+    while not stop.is_set():
+        if weights_version.value != local_version:
+            with weights_lock:
+                agent.qnet.load_state_dict(shared_qnet.state_dict())
+                agent.weights_changed()
+                local_version = weights_version.value
+
+        states = np.zeros((chunk_size, agent.state_features), dtype=np.float32)
+        actions = np.zeros(chunk_size, dtype=np.int64)
+        rewards = np.zeros(chunk_size, dtype=np.float32)
+        next_states = np.zeros((chunk_size, agent.state_features), dtype=np.float32)
+        dones = np.zeros(chunk_size, dtype=bool)
+        episodes = []
+
+        for i in range(chunk_size):
+            action = agent.get_action(state)
+            next_state, reward, done = env.step(MoveTo.from_id(action))
+
+            states[i] = state
+            actions[i] = action
+            rewards[i] = reward
+            next_states[i] = next_state
+            dones[i] = env.terminated  # a truncated episode still has a future
+
+            total_reward += reward
+            itr += 1
+            state = next_state
+            if done:
+                episodes.append((len(env.snake), total_reward, itr))
+                state = env.reset()
+                total_reward = 0
+                itr = 0
+
+        _put(transitions, (states, actions, rewards, next_states, dones, episodes), stop)
+
+
+class ActorLearner:
+    """
+    Multi-process training:
+      actors  : `workers` processes, each playing its own Board with a copy of the QNet
+      learner : this process, training `agent` from a replay buffer filled by the actors
+    The learner publishes its weights to the actors every `sync_interval` updates.
+    """
+    def __init__(
+            self,
+            agent: QLearningAgent,
+            workers: int,
+            batch_size=64,
+            buffer_size=100000,
+            chunk_size=64,
+            updates_per_chunk=1,
+            sync_interval=10,
+            seed=None,
+            env_options=None,
+            agent_options=None,
+    ):
+        if workers <= 0:
+            raise ValueError(f"Error: workers must be positive: {workers}")
+
+        self.agent = agent
+        self.workers = workers
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.updates_per_chunk = updates_per_chunk
+        self.sync_interval = sync_interval
+        self.env_options = dict(env_options or {})  # extra Board arguments of the actors
+        # QLearningAgent arguments of the actors, their QNet must match the learner's
+        self.agent_options = dict(agent_options or {})
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        buffer_seed, actors_seed = seed.spawn(2)
+        self.buffer = ReplayBuffer(
+            capacity=buffer_size, state_features=agent.state_features, seed=buffer_seed
+        )
+        self._actor_seeds = actors_seed.spawn(workers)
+
+        self.num_steps = 0
+        self.num_updates = 0
+        self.last_loss = 0.0
+
+        self._processes = []
+
+    def _start(self):
+        ctx = mp.get_context("spawn")
+        self._shared_qnet = copy.deepcopy(self.agent.qnet)
+        self._shared_qnet.share_memory()
+
+        self._weights_lock = ctx.Lock()
+        self._weights_version = ctx.Value("l", 0)
+        self._transitions = ctx.Queue(maxsize=4 * self.workers)
+        self._stop = ctx.Event()
+
+        self._processes = [
+            ctx.Process(
+                target=_actor,
+                args=(
+                    seed,
+                    self._shared_qnet,
+                    self._weights_lock,
+                    self._weights_version,
+                    self._transitions,
+                    self._stop,
+                    self.chunk_size,
+                    self.env_options,
+                    self.agent_options,
+                ),
+                daemon=True,
+            )
+            for seed in self._actor_seeds
+        ]
+        for process in self._processes:
+            process.start()
+
+    def _publish_weights(self):
+        with self._weights_lock:
+            self._shared_qnet.load_state_dict(self.agent.qnet.state_dict())
+            self._weights_version.value += 1
+
+    def _receive(self):
+        while True:
+            try:
+                return self._transitions.get(timeout=1.0)
+            except queue.Empty:
+                if any(p.exitcode not in (None, 0) for p in self._processes):
+                    raise RuntimeError("Error: An actor process died")
+
+    def _shutdown(self):
+        self._stop.set()
+        # drain so that no actor stays blocked on a full queue
+        while any(p.is_alive() for p in self._processes):
+            try:
+                self._transitions.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def run(self, episodes: int):
+        """
+        Train until the actors have finished `episodes` episodes
+        yield (snake length, total reward, steps) of each finished episode
+        """
+        self._start()
+        try:
+            finished = 0
+            while finished < episodes:
+                states, actions, rewards, next_states, dones, stats = self._receive()
+                self.buffer.add_batch(states, actions, rewards, next_states, dones)
+                self.num_steps += len(actions)
+
+                if self.batch_size <= len(self.buffer):
+                    for _ in range(self.updates_per_chunk):
+                        batch = self.buffer.sample(self.batch_size)
+                        self.last_loss, _ = self.agent.update_batch(*batch)
+                        self.num_updates += 1
+                        if self.num_updates % self.sync_interval == 0:
+                            self._publish_weights()
+
+                for stat in stats[:episodes - finished]:
+                    finished += 1
+                    yield stat
+        finally:
+            self._shutdown()
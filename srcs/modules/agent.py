@@ -1,58 +1,243 @@
+import copy
 import numpy as np
 
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
+from .profiler import PhaseTimer
+
 
 class QNet(nn.Module):
-    def __init__(self, in_dim: int, out_dim: int = 4):
+    """
+    MLP with ReLU between the layers, named l1 .. lN
+    hidden_sizes: widths of the hidden layers
+    """
+    def __init__(self, in_dim: int, out_dim: int = 4, hidden_sizes=(100, 16)):
         super().__init__()
-        self.l1 = nn.Linear(in_features=in_dim, out_features=100)
-        self.l2 = nn.Linear(in_features=100, out_features=16)
-        self.l3 = nn.Linear(in_features=16, out_features=out_dim)
+        if len(hidden_sizes) == 0 or any(size <= 0 for size in hidden_sizes):
+            raise ValueError(f"Error: Invalid hidden sizes: {hidden_sizes}")
+
+        self.hidden_sizes = tuple(hidden_sizes)
+        sizes = [in_dim, *hidden_sizes, out_dim]
+        self.layers = []
+        for i, (in_features, out_features) in enumerate(zip(sizes, sizes[1:])):
+            layer = nn.Linear(in_features=in_features, out_features=out_features)
+            self.add_module(f"l{i + 1}", layer)
+            self.layers.append(layer)
 
         self._initialize_weights()
 
     def _initialize_weights(self):
-        for layer in [self.l1, self.l2, self.l3]:
+        for layer in self.layers:
             if isinstance(layer, nn.Linear):
                 nn.init.xavier_uniform_(layer.weight)
                 # nn.init.kaiming_normal_(layer.weight, nonlinearity='relu')
                 nn.init.zeros_(layer.bias)
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        x = torch.relu(self.l1(x))
-        x = torch.relu(self.l2(x))
-        x = self.l3(x)
+        for layer in self.layers[:-1]:
+            x = torch.relu(layer(x))
+        x = self.layers[-1](x)
+        return x
+
+
+class FusedQNet:
+    """
+    NumPy snapshot of a QNet for inference: per layer one matmul into a preallocated
+    buffer, a bias add and an in-place ReLU, no autograd and no torch dispatch.
+    Weights are stored transposed and contiguous; refresh() copies the QNet again.
+    """
+    def __init__(self, qnet: QNet):
+        self.weights = [
+            np.ascontiguousarray(layer.weight.detach().numpy().T) for layer in qnet.layers
+        ]
+        self.biases = [layer.bias.detach().numpy().copy() for layer in qnet.layers]
+        self._batch_size = 0
+        self._buffers = []
+
+    def refresh(self, qnet: QNet):
+        for weight, bias, layer in zip(self.weights, self.biases, qnet.layers):
+            np.copyto(weight, layer.weight.detach().numpy().T)
+            np.copyto(bias, layer.bias.detach().numpy())
+
+    def forward(self, states: np.ndarray) -> np.ndarray:
+        """
+        states: (batch, in_dim) float32
+        return (batch, out_dim) Q values, overwritten by the next call
+        """
+        if len(states) != self._batch_size:
+            self._batch_size = len(states)
+            self._buffers = [
+                np.empty((self._batch_size, weight.shape[1]), dtype=np.float32)
+                for weight in self.weights
+            ]
+
+        x = states
+        for weight, bias, out in zip(self.weights, self.biases, self._buffers):
+            np.matmul(x, weight, out=out)
+            out += bias
+            if out is not self._buffers[-1]:
+                np.maximum(out, 0.0, out=out)
+            x = out
         return x
 
+    def argmax(self, states: np.ndarray) -> np.ndarray:
+        return self.forward(states).argmax(axis=1)
+
 
 class QLearningAgent:
-    def __init__(self):
-        self.gamma = 0.9
-        self.lr = 0.01
+    def __init__(
+            self,
+            seed=None,
+            target_update=0,
+            tau=0.0,
+            double_dqn=False,
+            gamma=0.9,
+            lr=0.01,
+            epsilon=0.1,
+            epsilon_min=0.01,
+            epsilon_decay=0.995,
+            hidden_sizes=(100, 16),
+            fused_inference=False,
+    ):
+        """
+        target_update: hard-sync a frozen target network every N updates (0: no hard sync)
+        tau          : Polyak factor of a soft target update after every update
+                       (0: off, takes precedence over target_update)
+        double_dqn   : the online network chooses the next action, the target network rates it
+        epsilon      : initial exploration rate, multiplied by epsilon_decay per action
+                       down to epsilon_min
+        hidden_sizes : widths of the QNet hidden layers
+        fused_inference: choose greedy actions with a FusedQNet snapshot of the QNet,
+                         refreshed on the first action after the weights change
+        """
+        if target_update < 0:
+            raise ValueError(f"Error: target_update must be >= 0: {target_update}")
+        if not 0.0 <= tau <= 1.0:
+            raise ValueError(f"Error: tau must be in [0, 1]: {tau}")
+        if not 0.0 <= gamma <= 1.0:
+            raise ValueError(f"Error: gamma must be in [0, 1]: {gamma}")
+        if lr <= 0.0:
+            raise ValueError(f"Error: lr must be positive: {lr}")
+        if not 0.0 <= epsilon_min <= epsilon <= 1.0:
+            raise ValueError(f"Error: Need 0 <= epsilon_min <= epsilon <= 1: "
+                             f"{epsilon_min}, {epsilon}")
+        if not 0.0 < epsilon_decay <= 1.0:
+            raise ValueError(f"Error: epsilon_decay must be in (0, 1]: {epsilon_decay}")
+
+        self.gamma = gamma
+        self.lr = lr
 
-        self.epsilon = 0.1
-        self.epsilon_min = 0.01
-        self.epsilon_decay = 0.995
+        self.epsilon = epsilon
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+        self.hidden_sizes = tuple(hidden_sizes)
 
         self.action_size = 4
         self.state_features = 16
 
-        self.qnet = QNet(in_dim=self.state_features, out_dim=self.action_size)
+        self.rng = np.random.default_rng(seed)
+        # phases: action_selection, forward, backward, optimizer
+        self.timer = PhaseTimer(enabled=False)
+
+        # weights are initialized from the agent's own seed, not the global torch state
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(int(self.rng.integers(2 ** 63)))
+            self.qnet = QNet(
+                in_dim=self.state_features, out_dim=self.action_size, hidden_sizes=hidden_sizes
+            )
         self.optimizer = optim.Adam(self.qnet.parameters(), lr=self.lr)
+
+        self.fused_qnet = FusedQNet(self.qnet) if fused_inference else None
+        self._weights_version = 0
+        self._fused_version = 0
+
+        self.target_update = target_update
+        self.tau = tau
+        self.double_dqn = double_dqn
+        self.num_updates = 0
+        self.target_qnet = None
+        if target_update > 0 or tau > 0.0:
+            self.target_qnet = copy.deepcopy(self.qnet)
+            self.target_qnet.requires_grad_(False)
         self.criterion = nn.MSELoss()
         # self.criterion = nn.SmoothL1Loss()
 
     def get_action(self, state: np.ndarray) -> int:
-        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
-        if np.random.rand() < self.epsilon:
-            return np.random.choice(self.action_size)
-        else:
-            with torch.no_grad():
-                qs = self.qnet(torch.tensor(state, dtype=torch.float32))
-                return torch.argmax(qs).item()
+        with self.timer.phase("action_selection"):
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+            if self.rng.random() < self.epsilon:
+                return int(self.rng.integers(self.action_size))
+            elif self.fused_qnet is not None:
+                state = np.asarray(state, dtype=np.float32).reshape(1, self.state_features)
+                return int(self._fused().argmax(state)[0])
+            else:
+                with torch.no_grad():
+                    qs = self.qnet(torch.from_numpy(np.asarray(state, dtype=np.float32)))
+                    return torch.argmax(qs).item()
+
+    def get_actions(self, states: np.ndarray) -> np.ndarray:
+        """
+        Epsilon-greedy actions for a batch of states (batch, state_features)
+        with one forward pass; epsilon decays once per action as in get_action
+        return (batch,) action ids
+        """
+        with self.timer.phase("action_selection"):
+            states = np.asarray(states, dtype=np.float32).reshape(-1, self.state_features)
+            num = len(states)
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay ** num)
+
+            explore = self.rng.random(num) < self.epsilon
+            actions = self.rng.integers(self.action_size, size=num)
+            if explore.all():
+                return actions
+
+            if self.fused_qnet is not None:
+                greedy = self._fused().argmax(states)
+            else:
+                with torch.no_grad():
+                    greedy = self.qnet(torch.from_numpy(states)).argmax(dim=1).numpy()
+            return np.where(explore, actions, greedy)
+
+    def q_values(self, state: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            state = np.asarray(state, dtype=np.float32).reshape(1, self.state_features)
+            return self.qnet(torch.from_numpy(state))[0].numpy()
+
+    def fit_q_values(self, states: np.ndarray, targets: np.ndarray, epochs=20, batch_size=256):
+        """
+        Regress the QNet on known Q values (batch, action_size), e.g. to warm-start it
+        return the mean loss of the last epoch
+        """
+        states = torch.as_tensor(np.asarray(states, dtype=np.float32))
+        targets = torch.as_tensor(np.asarray(targets, dtype=np.float32))
+        total_loss = 0.0
+        for _ in range(epochs):
+            total_loss = 0.0
+            order = torch.from_numpy(self.rng.permutation(len(states)))
+            for batch in order.split(batch_size):
+                loss = self.criterion(self.qnet(states[batch]), targets[batch])
+                self.optimizer.zero_grad()
+                loss.backward()
+                self.optimizer.step()
+                total_loss += loss.item() * len(batch)
+        self.weights_changed()
+        if self.target_qnet is not None:
+            self.target_qnet.load_state_dict(self.qnet.state_dict())
+        return total_loss / len(states)
+
+    def weights_changed(self):
+        """
+        Tell the agent its QNet was modified from outside (e.g. loaded from shared weights)
+        """
+        self._weights_version += 1
+
+    def _fused(self) -> FusedQNet:
+        if self._fused_version != self._weights_version:
+            self.fused_qnet.refresh(self.qnet)
+            self._fused_version = self._weights_version
+        return self.fused_qnet
 
     def update(
             self,
@@ -62,29 +247,107 @@ class QLearningAgent:
             next_state: np.ndarray,
             done: bool
     ):
-        state = torch.tensor(state, dtype=torch.float32)
-        next_state = torch.tensor(next_state, dtype=torch.float32)
-        reward = torch.tensor(reward, dtype=torch.float32)
+        loss, _ = self.update_batch(state, action, reward, next_state, done)
+        return loss
+
+    def update_batch(
+            self,
+            states: np.ndarray,
+            actions: np.ndarray,
+            rewards: np.ndarray,
+            next_states: np.ndarray,
+            dones: np.ndarray
+    ):
+        """
+        One optimizer step on a minibatch of stacked transitions
+          states, next_states: (batch, state_features)
+          actions, rewards, dones: (batch,)
+        return loss, td_errors (batch,)
+        """
+        with self.timer.phase("forward"):
+            states = torch.as_tensor(np.asarray(states, dtype=np.float32))
+            states = states.reshape(-1, self.state_features)
+            next_states = torch.as_tensor(np.asarray(next_states, dtype=np.float32))
+            next_states = next_states.reshape(-1, self.state_features)
+            actions = torch.as_tensor(np.asarray(actions, dtype=np.int64)).reshape(-1, 1)
+            rewards = torch.as_tensor(np.asarray(rewards, dtype=np.float32)).reshape(-1)
+            dones = torch.as_tensor(np.asarray(dones, dtype=np.float32)).reshape(-1)
 
-        if done:
-            next_q = torch.tensor(0.0)
-        else:
             with torch.no_grad():
-                next_q = self.qnet(next_state).max()
+                next_q = self._bootstrap_q(next_states) * (1.0 - dones)
+            targets = rewards + self.gamma * next_q
 
-        target = reward + self.gamma * next_q
-        qs = self.qnet(state)  # (1, action_size)
-        q = qs.squeeze(0)[action]  # (1, 4) -> 1次元(4,)
+            qs = self.qnet(states)  # (batch, action_size)
+            q = qs.gather(1, actions).squeeze(1)  # (batch,)
 
-        loss = self.criterion(q, target)
+            loss = self.criterion(q, targets)
 
         # loss = torch.clamp(loss, min=-1.0, max=1.0)
-        self.optimizer.zero_grad()
-        loss.backward()
-        # torch.nn.utils.clip_grad_norm_(self.qnet.parameters(), max_norm=1.0)
+        with self.timer.phase("backward"):
+            self.optimizer.zero_grad()
+            loss.backward()
+            # torch.nn.utils.clip_grad_norm_(self.qnet.parameters(), max_norm=1.0)
 
-        self.optimizer.step()
-        return loss.item()
+        with self.timer.phase("optimizer"):
+            self.optimizer.step()
+            self.num_updates += 1
+            self._weights_version += 1
+            self._sync_target()
+
+        td_errors = (targets - q).detach().numpy()
+        return loss.item(), td_errors
+
+    def state_dict(self) -> dict:
+        """
+        Everything needed to resume training: weights, optimizer, epsilon, RNG and counters
+        """
+        state = {
+            "qnet": self.qnet.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "epsilon": self.epsilon,
+            "num_updates": self.num_updates,
+            "rng": self.rng.bit_generator.state,
+        }
+        if self.target_qnet is not None:
+            state["target_qnet"] = self.target_qnet.state_dict()
+        return state
+
+    def load_state_dict(self, state: dict):
+        self.qnet.load_state_dict(state["qnet"])
+        self.weights_changed()
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.epsilon = state["epsilon"]
+        self.num_updates = state["num_updates"]
+        self.rng.bit_generator.state = state["rng"]
+        if self.target_qnet is not None:
+            self.target_qnet.load_state_dict(state.get("target_qnet", state["qnet"]))
+
+    def _bootstrap_q(self, next_states: torch.Tensor) -> torch.Tensor:
+        """
+        max_a Q(s', a) from the target network (the online one if there is none),
+        or Q_target(s', argmax_a Q_online(s', a)) with double DQN
+        """
+        target_qnet = self.qnet if self.target_qnet is None else self.target_qnet
+        next_qs = target_qnet(next_states)
+        if not self.double_dqn:
+            return next_qs.max(dim=1).values
+
+        if target_qnet is self.qnet:
+            next_actions = next_qs.argmax(dim=1, keepdim=True)
+        else:
+            next_actions = self.qnet(next_states).argmax(dim=1, keepdim=True)
+        return next_qs.gather(1, next_actions).squeeze(1)
+
+    def _sync_target(self):
+        if self.target_qnet is None:
+            return
+
+        if self.tau > 0.0:
+            with torch.no_grad():
+                for target, online in zip(self.target_qnet.parameters(), self.qnet.parameters()):
+                    target.lerp_(online, self.tau)
+        elif self.num_updates % self.target_update == 0:
+            self.target_qnet.load_state_dict(self.qnet.state_dict())
 
 
 # from dezero import Model
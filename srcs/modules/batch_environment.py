@@ -0,0 +1,279 @@
+import numpy as np
+from collections import deque
+
+from .environment import (
+    BoardElements, NUM_DIRECTIONS, NUM_FEATURES, FEATURE_OF_CODE, STOPS_RAY,
+    neighbor_table, ray_cells, check_board_options
+)
+from .profiler import PhaseTimer
+
+
+EMPTY = BoardElements.EMPTY.code
+WALL = BoardElements.WALL.code
+SNAKE_HEAD = BoardElements.SNAKE_HEAD.code
+SNAKE_BODY = BoardElements.SNAKE_BODY.code
+GREEN_APPLE = BoardElements.GREEN_APPLE.code
+RED_APPLE = BoardElements.RED_APPLE.code
+
+
+class BatchBoard:
+    """
+    N snake games advanced in lockstep.
+
+    All boards live in one integer grid of shape (num_envs, cells + 1), where
+    the extra last cell is a wall sentinel. Each snake is a ring buffer of flat
+    cell indices with the head at `head_ptr`.
+    Finished games are reset automatically inside `step`.
+    Step limits work as in Board; `truncated` marks the games cut in the last step.
+    """
+    def __init__(
+            self,
+            num_envs=64,
+            board_size=10,
+            seed=None,
+            max_steps=None,
+            max_steps_without_eating=None,
+            num_green_apples=2,
+            num_red_apples=1,
+            reward_just_move=-1,
+            reward_eat_green_apple=50,
+            reward_eat_red_apple=-20,
+            reward_game_over=-100,
+    ):
+        check_board_options(
+            board_size, num_green_apples, num_red_apples, max_steps, max_steps_without_eating
+        )
+
+        self.num_envs = num_envs
+        self.board_size = board_size
+        self.max_steps = max_steps
+        self.max_steps_without_eating = max_steps_without_eating
+        self.SNAKE_INIT_BODY_LEN = 2
+        self.NUM_OF_GREEN_APPLES = num_green_apples
+        self.NUM_OF_RED_APPLES = num_red_apples
+
+        self.REWARD_JUST_MOVE = reward_just_move
+        self.REWARD_EAT_GREEN_APPLE = reward_eat_green_apple
+        self.REWARD_EAT_RED_APPLE = reward_eat_red_apple
+        self.REWARD_GAME_OVER = reward_game_over
+
+        self.rng = np.random.default_rng(seed)
+        self.timer = PhaseTimer(enabled=False)  # phases: env_step, encode_state
+
+        self.num_cells = board_size * board_size
+        self._envs = np.arange(num_envs)
+        self._neighbors = neighbor_table(board_size)
+
+        self.grid = np.full((num_envs, self.num_cells + 1), EMPTY, dtype=np.int8)
+        self.grid[:, self.num_cells] = WALL
+        self.body = np.zeros((num_envs, self.num_cells), dtype=np.int64)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.lengths = np.zeros(num_envs, dtype=np.int64)
+        self.directions = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.steps_without_eating = np.zeros(num_envs, dtype=np.int64)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+        # snake length / steps / last state of the episodes that ended in the last step:
+        # step() returns the first state of the next episode for those boards
+        self.final_lengths = np.zeros(num_envs, dtype=np.int64)
+        self.final_steps = np.zeros(num_envs, dtype=np.int64)
+        self.final_states = np.zeros((num_envs, NUM_DIRECTIONS * NUM_FEATURES), dtype=np.float32)
+
+        self.reset()
+
+    def reset(self, seed=None):
+        """
+        seed: reseed the random generator shared by all boards before resetting them
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(self._envs)
+        return self._encode_states()
+
+    def _reset_envs(self, envs: np.ndarray):
+        num = len(envs)
+        if num == 0:
+            return
+
+        self.grid[envs, :self.num_cells] = EMPTY
+        self.head_ptr[envs] = 0
+        self.steps[envs] = 0
+        self.steps_without_eating[envs] = 0
+
+        heads = self.rng.integers(0, self.num_cells, size=num)
+        self.grid[envs, heads] = SNAKE_HEAD
+        self.body[envs, 0] = heads
+        self.lengths[envs] = 1
+
+        # the body grows from the head towards the tail, stored backwards in the ring
+        tails = heads
+        placed = np.ones(num, dtype=bool)
+        for i in range(1, self.SNAKE_INIT_BODY_LEN + 1):
+            candidates = self._neighbors[tails]
+            free = self.grid[envs[:, np.newaxis], candidates] == EMPTY
+            choice = self._choose(free)
+            placed &= free.any(axis=1)
+
+            new_tails = candidates[np.arange(num), choice]
+            self.grid[envs[placed], new_tails[placed]] = SNAKE_BODY
+            self.body[envs[placed], -i] = new_tails[placed]
+            self.lengths[envs[placed]] += 1
+            tails = np.where(placed, new_tails, tails)
+
+        # head moves away from the first body segment
+        has_body = self.lengths[envs] > 1
+        first_body = self.body[envs, -1]
+        self.directions[envs] = np.where(
+            has_body,
+            (self._neighbors[first_body] == heads[:, np.newaxis]).argmax(axis=1),
+            0
+        )
+
+        for _ in range(self.NUM_OF_GREEN_APPLES):
+            self._put_apples(envs, GREEN_APPLE)
+        for _ in range(self.NUM_OF_RED_APPLES):
+            self._put_apples(envs, RED_APPLE)
+
+    def _choose(self, mask: np.ndarray) -> np.ndarray:
+        """
+        Pick one True column per row uniformly at random.
+        Rows without any True column return an arbitrary index.
+        """
+        keys = self.rng.random(mask.shape)
+        keys[~mask] = -1.0
+        return keys.argmax(axis=1)
+
+    def _put_apples(self, envs: np.ndarray, apple: int) -> np.ndarray:
+        """
+        Put one apple on a random empty cell of each board in `envs`
+        return mask of boards without any empty cell
+        """
+        if apple != GREEN_APPLE and apple != RED_APPLE:
+            raise ValueError(f"Error: Apple must be {GREEN_APPLE} or {RED_APPLE}")
+
+        if len(envs) == 0:
+            return np.zeros(0, dtype=bool)
+
+        empty = self.grid[envs, :self.num_cells] == EMPTY
+        cells = self._choose(empty)
+        full = ~empty.any(axis=1)
+        self.grid[envs[~full], cells[~full]] = apple
+        return full
+
+    def _tail_cells(self, envs: np.ndarray) -> np.ndarray:
+        return self.body[envs, (self.head_ptr[envs] - self.lengths[envs] + 1) % self.num_cells]
+
+    def step(self, actions: np.ndarray):
+        """
+        actions: (num_envs,) MoveTo ids
+        return states (num_envs, 16), rewards (num_envs,), dones (num_envs,)
+        dones include the games cut by a step limit, see `truncated`
+        The finished boards are reset: their last states are in `final_states`
+        """
+        with self.timer.phase("env_step"):
+            rewards, dones = self._move(actions)
+        with self.timer.phase("encode_state"):
+            states = self._encode_states()
+        return states, rewards, dones
+
+    def _move(self, actions: np.ndarray):
+        """
+        Advance every game by one move and reset the finished ones
+        return rewards, dones
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        envs = self._envs
+
+        heads = self.body[envs, self.head_ptr]
+        new_heads = self._neighbors[heads, actions]
+        targets = self.grid[envs, new_heads]
+
+        collided = (targets == WALL) | (targets == SNAKE_HEAD) | (targets == SNAKE_BODY)
+        ate_green = targets == GREEN_APPLE
+        ate_red = targets == RED_APPLE
+        vanished = ate_red & (self.lengths == 1)
+        dones = collided | vanished
+
+        rewards = np.full(self.num_envs, self.REWARD_JUST_MOVE, dtype=np.float32)
+        rewards[ate_green] = self.REWARD_EAT_GREEN_APPLE
+        rewards[ate_red] = self.REWARD_EAT_RED_APPLE
+        rewards[dones] = self.REWARD_GAME_OVER
+
+        self.directions[:] = actions
+        self.steps += 1
+        self.steps_without_eating += 1
+        self.steps_without_eating[ate_green] = 0
+
+        # move head
+        alive = envs[~dones]
+        self.grid[alive, heads[alive]] = SNAKE_BODY
+        self.grid[alive, new_heads[alive]] = SNAKE_HEAD
+        self.head_ptr[alive] = (self.head_ptr[alive] + 1) % self.num_cells
+        self.body[alive, self.head_ptr[alive]] = new_heads[alive]
+        self.lengths[alive] += 1
+
+        # cut tail: 1 segment for a move, none for a green apple, 2 for a red apple
+        num_cut = np.where(ate_red, 2, np.where(ate_green, 0, 1))
+        num_cut[dones] = 0
+        for n in (1, 2):
+            cut = envs[num_cut >= n]
+            self.grid[cut, self._tail_cells(cut)] = EMPTY
+            self.lengths[cut] -= 1
+
+        # a board without empty cells cannot respawn its apple: the game is over
+        green_envs = envs[ate_green]
+        dones[green_envs[self._put_apples(green_envs, GREEN_APPLE)]] = True
+        red_envs = envs[ate_red & ~dones]
+        dones[red_envs[self._put_apples(red_envs, RED_APPLE)]] = True
+
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_steps is not None:
+            truncated |= self.max_steps <= self.steps
+        if self.max_steps_without_eating is not None:
+            truncated |= self.max_steps_without_eating <= self.steps_without_eating
+        truncated &= ~dones
+        self.truncated = truncated
+        dones |= truncated
+
+        finished = envs[dones]
+        self.final_lengths[finished] = np.where(vanished[finished], 0, self.lengths[finished])
+        self.final_steps[finished] = self.steps[finished]
+        if len(finished):
+            self.final_states[finished] = self._encode_states(finished)
+        self._reset_envs(finished)
+        return rewards, dones
+
+    def _encode_states(self, envs: np.ndarray = None) -> np.ndarray:
+        """
+        Same features as Board._encode_state for the boards `envs` (None: every board)
+        return (len(envs), NUM_DIRECTIONS * FEATURES)
+        """
+        if envs is None:
+            envs = self._envs
+        heads = self.body[envs, self.head_ptr[envs]]
+        rays = ray_cells(self.board_size, *np.divmod(heads, self.board_size))
+        cells = self.grid[envs[:, np.newaxis, np.newaxis], rays]
+
+        first = STOPS_RAY[cells].argmax(axis=2)  # the wall sentinel guarantees a hit
+        codes = np.take_along_axis(cells, first[..., np.newaxis], axis=2)[..., 0]
+
+        state = np.zeros((len(envs), NUM_DIRECTIONS, NUM_FEATURES), dtype=np.float32)
+        state[
+            np.arange(len(envs))[:, np.newaxis],
+            np.arange(NUM_DIRECTIONS)[np.newaxis, :],
+            FEATURE_OF_CODE[codes]
+        ] = first + 1
+        return state.reshape(len(envs), -1)
+
+    def snake(self, index: int) -> deque:
+        """
+        Snake of one board as deque([head, .., tail]) of (y, x)
+        """
+        length = self.lengths[index]
+        ptrs = (self.head_ptr[index] - np.arange(length)) % self.num_cells
+        return deque(divmod(int(cell), self.board_size) for cell in self.body[index, ptrs])
+
+    def apples(self, index: int, apple: int) -> list:
+        cells = np.flatnonzero(self.grid[index, :self.num_cells] == apple)
+        return [divmod(int(cell), self.board_size) for cell in cells]
@@ -0,0 +1,75 @@
+import os
+
+import torch
+
+from .agent import QLearningAgent
+from .metrics import MetricsSink
+from .replay_buffer import ReplayBuffer
+
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(
+        path: str,
+        agent: QLearningAgent,
+        counters: dict,
+        env=None,
+        buffer: ReplayBuffer = None,
+        metrics: MetricsSink = None,
+):
+    """
+    Write agent, counters and optionally the env RNG, the replay buffer and the metrics
+    statistics to `path`.
+    The file is written next to `path` first and renamed, so an interrupted save
+    never leaves a truncated checkpoint behind.
+    """
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "agent": agent.state_dict(),
+        "counters": dict(counters),
+    }
+    if env is not None:
+        checkpoint["env_rng"] = env.rng.bit_generator.state
+    if buffer is not None:
+        checkpoint["buffer"] = buffer.state_dict()
+    if metrics is not None:
+        checkpoint["metrics"] = metrics.state_dict()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        torch.save(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(
+        path: str,
+        agent: QLearningAgent,
+        env=None,
+        buffer: ReplayBuffer = None,
+        metrics: MetricsSink = None,
+) -> dict:
+    """
+    Restore what save_checkpoint() wrote into the given objects
+    return counters
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Error: Checkpoint not found: {path}")
+
+    # checkpoints hold numpy arrays and RNG states, not only tensors
+    checkpoint = torch.load(path, weights_only=False)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Error: Unsupported checkpoint version: {checkpoint.get('version')}")
+
+    agent.load_state_dict(checkpoint["agent"])
+    if env is not None and "env_rng" in checkpoint:
+        env.rng.bit_generator.state = checkpoint["env_rng"]
+    if buffer is not None and "buffer" in checkpoint:
+        buffer.load_state_dict(checkpoint["buffer"])
+    if metrics is not None and "metrics" in checkpoint:
+        metrics.load_state_dict(checkpoint["metrics"])
+    return checkpoint["counters"]
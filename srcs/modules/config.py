@@ -0,0 +1,233 @@
+import argparse
+from dataclasses import dataclass, field, fields, asdict
+from distutils.util import strtobool
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+from .environment import MAX_BOARD_SIZE, check_board_options
+from .parser import float_range, float_range_exclusive, int_list_type, int_range, str_expected
+
+
+def _bool(arg):
+    return bool(strtobool(str(arg)))
+
+
+def _option(default, checker):
+    """
+    Dataclass field checked (and converted) by a modules.parser checker
+    """
+    if isinstance(default, (list, tuple)):
+        return field(default_factory=lambda: list(default), metadata={"check": checker})
+    return field(default=default, metadata={"check": checker})
+
+
+def _check(section: str, name: str, checker, value):
+    if isinstance(value, (list, tuple)):
+        value = " ".join(str(v) for v in value)
+    try:
+        # as text, so that 1.5 is not silently truncated to an int
+        return checker(str(value))
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        raise ValueError(f"Error: Invalid {section}.{name}: {e}")
+
+
+class _Section:
+    """
+    Validate every field with its checker
+    """
+    name = ""
+
+    def __post_init__(self):
+        for f in fields(self):
+            setattr(self, f.name, _check(self.name, f.name, f.metadata["check"],
+                                         getattr(self, f.name)))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        names = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - names)
+        if unknown:
+            raise ValueError(f"Error: Unknown {cls.name} options: {unknown}")
+        return cls(**data)
+
+
+@dataclass
+class BoardConfig(_Section):
+    """
+    Board arguments, 0 disables a step limit
+    """
+    name = "board"
+
+    board_size: int = _option(10, int_range(2, MAX_BOARD_SIZE))
+    num_green_apples: int = _option(2, int_range(0, 1_000_000))
+    num_red_apples: int = _option(1, int_range(0, 1_000_000))
+    max_steps: int = _option(0, int_range(0, 1_000_000_000))
+    max_steps_without_eating: int = _option(200, int_range(0, 1_000_000_000))
+    reward_just_move: float = _option(-1.0, float_range(-1e6, 1e6))
+    reward_eat_green_apple: float = _option(50.0, float_range(-1e6, 1e6))
+    reward_eat_red_apple: float = _option(-20.0, float_range(-1e6, 1e6))
+    reward_game_over: float = _option(-100.0, float_range(-1e6, 1e6))
+
+    def __post_init__(self):
+        super().__post_init__()
+        check_board_options(self.board_size, self.num_green_apples, self.num_red_apples,
+                            self.max_steps or None, self.max_steps_without_eating or None)
+
+
+@dataclass
+class AgentConfig(_Section):
+    """
+    Agent arguments: kind "dqn" (QLearningAgent) or "tabular" (TabularQAgent,
+    which only uses gamma, lr and the epsilon schedule)
+    """
+    name = "agent"
+
+    kind: str = _option("dqn", str_expected(["dqn", "tabular"]))
+    gamma: float = _option(0.9, float_range(0.0, 1.0))
+    lr: float = _option(0.01, float_range_exclusive(0.0, 10.0))
+    epsilon: float = _option(0.1, float_range(0.0, 1.0))
+    epsilon_min: float = _option(0.01, float_range(0.0, 1.0))
+    epsilon_decay: float = _option(0.995, float_range(0.0, 1.0))
+    hidden_sizes: list = _option([100, 16], int_list_type(1, 8, 1, 4096))
+    target_update: int = _option(0, int_range(0, 1_000_000))
+    tau: float = _option(0.0, float_range(0.0, 1.0))
+    double_dqn: bool = _option(False, _bool)
+    fused_inference: bool = _option(False, _bool)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.epsilon < self.epsilon_min:
+            raise ValueError(f"Error: agent.epsilon_min ({self.epsilon_min}) "
+                             f"is above agent.epsilon ({self.epsilon})")
+        if self.epsilon_decay <= 0.0:
+            raise ValueError(f"Error: agent.epsilon_decay must be positive: {self.epsilon_decay}")
+
+
+@dataclass
+class TrainConfig(_Section):
+    """
+    Length and data flow of a training run
+    """
+    name = "train"
+
+    sessions: int = _option(10000, int_range(1, 1_000_000_000))
+    seed: int = _option(42, int_range(0, 2**32 - 1))
+    replay: bool = _option(False, _bool)
+    batch_size: int = _option(32, int_range(1, 4096))
+    buffer_size: int = _option(10000, int_range(1, 10_000_000))
+    workers: int = _option(0, int_range(0, 256))
+    envs: int = _option(1, int_range(1, 65536))
+    save_interval: int = _option(100, int_range(1, 1_000_000_000))
+
+
+TABULAR_OPTIONS = ["gamma", "lr", "epsilon", "epsilon_min", "epsilon_decay"]
+SECTIONS = {"board": BoardConfig, "agent": AgentConfig, "train": TrainConfig}
+
+
+@dataclass
+class RunConfig:
+    """
+    Everything a run is made of, loaded from a TOML file:
+        [board]
+        board_size = 20
+        [agent]
+        hidden_sizes = [128, 32]
+        [train]
+        sessions = 50000
+    """
+    board: BoardConfig = field(default_factory=BoardConfig)
+    agent: AgentConfig = field(default_factory=AgentConfig)
+    train: TrainConfig = field(default_factory=TrainConfig)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunConfig":
+        unknown = sorted(set(data) - set(SECTIONS))
+        if unknown:
+            raise ValueError(f"Error: Unknown config sections: {unknown}")
+        for section, values in data.items():
+            if not isinstance(values, dict):
+                raise ValueError(f"Error: Config section [{section}] must be a table")
+        return cls(**{
+            section: config.from_dict(data.get(section, {}))
+            for section, config in SECTIONS.items()
+        })
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def override(self, key: str, value) -> "RunConfig":
+        """
+        return a copy with `section.name` set to `value` (validated like the file)
+        """
+        section, _, name = key.partition(".")
+        if section not in SECTIONS or not name:
+            raise ValueError(f"Error: Option must be one of {list(SECTIONS)} as section.name: "
+                             f"{key}")
+        data = self.as_dict()
+        data[section][name] = value
+        return RunConfig.from_dict(data)
+
+    def board_options(self) -> dict:
+        """
+        Board / BatchBoard arguments, with None for a disabled step limit
+        """
+        options = asdict(self.board)
+        options["max_steps"] = self.board.max_steps or None
+        options["max_steps_without_eating"] = self.board.max_steps_without_eating or None
+        return options
+
+    def agent_options(self) -> dict:
+        """
+        Arguments of the agent of agent.kind (see make_agent)
+        """
+        options = asdict(self.agent)
+        del options["kind"]
+        if self.agent.kind == "tabular":
+            options = {name: options[name] for name in TABULAR_OPTIONS}
+            options["board_size"] = self.board.board_size
+            return options
+        options["hidden_sizes"] = tuple(self.agent.hidden_sizes)
+        return options
+
+
+def load_config(path: str = None, overrides=()) -> RunConfig:
+    """
+    The TOML file at `path` (defaults without one), then
+    `overrides`: "section.name=value" strings, applied in order
+    """
+    config = RunConfig()
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Error: Config file not found: {path}")
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Error: Invalid config file {path}: {e}")
+        config = RunConfig.from_dict(data)
+    return apply_overrides(config, overrides)
+
+
+def apply_overrides(config: RunConfig, overrides) -> RunConfig:
+    """
+    return `config` with the "section.name=value" strings of `overrides` applied in order
+    """
+    for override in overrides:
+        key, sep, value = override.partition("=")
+        if not sep:
+            raise ValueError(f"Error: Override must be section.name=value: {override}")
+        config = config.override(key.strip(), _parse_value(value.strip()))
+    return config
+
+
+def _parse_value(text: str):
+    """
+    A TOML value (1, 0.5, true, [100, 16]) or else the text itself
+    """
+    try:
+        return tomllib.loads(f"value = {text}")["value"]
+    except tomllib.TOMLDecodeError:
+        return text
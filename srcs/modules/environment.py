@@ -1,9 +1,11 @@
+import functools
 import numpy as np
-import random
 from collections import deque
 from colorama import Fore, Style
 from enum import Enum
 
+from .profiler import PhaseTimer
+
 
 class Status:
     SUCCESS = 0
@@ -12,9 +14,10 @@ class Status:
 
 class BoardElements:
     class _Element(str):
-        def __new__(cls, char, color):
+        def __new__(cls, char, color, code):
             obj = super().__new__(cls, char)
             obj.color = color
+            obj.code = code
             return obj
 
         @property
@@ -28,20 +31,27 @@ class BoardElements:
                 MoveTo.LEFT.direction: "<",
                 MoveTo.RIGHT.direction: ">",
             }
-            return self.__class__(direction_to_char.get(direction, self), self.color)
+            char = direction_to_char.get(direction, self)
+            return self.__class__(char, self.color, self.code)
 
-    WALL = _Element("W", Fore.WHITE)
-    SNAKE_HEAD = _Element("H", Fore.CYAN)
-    SNAKE_BODY = _Element("S", Fore.BLUE)
-    GREEN_APPLE = _Element("G", Fore.GREEN)
-    RED_APPLE = _Element("R", Fore.RED)
-    EMPTY = _Element("0", Fore.LIGHTBLACK_EX)
+    # code: integer representation used by array based boards
+    EMPTY = _Element("0", Fore.LIGHTBLACK_EX, 0)
+    WALL = _Element("W", Fore.WHITE, 1)
+    SNAKE_HEAD = _Element("H", Fore.CYAN, 2)
+    SNAKE_BODY = _Element("S", Fore.BLUE, 3)
+    GREEN_APPLE = _Element("G", Fore.GREEN, 4)
+    RED_APPLE = _Element("R", Fore.RED, 5)
 
     _elements = [WALL, SNAKE_HEAD, SNAKE_BODY, GREEN_APPLE, RED_APPLE, EMPTY]
+    _elements_by_code = sorted(_elements, key=lambda element: element.code)
 
     @classmethod
     def all_elements(cls):
-        return cls._ordered_elements
+        return cls._elements
+
+    @classmethod
+    def from_code(cls, code):
+        return cls._elements_by_code[code]
 
 
 class MoveTo(Enum):
@@ -62,46 +72,341 @@ class MoveTo(Enum):
     def directions(cls):
         return [direction.direction for direction in cls]
 
+    @classmethod
+    def from_id(cls, id: int):
+        return _MOVES_BY_ID[id]
+
+
+NUM_DIRECTIONS = len(MoveTo)  # 4方向
+NUM_FEATURES = 4  # 各視界の特徴量(壁, 体, 緑リンゴ, 赤リンゴ）
+FEATURE_WALL = 0
+FEATURE_BODY = 1
+FEATURE_GREEN_APPLE = 2
+FEATURE_RED_APPLE = 3
+
+# element code -> feature index of the encoded state
+FEATURE_OF_CODE = np.zeros(len(BoardElements.all_elements()), dtype=np.int64)
+FEATURE_OF_CODE[BoardElements.WALL.code] = FEATURE_WALL
+FEATURE_OF_CODE[BoardElements.SNAKE_BODY.code] = FEATURE_BODY
+FEATURE_OF_CODE[BoardElements.GREEN_APPLE.code] = FEATURE_GREEN_APPLE
+FEATURE_OF_CODE[BoardElements.RED_APPLE.code] = FEATURE_RED_APPLE
+
+# element code -> True if a ray stops at the element
+STOPS_RAY = np.ones(len(BoardElements.all_elements()), dtype=bool)
+STOPS_RAY[BoardElements.EMPTY.code] = False
+STOPS_RAY[BoardElements.SNAKE_HEAD.code] = False
+
+_DIRECTION_IDS = np.array([to.id for to in MoveTo])
+_MOVES_BY_ID = sorted(MoveTo, key=lambda to: to.id)
+
+
+@functools.lru_cache(maxsize=None)
+def neighbor_table(board_size: int) -> np.ndarray:
+    """
+    (cells, actions) -> flat index of the neighbour cell,
+    or `cells` (the wall sentinel) if the move leaves the board
+    """
+    num_cells = board_size * board_size
+    y, x = np.divmod(np.arange(num_cells)[:, np.newaxis], board_size)
+    dy, dx = np.array([to.direction for to in _MOVES_BY_ID]).T
+    ny, nx = y + dy, x + dx
+    inside = (0 <= ny) & (ny < board_size) & (0 <= nx) & (nx < board_size)
+    table = np.where(inside, ny * board_size + nx, num_cells)
+    table.flags.writeable = False
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _ray_offsets(board_size: int) -> np.ndarray:
+    """
+    (directions * board_size, board_size): row direction * board_size + steps to the
+    wall holds the flat index offsets of the cells 1..board_size steps away, and 2 * cells
+    (clipped to the wall sentinel by ray_cells) past the wall.
+    O(board_size^2): 32MB at board_size 1000
+    """
+    num_cells = board_size * board_size
+    strides = np.array([dy * board_size + dx for dy, dx in (to.direction for to in _MOVES_BY_ID)])
+    distances = np.arange(1, board_size + 1)
+    limits = np.arange(board_size)
+    offsets = np.where(
+        distances[np.newaxis, np.newaxis, :] <= limits[np.newaxis, :, np.newaxis],
+        strides[:, np.newaxis, np.newaxis] * distances,
+        2 * num_cells,
+    ).reshape(-1, board_size)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def ray_cells(board_size: int, y, x) -> np.ndarray:
+    """
+    (..., directions, board_size) flat indices seen from the cells (y, x) (ints or arrays),
+    padded with the wall sentinel (board_size * board_size) once the ray leaves the board
+    """
+    n = board_size
+    # steps before the wall in MoveTo id order: UP, DOWN, LEFT, RIGHT
+    rows = (y, 2 * n - 1 - y, 2 * n + x, 4 * n - 1 - x)
+    heads = y * n + x
+    if isinstance(y, np.ndarray):
+        rows = np.stack(rows, axis=-1)
+        heads = heads[..., np.newaxis, np.newaxis]
+    cells = _ray_offsets(n).take(rows, axis=0)
+    cells += heads
+    return np.minimum(cells, n * n, out=cells)
+
+
+# largest board_size accepted by the boards and the run config
+MAX_BOARD_SIZE = 1000
+
+
+def check_board_options(
+        board_size, num_green_apples, num_red_apples, max_steps, max_steps_without_eating
+):
+    """
+    Raise ValueError for a board that cannot be set up or step limits that are not positive
+    """
+    if not 2 <= board_size <= MAX_BOARD_SIZE:
+        raise ValueError(f"Error: board_size must be in [2, {MAX_BOARD_SIZE}]: {board_size}")
+    if num_green_apples < 0 or num_red_apples < 0:
+        raise ValueError(f"Error: Apple counts must be >= 0: {num_green_apples}, {num_red_apples}")
+    # initial snake (head + body) and apples must fit on the board
+    if board_size * board_size < 3 + num_green_apples + num_red_apples:
+        raise ValueError(f"Error: {num_green_apples} green and {num_red_apples} red apples "
+                         f"do not fit on a {board_size}x{board_size} board")
+    if max_steps is not None and max_steps <= 0:
+        raise ValueError(f"Error: max_steps must be positive: {max_steps}")
+    if max_steps_without_eating is not None and max_steps_without_eating <= 0:
+        raise ValueError(
+            f"Error: max_steps_without_eating must be positive: {max_steps_without_eating}"
+        )
+
+
+class BoardSnapshot:
+    """
+    Everything needed to continue a game exactly where Board.snapshot() was taken.
+    The free cell order and the RNG state are part of it: they decide where the next apples go.
+    initial / actions: start of the episode and MoveTo ids played since (uint8),
+                       only for a board that records its actions
+    """
+    __slots__ = (
+        "board_size", "cells", "free_cells", "snake", "green_apples", "red_apples",
+        "snake_direction", "done", "truncated", "steps", "steps_without_eating", "rng_state",
+        "initial", "actions",
+    )
+
+    def __init__(self, board_size, cells, free_cells, snake, green_apples, red_apples,
+                 snake_direction, done, truncated, steps, steps_without_eating, rng_state,
+                 initial=None, actions=None):
+        self.board_size = board_size
+        self.cells = cells
+        self.free_cells = free_cells
+        self.snake = snake
+        self.green_apples = green_apples
+        self.red_apples = red_apples
+        self.snake_direction = snake_direction
+        self.done = done
+        self.truncated = truncated
+        self.steps = steps
+        self.steps_without_eating = steps_without_eating
+        self.rng_state = rng_state
+        self.initial = initial
+        self.actions = actions
+
 
 class Board:
-    def __init__(self, board_size=10):
+    """
+    max_steps                : truncate an episode after this many steps (None: no limit)
+    max_steps_without_eating : truncate an episode after this many steps without
+                               a green apple (None: no limit)
+    A truncated episode is done, but not terminal: `truncated` tells them apart.
+    record_actions           : keep the start and the actions of the current episode,
+                               so that snapshot() can replay it
+    """
+    def __init__(
+            self,
+            board_size=10,
+            debug=False,
+            seed=None,
+            max_steps=None,
+            max_steps_without_eating=None,
+            record_actions=False,
+            num_green_apples=2,
+            num_red_apples=1,
+            reward_just_move=-1,
+            reward_eat_green_apple=50,
+            reward_eat_red_apple=-20,
+            reward_game_over=-100,
+    ):
+        check_board_options(
+            board_size, num_green_apples, num_red_apples, max_steps, max_steps_without_eating
+        )
+
         self.board_size = board_size
+        self.debug = debug  # compare the incremental board with a full rebuild on every step
+        self.max_steps = max_steps
+        self.max_steps_without_eating = max_steps_without_eating
+        self.record_actions = record_actions
+        self.episode_rng_state = None  # RNG state the recorded episode was reset from
+        self._initial = None
+        self._actions = bytearray()
         self.SNAKE_INIT_BODY_LEN = 2
-        self.NUM_OF_GREEN_APPLES = 2
-        self.NUM_OF_RED_APPLES = 1
+        self.NUM_OF_GREEN_APPLES = num_green_apples
+        self.NUM_OF_RED_APPLES = num_red_apples
 
-        self.REWARD_JUST_MOVE = -1
-        self.REWARD_EAT_GREEN_APPLE = 50
-        self.REWARD_EAT_RED_APPLE = -20
-        self.REWARD_GAME_OVER = -100
+        self.REWARD_JUST_MOVE = reward_just_move
+        self.REWARD_EAT_GREEN_APPLE = reward_eat_green_apple
+        self.REWARD_EAT_RED_APPLE = reward_eat_red_apple
+        self.REWARD_GAME_OVER = reward_game_over
 
-        self.snake = deque()  # deque([head, .., tail])
-        self.green_apples = []
-        self.red_apples = []
+        self.rng = np.random.default_rng(seed)
+        self.timer = PhaseTimer(enabled=False)  # phases: env_step, encode_state
+
+        self._snake = deque()  # deque([head, .., tail])
+        self._green_apples = []
+        self._red_apples = []
 
         self.reset()
 
-    def reset(self):
-        self.board = np.full((self.board_size, self.board_size), BoardElements.EMPTY, dtype=str)
+    @property
+    def snake(self):
+        return self._snake
+
+    @snake.setter
+    def snake(self, snake):
+        self._snake = deque(snake)
+        self.update_board()
+
+    @property
+    def green_apples(self):
+        return self._green_apples
+
+    @green_apples.setter
+    def green_apples(self, apples):
+        self._green_apples = list(apples)
+        self.update_board()
+
+    @property
+    def red_apples(self):
+        return self._red_apples
+
+    @red_apples.setter
+    def red_apples(self, apples):
+        self._red_apples = list(apples)
+        self.update_board()
+
+    def reset(self, seed=None):
+        """
+        seed: reseed the board's random generator before the new game
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        if self.record_actions:
+            self.episode_rng_state = self.rng.bit_generator.state
+
+        # board is a view of _cells, whose extra last cell is a wall sentinel for the rays
+        num_cells = self.board_size * self.board_size
+        self._cells = np.full(num_cells + 1, BoardElements.EMPTY.code, dtype=np.int8)
+        self._cells[num_cells] = BoardElements.WALL.code
+        self.board = self._cells[:num_cells].reshape(self.board_size, self.board_size)
+        self._rebuild_free_cells()
 
         self._init_snake()
         self._init_apples()
 
         self.done = False
+        self.truncated = False
+        self.steps = 0
+        self.steps_without_eating = 0
+        if self.record_actions:
+            self._initial = self.snapshot()
+            self._actions = bytearray()
         # self.update_board()
         # self.draw()
         return self._encode_state()
 
+    @property
+    def recorded_actions(self) -> bytes:
+        """
+        MoveTo ids played since the last reset (record_actions only)
+        """
+        return bytes(self._actions)
+
+    def snapshot(self) -> BoardSnapshot:
+        """
+        Compact copy of the game; O(cells), no deep copy of the Board
+        """
+        snapshot = BoardSnapshot(
+            board_size=self.board_size,
+            cells=self._cells.copy(),
+            free_cells=np.array(self._free_cells, dtype=np.int32),
+            snake=tuple(self._snake),
+            green_apples=tuple(self._green_apples),
+            red_apples=tuple(self._red_apples),
+            snake_direction=self.snake_direction,
+            done=self.done,
+            truncated=self.truncated,
+            steps=self.steps,
+            steps_without_eating=self.steps_without_eating,
+            rng_state=self.rng.bit_generator.state,
+        )
+        if self.record_actions and self._initial is not None:
+            snapshot.initial = self._initial
+            snapshot.actions = bytes(self._actions)
+        return snapshot
+
+    def restore(self, snapshot: BoardSnapshot):
+        """
+        Continue the game of `snapshot`; a recording board continues its trajectory
+        """
+        if snapshot.board_size != self.board_size:
+            raise ValueError(f"Error: Snapshot of a {snapshot.board_size} board "
+                             f"restored on a {self.board_size} board")
+
+        self._cells = snapshot.cells.copy()
+        self.board = self._cells[:-1].reshape(self.board_size, self.board_size)
+        self._free_cells = snapshot.free_cells.tolist()
+        self._free_slot = [0] * (self.board_size * self.board_size)
+        for slot, cell in enumerate(self._free_cells):
+            self._free_slot[cell] = slot
+
+        self._snake = deque(snapshot.snake)
+        self._green_apples = list(snapshot.green_apples)
+        self._red_apples = list(snapshot.red_apples)
+        self.snake_direction = snapshot.snake_direction
+        self.done = snapshot.done
+        self.truncated = snapshot.truncated
+        self.steps = snapshot.steps
+        self.steps_without_eating = snapshot.steps_without_eating
+        self.rng.bit_generator.state = snapshot.rng_state
+
+        if snapshot.initial is not None:
+            self._initial = snapshot.initial
+            self._actions = bytearray(snapshot.actions)
+        else:
+            self._initial = snapshot
+            self._actions = bytearray()
+
+    def replay(self, snapshot: BoardSnapshot):
+        """
+        Replay the recorded episode of `snapshot` from its start
+        yield step() results
+        """
+        if snapshot.initial is None:
+            raise ValueError("Error: Snapshot has no recorded actions")
+
+        self.restore(snapshot.initial)
+        for action_id in snapshot.actions:
+            yield self.step(MoveTo.from_id(action_id))
+
     def _init_snake(self):
-        head_y = random.randint(0, self.board_size - 1)
-        head_x = random.randint(0, self.board_size - 1)
+        head_y = int(self.rng.integers(self.board_size))
+        head_x = int(self.rng.integers(self.board_size))
         snake_head = (head_y, head_x)
-        self.snake = deque([snake_head])
-        self.board[snake_head] = BoardElements.SNAKE_HEAD
+        self._snake = deque([snake_head])
+        self._set_cell(snake_head, BoardElements.SNAKE_HEAD.code)
 
         directions = MoveTo.directions()
         for _ in range(self.SNAKE_INIT_BODY_LEN):
-            random.shuffle(directions)
+            self.rng.shuffle(directions)
             for direction in directions:
                 y, x = direction[0], direction[1]
                 tail_y, tail_x = self.snake[-1][0], self.snake[-1][1]
@@ -113,7 +418,7 @@ class Board:
                     continue
 
                 self.snake.append(new_tail)
-                self.board[new_tail] = BoardElements.SNAKE_BODY
+                self._set_cell(new_tail, BoardElements.SNAKE_BODY.code)
                 break
 
         direction_y = head_y - tail_y
@@ -121,11 +426,11 @@ class Board:
         self.snake_direction = (direction_y, direction_x)
 
     def _init_apples(self):
-        self.green_apples = []
+        self._green_apples = []
         for _ in range(self.NUM_OF_GREEN_APPLES):
             self._put_apple(apple=BoardElements.GREEN_APPLE)
 
-        self.red_apples = []
+        self._red_apples = []
         for _ in range(self.NUM_OF_RED_APPLES):
             self._put_apple(apple=BoardElements.RED_APPLE)
 
@@ -134,40 +439,61 @@ class Board:
             raise ValueError(f"Error: Apple must be {BoardElements.GREEN_APPLE}"
                              f" or {BoardElements.RED_APPLE}")
 
-        empty_cells = np.argwhere(self.board == BoardElements.EMPTY)
-        empty_cells += len(self.snake)
-        if len(empty_cells) == 0:
+        if len(self._free_cells) == 0:
             raise ValueError("Error: No empty cell")
 
-        while True:
-            y = random.randint(0, self.board_size - 1)
-            x = random.randint(0, self.board_size - 1)
-            if self.board[y, x] != BoardElements.EMPTY:
-                continue
+        cell = self._free_cells[self.rng.integers(len(self._free_cells))]
+        pos = divmod(cell, self.board_size)
+        self._set_cell(pos, apple.code)
+        if apple == BoardElements.GREEN_APPLE:
+            self.green_apples.append(pos)
+        else:
+            self.red_apples.append(pos)
 
-            self.board[y, x] = apple
-            if apple == BoardElements.GREEN_APPLE:
-                self.green_apples.append((y, x))
-            else:
-                self.red_apples.append((y, x))
-            break
+    def _rebuild_free_cells(self):
+        """
+        Free cell index:
+          _free_cells: flat indices of all empty cells, in no particular order
+          _free_slot : flat index -> position in _free_cells (valid for empty cells only)
+        """
+        self._free_cells = np.flatnonzero(self.board == BoardElements.EMPTY.code).tolist()
+        self._free_slot = [0] * (self.board_size * self.board_size)
+        for slot, cell in enumerate(self._free_cells):
+            self._free_slot[cell] = slot
 
-    def _extend_snake(self):
+    def _set_cell(self, pos: tuple, code: int):
         """
-        Snake's length increase by 1
+        Write one cell and keep the free cell index in sync in O(1)
         """
-        tail = self.snake[-1]
-        if len(self.snake) == 1:
-            self.snake.append((tail[0], tail[1] + 1))
-        else:
-            new_tail_y = 2 * tail[0] - self.snake[-2][0]
-            new_tail_x = 2 * tail[1] - self.snake[-2][1]
-            self.snake.append((new_tail_y, new_tail_x))
+        was_empty = self.board[pos] == BoardElements.EMPTY.code
+        is_empty = code == BoardElements.EMPTY.code
+        self.board[pos] = code
+        if was_empty == is_empty:
+            return
 
-    def _shrink_snake(self):
+        cell = pos[0] * self.board_size + pos[1]
+        if is_empty:
+            self._free_slot[cell] = len(self._free_cells)
+            self._free_cells.append(cell)
+        else:
+            # swap remove
+            slot = self._free_slot[cell]
+            last = self._free_cells.pop()
+            if last != cell:
+                self._free_cells[slot] = last
+                self._free_slot[last] = slot
+
+    def _push_head(self, head: tuple):
+        if len(self.snake) > 0:
+            self._set_cell(self.snake[0], BoardElements.SNAKE_BODY.code)
+        self.snake.appendleft(head)
+        self._set_cell(head, BoardElements.SNAKE_HEAD.code)
+
+    def _pop_tail(self):
         if len(self.snake) == 0:
             return
-        self.snake.pop()
+        tail = self.snake.pop()
+        self._set_cell(tail, BoardElements.EMPTY.code)
 
     def _is_wall_collision(self, pos: tuple):
         if pos[0] < 0 or self.board_size <= pos[0]:
@@ -176,19 +502,24 @@ class Board:
             return True
         return False
 
+    def _is_snake(self, pos: tuple):
+        code = self.board[pos]
+        return code == BoardElements.SNAKE_HEAD.code or code == BoardElements.SNAKE_BODY.code
+
     def _is_collision(self, pos: tuple):
         """
         Check for collisions with walls and own body
+        The board is kept in sync with the snake, so this is a single cell lookup
         """
         if self._is_wall_collision(pos):
             return True
-        if pos in self.snake:
+        if self._is_snake(pos):
             return True
         return False
 
     def _move_to_direction(self):
         """
-        move snake
+        move snake and patch only the cells that changed
         returen reward
         """
         next_head_y = self.snake[0][0] + self.snake_direction[0]
@@ -199,107 +530,122 @@ class Board:
             self.done = True
             return self.REWARD_GAME_OVER
 
-        reward = 0
-        if new_head in self.green_apples:
+        # new apples are put before the snake moves,
+        # so they never appear on the new head or the vacated tail
+        code = self.board[new_head]
+        if code == BoardElements.GREEN_APPLE.code:
             self.green_apples.remove(new_head)
-            self._extend_snake()
             self._put_apple(apple=BoardElements.GREEN_APPLE)
-            reward = self.REWARD_EAT_GREEN_APPLE
-        elif new_head in self.red_apples:
+            self._push_head(new_head)
+            self.steps_without_eating = 0
+            return self.REWARD_EAT_GREEN_APPLE
+
+        if code == BoardElements.RED_APPLE.code:
             self.red_apples.remove(new_head)
-            self._shrink_snake()
             self._put_apple(apple=BoardElements.RED_APPLE)
-            reward = self.REWARD_EAT_RED_APPLE
+            self._pop_tail()
             if len(self.snake) == 0:
+                self._set_cell(new_head, BoardElements.EMPTY.code)
                 self.done = True
                 return self.REWARD_GAME_OVER
-        else:
-            reward = self.REWARD_JUST_MOVE
+            self._push_head(new_head)
+            self._pop_tail()
+            return self.REWARD_EAT_RED_APPLE
 
-        self.snake.appendleft(new_head)
-        self.snake.pop()
-        return reward
+        self._push_head(new_head)
+        self._pop_tail()
+        return self.REWARD_JUST_MOVE
 
     def step(self, action: MoveTo):
         if self.done:
             return self.board, 0, self.done
 
-        self.snake_direction = action.direction
+        with self.timer.phase("env_step"):
+            if self.record_actions:
+                self._actions.append(action.id)
+            self.snake_direction = action.direction
 
-        reward = self._move_to_direction()
-        self.update_board()
-        return self._encode_state(), reward, self.done
+            self.steps += 1
+            self.steps_without_eating += 1
+            reward = self._move_to_direction()
+
+            if not self.done:
+                self.truncated = self._is_truncated()
+                self.done = self.truncated
+
+        if self.debug:
+            self._check_board()
+        with self.timer.phase("encode_state"):
+            state = self._encode_state()
+        return state, reward, self.done
+
+    def _is_truncated(self):
+        if self.max_steps is not None and self.max_steps <= self.steps:
+            return True
+        if (self.max_steps_without_eating is not None
+                and self.max_steps_without_eating <= self.steps_without_eating):
+            return True
+        return False
+
+    @property
+    def terminated(self):
+        """
+        True if the game itself ended (not cut by a step limit): no value to bootstrap
+        """
+        return self.done and not self.truncated
 
     def _fill_snake(self):
         for i, segment in enumerate(self.snake):
             if i == 0:
-                self.board[segment] = BoardElements.SNAKE_HEAD
+                self.board[segment] = BoardElements.SNAKE_HEAD.code
             else:
-                self.board[segment] = BoardElements.SNAKE_BODY
+                self.board[segment] = BoardElements.SNAKE_BODY.code
 
     def _fill_apples(self):
         for pos in self.green_apples:
-            self.board[pos] = BoardElements.GREEN_APPLE
+            self.board[pos] = BoardElements.GREEN_APPLE.code
 
         for pos in self.red_apples:
-            self.board[pos] = BoardElements.RED_APPLE
+            self.board[pos] = BoardElements.RED_APPLE.code
 
     def update_board(self):
-        self.board.fill(BoardElements.EMPTY)
+        """
+        Rebuild the whole board from snake and apples
+        """
+        self.board.fill(BoardElements.EMPTY.code)
         self._fill_snake()
         self._fill_apples()
+        self._rebuild_free_cells()
+
+    def _check_board(self):
+        incremental_board = self.board.copy()
+        incremental_free_cells = sorted(self._free_cells)
+        self.update_board()
+        if not np.array_equal(incremental_board, self.board):
+            raise RuntimeError("Error: Incremental board differs from the rebuilt board")
+        if incremental_free_cells != self._free_cells:
+            raise RuntimeError("Error: Free cell index differs from the rebuilt board")
 
     def _encode_state(self):
         """
         Encode state for agent:
         - 4 directions from head (UP, DOWN, LEFT, RIGHT)
         - Each direction has 4 features (wall, body, green apple, red apple)
+        The rays from the head are gathered with ray_cells()
         """
-        NUM_DIRECTIONS = len(MoveTo)  # 4方向
-        FEATURES = 4  # 各視界の特徴量(壁, 体, 緑リンゴ, 赤リンゴ）
-        FEATURE_WALL = 0
-        FEATURE_BODY = 1
-        FEATURE_GREEN_APPLE = 2
-        FEATURE_RED_APPLE = 3
-
-        state = np.zeros((NUM_DIRECTIONS, FEATURES), dtype=np.float32)
+        state = np.zeros((NUM_DIRECTIONS, NUM_FEATURES), dtype=np.float32)
 
         if len(self.snake) == 0:
             return state.flatten()[np.newaxis, :]
 
-        head_pos = self.snake[0]
-        for to in MoveTo:
-            id = to.id
-            direction = to.direction
-
-            dy = direction[0]
-            dx = direction[1]
-
-            distance = 0
-            distances = [0, 0, 0, 0]
-
-            y, x = head_pos[0], head_pos[1]
-            while 0 <= y < self.board_size and 0 <= x < self.board_size:
-                y += dy
-                x += dx
-                distance += 1
-
-                if y < 0 or self.board_size <= y or x < 0 or self.board_size <= x:
-                    distances[FEATURE_WALL] = distance
-                    break
-                if self.board[y][x] == BoardElements.SNAKE_BODY:
-                    distances[FEATURE_BODY] = distance
-                    break
-                if self.board[y][x] == BoardElements.GREEN_APPLE:
-                    distances[FEATURE_GREEN_APPLE] = distance
-                    break
-                if self.board[y][x] == BoardElements.RED_APPLE:
-                    distances[FEATURE_RED_APPLE] = distance
-                    break
+        head_y, head_x = self.snake[0]
+        cells = self._cells[ray_cells(self.board_size, head_y, head_x)]  # (4, board_size)
 
-            state[id] = distances
+        first = STOPS_RAY[cells].argmax(axis=1)  # the wall sentinel guarantees a hit
+        codes = cells[_DIRECTION_IDS, first]
+        state[_DIRECTION_IDS, FEATURE_OF_CODE[codes]] = first + 1
 
-        return state.flatten()[np.newaxis, :]  # (1, NUM_DIRECTIONS * FEATURES)
+        return state.reshape(1, -1)  # (1, NUM_DIRECTIONS * FEATURES)
 
     def draw(self):
         """
@@ -310,7 +656,7 @@ class Board:
         for y in range(self.board_size):
             row = ""
             for x in range(self.board_size):
-                c = self.board[y, x]
+                c = BoardElements.from_code(self.board[y, x])
                 if c == BoardElements.SNAKE_HEAD:
                     # row += BoardElements.SNAKE_HEAD.colored
                     row += BoardElements.SNAKE_HEAD.with_direction(self.snake_direction).colored
@@ -331,11 +677,12 @@ class Board:
         print(f" GreenApples    : {self.green_apples}")
         print(f" RedApples      : {self.red_apples}")
         print(f" Game Done      : {self.done}")
+        print(f" Truncated      : {self.truncated}")
         print("-" * 20)
 
     def draw_with_q_values(self, qs: np.ndarray):
-        """現在の状態のQ値を可視化"""
+        """現在の状態のQ値を可視化 (qs: (action_size,), see QLearningAgent.q_values)"""
         self.draw()  # 既存の描画
         print("\nQ-Values for each direction:")
-        for direction, q_val in zip(MoveTo, qs[0]):
+        for direction, q_val in zip(MoveTo, qs):
             print(f" {direction.name}: {q_val:.3f}")
@@ -0,0 +1,161 @@
+import math
+import numpy as np
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+import torch.multiprocessing as mp
+
+from .agent import FusedQNet, QLearningAgent, QNet
+from .checkpoint import load_checkpoint
+from .environment import Board, MoveTo
+from .trajectory import TrajectoryWriter
+
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+class EvaluationReport:
+    """
+    Results of greedy rollouts, one entry per episode
+    """
+    def __init__(self, lengths, rewards, steps, truncated, elapsed):
+        self.lengths = lengths
+        self.rewards = rewards
+        self.steps = steps
+        self.truncated = truncated
+        self.elapsed = elapsed
+
+    @staticmethod
+    def _distribution(values: np.ndarray) -> dict:
+        stats = {
+            "mean": float(np.mean(values)),
+            "std": float(np.std(values)),
+            "min": float(np.min(values)),
+            "max": float(np.max(values)),
+        }
+        for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            stats[f"p{percentile}"] = float(value)
+        return stats
+
+    def summary(self) -> dict:
+        episodes = len(self.lengths)
+        return {
+            "episodes": episodes,
+            "length": self._distribution(self.lengths),
+            "reward": self._distribution(self.rewards),
+            "steps": self._distribution(self.steps),
+            "truncated": int(np.count_nonzero(self.truncated)),
+            "elapsed": self.elapsed,
+            "episodes_per_sec": episodes / self.elapsed if self.elapsed > 0 else math.inf,
+            "steps_per_sec": float(np.sum(self.steps)) / self.elapsed if self.elapsed > 0
+            else math.inf,
+        }
+
+    def print(self):
+        summary = self.summary()
+        print(f"Episodes : {summary['episodes']} "
+              f"({summary['episodes_per_sec']:.1f} episodes/s, "
+              f"{summary['steps_per_sec']:.0f} steps/s)")
+        print(f"Truncated: {summary['truncated']}")
+        for name in ["length", "reward", "steps"]:
+            stats = summary[name]
+            percentiles = ", ".join(f"p{p}: {stats[f'p{p}']:.1f}" for p in PERCENTILES)
+            print(f"{name.capitalize():9}: mean {stats['mean']:.2f} (std {stats['std']:.2f}), "
+                  f"min {stats['min']:.0f}, max {stats['max']:.0f}, {percentiles}")
+
+
+def _rollouts(qnet: QNet, seed, episodes: int, board_options: dict, record: bool):
+    """
+    Greedy episodes in one process
+    return lengths, rewards, steps, truncated, recorded episodes ((rng state, actions) or None)
+    """
+    torch.set_num_threads(1)
+
+    env = Board(seed=seed, record_actions=record, **board_options)
+    recorded = [] if record else None
+    lengths = np.zeros(episodes, dtype=np.int64)
+    rewards = np.zeros(episodes, dtype=np.float64)
+    steps = np.zeros(episodes, dtype=np.int64)
+    truncated = np.zeros(episodes, dtype=bool)
+
+    fused_qnet = FusedQNet(qnet)  # the weights do not change during the rollouts
+    for i in range(episodes):
+        state = env.reset()
+        total_reward = 0
+        itr = 0
+        done = False
+        while not done:
+            action = int(fused_qnet.argmax(state)[0])
+            state, reward, done = env.step(MoveTo.from_id(action))
+            total_reward += reward
+            itr += 1
+
+        lengths[i] = len(env.snake)
+        rewards[i] = total_reward
+        steps[i] = itr
+        truncated[i] = env.truncated
+        if record:
+            recorded.append((env.episode_rng_state, env.recorded_actions))
+    return lengths, rewards, steps, truncated, recorded
+
+
+def evaluate(
+        qnet: QNet,
+        episodes: int,
+        workers: int = 0,
+        seed=None,
+        record: str = None,
+        **board_options,
+) -> EvaluationReport:
+    """
+    Run `episodes` greedy episodes (epsilon 0, no gradient)
+    workers      : size of the process pool (0: in this process)
+    record       : write the episodes to this trajectory file
+    board_options: Board arguments, max_steps cuts episodes of policies that never die
+                   (default: 10 * board cells)
+    """
+    if episodes <= 0:
+        raise ValueError(f"Error: episodes must be positive: {episodes}")
+    board_options = dict(board_options)
+    if board_options.get("max_steps") is None:
+        board_size = board_options.get("board_size", 10)
+        board_options["max_steps"] = 10 * board_size * board_size
+    template = Board(**board_options)  # invalid options fail before any rollout
+
+    start = time.perf_counter()
+    if workers <= 0:
+        results = [_rollouts(qnet, seed, episodes, board_options, record is not None)]
+    else:
+        # several chunks per worker to balance long and short episodes
+        num_chunks = min(episodes, 4 * workers)
+        chunks = [len(c) for c in np.array_split(np.arange(episodes), num_chunks)]
+        seeds = np.random.SeedSequence(seed).spawn(num_chunks)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_rollouts, qnet, chunk_seed, chunk, board_options, record is not None)
+                for chunk_seed, chunk in zip(seeds, chunks)
+            ]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    lengths, rewards, steps, truncated = (
+        np.concatenate(values) for values in list(zip(*results))[:4]
+    )
+    if record is not None:
+        with TrajectoryWriter(record, template) as writer:
+            for _, _, _, _, recorded in results:
+                for rng_state, actions in recorded:
+                    writer.write_episode(rng_state, actions)
+    return EvaluationReport(lengths, rewards, steps, truncated, elapsed)
+
+
+def evaluate_checkpoint(
+        path: str, episodes: int, agent_options: dict = None, **options
+) -> EvaluationReport:
+    """
+    agent_options: QLearningAgent arguments, the QNet must match the checkpoint
+    """
+    agent = QLearningAgent(**(agent_options or {}))
+    load_checkpoint(path, agent)
+    return evaluate(agent.qnet, episodes, **options)
@@ -0,0 +1,91 @@
+import functools
+import io
+import numpy as np
+from contextlib import redirect_stdout
+
+import gymnasium as gym
+from gymnasium import spaces
+
+from .environment import Board, MoveTo, NUM_DIRECTIONS, NUM_FEATURES
+
+
+class SnakeEnv(gym.Env):
+    """
+    Gymnasium view of a Board:
+      observation: the 16 ray features of Board._encode_state, float32
+      action     : MoveTo id
+      step       : terminated on game over, truncated by the Board step limits
+    board_options: other Board arguments (apple counts, rewards)
+    """
+    metadata = {"render_modes": ["human", "ansi"]}
+
+    def __init__(
+            self,
+            board_size=10,
+            max_steps=None,
+            max_steps_without_eating=None,
+            render_mode=None,
+            **board_options,
+    ):
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"Error: Unsupported render mode: {render_mode}")
+
+        self.render_mode = render_mode
+        self.board = Board(
+            board_size=board_size,
+            max_steps=max_steps,
+            max_steps_without_eating=max_steps_without_eating,
+            **board_options,
+        )
+        # a ray feature is the distance to the first object, at most the board size
+        self.observation_space = spaces.Box(
+            low=0.0, high=float(board_size), shape=(NUM_DIRECTIONS * NUM_FEATURES,),
+            dtype=np.float32,
+        )
+        self.action_space = spaces.Discrete(len(MoveTo))
+
+    def _info(self) -> dict:
+        return {"length": len(self.board.snake), "steps": self.board.steps}
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        state = self.board.reset(seed=seed)
+        if self.render_mode == "human":
+            self.render()
+        return state[0], self._info()
+
+    def step(self, action):
+        state, reward, _ = self.board.step(MoveTo.from_id(int(action)))
+        if self.render_mode == "human":
+            self.render()
+        return (
+            state[0],
+            float(reward),
+            self.board.terminated,
+            self.board.truncated,
+            self._info(),
+        )
+
+    def render(self):
+        if self.render_mode == "ansi":
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.board.draw()
+            return output.getvalue()
+        if self.render_mode == "human":
+            self.board.draw()
+
+
+def make_vector_env(num_envs: int, asynchronous=False, **env_options) -> gym.vector.VectorEnv:
+    """
+    `num_envs` SnakeEnv stepped together
+    asynchronous: one subprocess per env, observations in shared memory
+    env_options : SnakeEnv arguments
+    """
+    if num_envs <= 0:
+        raise ValueError(f"Error: num_envs must be positive: {num_envs}")
+
+    env_fns = [functools.partial(SnakeEnv, **env_options) for _ in range(num_envs)]
+    if asynchronous:
+        return gym.vector.AsyncVectorEnv(env_fns, shared_memory=True, context="spawn")
+    return gym.vector.SyncVectorEnv(env_fns)
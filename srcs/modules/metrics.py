@@ -0,0 +1,195 @@
+import copy
+import csv
+import json
+import math
+import os
+import time
+import numpy as np
+
+
+FIELDS = ["session", "loss", "reward", "length", "steps", "ave_len"]
+STAT_FIELDS = ["loss", "reward", "length", "steps"]
+
+
+class RunningStats:
+    """
+    Count, mean, variance (Welford), min and max in O(1) per value
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def var(self) -> float:
+        return self._m2 / self.count if self.count > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    def as_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "std": self.std,
+                "min": self.min, "max": self.max}
+
+
+class MovingAverage:
+    """
+    Mean of the last `window` values with a ring buffer and a running sum
+    """
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError(f"Error: window must be positive: {window}")
+        self.window = window
+        self._values = np.zeros(window, dtype=np.float64)
+        self._ptr = 0
+        self.count = 0  # values in the window
+        self._sum = 0.0
+
+    def add(self, value: float) -> float:
+        if self.count == self.window:
+            self._sum -= self._values[self._ptr]
+        else:
+            self.count += 1
+        self._values[self._ptr] = value
+        self._sum += value
+        self._ptr = (self._ptr + 1) % self.window
+        return self.mean
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.count if self.count > 0 else 0.0
+
+
+class Decimator:
+    """
+    At most `max_points` evenly spaced samples of an unbounded series:
+    when full, every other sample is dropped and the stride doubles
+    """
+    def __init__(self, max_points: int = 10000):
+        self.max_points = max_points
+        self.stride = 1
+        self._seen = 0
+        self.points = []
+
+    def add(self, point):
+        if self._seen % self.stride == 0:
+            self.points.append(point)
+            if len(self.points) >= self.max_points:
+                self.points = self.points[::2]
+                self.stride *= 2
+        self._seen += 1
+
+
+class MetricsSink:
+    """
+    One record per episode:
+      - running statistics of every field and a moving average of the length
+      - an append-only CSV or JSONL file (by extension), flushed every `flush_interval` s
+      - a decimated history for plotting
+    Memory stays constant however long the run is.
+    """
+    def __init__(self, path: str = None, window: int = 1000, flush_interval: float = 5.0,
+                 max_points: int = 10000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.stats = {field: RunningStats() for field in STAT_FIELDS}
+        self.ave_len = MovingAverage(window)
+        self.history = Decimator(max_points)
+
+        self._file = None
+        self._writer = None
+        self._last_flush = time.monotonic()
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: str):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in (".csv", ".jsonl"):
+            raise ValueError(f"Error: Metrics file must be .csv or .jsonl: {path}")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        if extension == ".csv":
+            self._writer = csv.writer(self._file)
+            if is_new:
+                self._writer.writerow(FIELDS)
+
+    def record(self, session: int, loss: float, reward: float, length: int, steps: int) -> dict:
+        """
+        return the record, with the moving average of the length as ave_len
+        """
+        row = {
+            "session": session,
+            "loss": float(loss),
+            "reward": float(reward),
+            "length": int(length),
+            "steps": int(steps),
+        }
+        for field in STAT_FIELDS:
+            self.stats[field].add(row[field])
+        row["ave_len"] = self.ave_len.add(row["length"])
+        self.history.add(tuple(row[field] for field in FIELDS))
+
+        if self._file is not None:
+            if self._writer is not None:
+                self._writer.writerow([row[field] for field in FIELDS])
+            else:
+                self._file.write(json.dumps(row) + "\n")
+            now = time.monotonic()
+            if self.flush_interval <= now - self._last_flush:
+                self.flush()
+                self._last_flush = now
+        return row
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def state_dict(self) -> dict:
+        """
+        Statistics, moving average and history, to resume a run (the file is appended to)
+        """
+        return copy.deepcopy({
+            "stats": {field: vars(stats) for field, stats in self.stats.items()},
+            "ave_len": vars(self.ave_len),
+            "history": vars(self.history),
+        })
+
+    def load_state_dict(self, state: dict):
+        state = copy.deepcopy(state)
+        for field, stats in state["stats"].items():
+            vars(self.stats[field]).update(stats)
+        vars(self.ave_len).update(state["ave_len"])
+        vars(self.history).update(state["history"])
+
+    def columns(self) -> dict:
+        """
+        Decimated history as {field: np.ndarray}
+        """
+        points = np.array(self.history.points, dtype=np.float64).reshape(-1, len(FIELDS))
+        return {field: points[:, i] for i, field in enumerate(FIELDS)}
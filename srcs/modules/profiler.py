@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from contextlib import nullcontext
+
+
+_NULL_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timer.record(self.name, self.start, time.perf_counter())
+
+
+class PhaseTimer:
+    """
+    Cumulative wall time per named phase of the hot path:
+        with timer.phase("env_step"):
+            ...
+    A disabled timer (the default of Board and QLearningAgent) only costs
+    one shared no-op context manager per phase.
+    trace     : also keep every phase as a Chrome trace event (chrome://tracing, Perfetto)
+    max_events: stop recording events beyond this, the totals keep counting
+    """
+    def __init__(self, enabled=True, trace=False, max_events=1_000_000):
+        self.enabled = enabled
+        self.trace = trace
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self):
+        self.totals = {}
+        self.counts = {}
+        self.events = []
+        self.start = time.perf_counter()
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name: str, start: float, end: float):
+        self.totals[name] = self.totals.get(name, 0.0) + (end - start)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self.trace and len(self.events) < self.max_events:
+            self.events.append((name, start, end))
+
+    def summary(self) -> dict:
+        """
+        return {"elapsed": seconds since reset, "phases": {name: total, count, mean, share}}
+        share is the fraction of the elapsed wall time
+        """
+        elapsed = time.perf_counter() - self.start
+        phases = {}
+        for name, total in sorted(self.totals.items(), key=lambda item: -item[1]):
+            count = self.counts[name]
+            phases[name] = {
+                "total": total,
+                "count": count,
+                "mean": total / count,
+                "share": total / elapsed if elapsed > 0 else 0.0,
+            }
+        return {"elapsed": elapsed, "phases": phases}
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = [f"{'phase':16} {'total':>10} {'calls':>10} {'mean':>10} {'share':>7}"]
+        tracked = 0.0
+        for name, stats in summary["phases"].items():
+            tracked += stats["share"]
+            lines.append(f"{name:16} {stats['total']:9.2f}s {stats['count']:10d} "
+                         f"{stats['mean'] * 1e6:8.1f}us {stats['share'] * 100:6.1f}%")
+        lines.append(f"{'(untracked)':16} {summary['elapsed'] * (1 - tracked):9.2f}s "
+                     f"{'':10} {'':10} {(1 - tracked) * 100:6.1f}%")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str):
+        """
+        Write the recorded events as a Chrome trace JSON file
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.start) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": 0,
+            }
+            for name, start, end in self.events
+        ]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Experience replay backed by preallocated ring arrays.
+    Insertion overwrites the oldest transition once the buffer is full.
+    """
+    def __init__(self, capacity: int, state_features: int = 16, seed=None):
+        if capacity <= 0:
+            raise ValueError(f"Error: Capacity must be positive: {capacity}")
+
+        self.capacity = capacity
+        self.state_features = state_features
+
+        self.states = np.zeros((capacity, state_features), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_features), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self.ptr = 0  # next slot to write
+        self.size = 0
+
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(
+            self,
+            state: np.ndarray,
+            action: int,
+            reward: float,
+            next_state: np.ndarray,
+            done: bool
+    ):
+        self.states[self.ptr] = state
+        self.actions[self.ptr] = action
+        self.rewards[self.ptr] = reward
+        self.next_states[self.ptr] = next_state
+        self.dones[self.ptr] = done
+
+        self.ptr = (self.ptr + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(
+            self,
+            states: np.ndarray,
+            actions: np.ndarray,
+            rewards: np.ndarray,
+            next_states: np.ndarray,
+            dones: np.ndarray
+    ):
+        """
+        Insert stacked transitions, e.g. one step of every BatchBoard game
+        """
+        num = len(actions)
+        if num == 0:
+            return
+        # only the newest `capacity` transitions survive
+        skip = max(0, num - self.capacity)
+        idx = (self.ptr + skip + np.arange(num - skip)) % self.capacity
+
+        self.states[idx] = states[skip:]
+        self.actions[idx] = actions[skip:]
+        self.rewards[idx] = rewards[skip:]
+        self.next_states[idx] = next_states[skip:]
+        self.dones[idx] = dones[skip:]
+
+        self.ptr = (self.ptr + num) % self.capacity
+        self.size = min(self.size + num, self.capacity)
+
+    def sample(self, batch_size: int):
+        """
+        Uniform minibatch (with replacement)
+        return states, actions, rewards, next_states, dones
+        """
+        if self.size == 0:
+            raise ValueError("Error: Replay buffer is empty")
+
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return (
+            self.states[idx],
+            self.actions[idx],
+            self.rewards[idx],
+            self.next_states[idx],
+            self.dones[idx],
+        )
+
+    def state_dict(self) -> dict:
+        return {
+            "states": self.states[:self.size].copy(),
+            "actions": self.actions[:self.size].copy(),
+            "rewards": self.rewards[:self.size].copy(),
+            "next_states": self.next_states[:self.size].copy(),
+            "dones": self.dones[:self.size].copy(),
+            "ptr": self.ptr,
+            "rng": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state: dict):
+        size = len(state["actions"])
+        if self.capacity < size:
+            raise ValueError(f"Error: {size} transitions do not fit in capacity {self.capacity}")
+
+        self.states[:size] = state["states"]
+        self.actions[:size] = state["actions"]
+        self.rewards[:size] = state["rewards"]
+        self.next_states[:size] = state["next_states"]
+        self.dones[:size] = state["dones"]
+        self.size = size
+        self.ptr = state["ptr"] % self.capacity
+        self.rng.bit_generator.state = state["rng"]
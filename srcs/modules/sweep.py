@@ -0,0 +1,291 @@
+import csv
+import itertools
+import json
+import math
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import torch
+import torch.multiprocessing as mp
+
+from .config import RunConfig
+from .environment import Board
+from .metrics import MovingAverage
+from .replay_buffer import ReplayBuffer
+from .tabular_agent import make_agent
+from .training import play_episodes
+
+
+STATUSES = ["complete", "pruned", "budget", "failed"]
+
+
+def flatten_space(data: dict) -> dict:
+    """
+    {"agent": {"lr": [..]}} -> {"agent.lr": [..]}
+    a value is a list of choices or a range {"low": .., "high": .., "log": false}
+    """
+    space = {}
+    for section, options in data.items():
+        if not isinstance(options, dict):
+            raise ValueError(f"Error: Sweep section [{section}] must be a table")
+        for name, values in options.items():
+            key = f"{section}.{name}"
+            if isinstance(values, dict):
+                unknown = sorted(set(values) - {"low", "high", "log"})
+                if unknown or "low" not in values or "high" not in values:
+                    raise ValueError(f"Error: Range of {key} needs low and high: {values}")
+                if values["high"] < values["low"]:
+                    raise ValueError(f"Error: Empty range of {key}: {values}")
+                if values.get("log", False) and values["low"] <= 0:
+                    raise ValueError(f"Error: Log range of {key} must be positive: {values}")
+            elif not isinstance(values, list) or len(values) == 0:
+                raise ValueError(f"Error: {key} needs a non-empty list or a range: {values}")
+            space[key] = values
+    return space
+
+
+def grid(space: dict) -> list:
+    """
+    Every combination of the choices, ranges are not allowed
+    """
+    for key, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"Error: A grid needs a list of choices for {key}")
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+
+
+def _sample(rng: np.random.Generator, values):
+    if isinstance(values, list):
+        return values[rng.integers(len(values))]
+    low, high = values["low"], values["high"]
+    if values.get("log", False):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    if isinstance(low, int) and isinstance(high, int):
+        return min(high, int(round(value)))
+    return float(value)
+
+
+def random_search(space: dict, num_trials: int, seed=None) -> list:
+    """
+    `num_trials` independent draws: a uniform choice per list,
+    uniform (log-uniform with log = true) per range, rounded for int bounds
+    """
+    if num_trials <= 0:
+        raise ValueError(f"Error: num_trials must be positive: {num_trials}")
+    rng = np.random.default_rng(seed)
+    return [{key: _sample(rng, values) for key, values in space.items()}
+            for _ in range(num_trials)]
+
+
+class MedianStopper:
+    """
+    Median stopping rule: every `interval` sessions after `warmup`, a trial reports its
+    average length and stops when it is below the median of the other trials at the
+    same session (once `min_trials` of them have reported there)
+    reports: dict shared by the trials, {(session, trial id): average length}
+    """
+    def __init__(self, reports, interval=100, warmup=0, min_trials=3):
+        if interval <= 0:
+            raise ValueError(f"Error: interval must be positive: {interval}")
+        self.reports = reports
+        self.interval = interval
+        self.warmup = warmup
+        self.min_trials = min_trials
+
+    def should_stop(self, trial_id: int, session: int, value: float) -> bool:
+        if session % self.interval != 0:
+            return False
+        self.reports[(session, trial_id)] = value
+        if session < self.warmup:
+            return False
+        others = [v for (s, t), v in self.reports.items() if s == session and t != trial_id]
+        return self.min_trials <= len(others) and value < np.median(others)
+
+
+class TrialResult:
+    """
+    Outcome of one trial: status is one of STATUSES
+    """
+    def __init__(self, trial_id, params, status, sessions, ave_len, max_len, cpu_time,
+                 error=None):
+        self.trial_id = trial_id
+        self.params = params
+        self.status = status
+        self.sessions = sessions
+        self.ave_len = ave_len
+        self.max_len = max_len
+        self.cpu_time = cpu_time
+        self.error = error
+
+    def as_row(self) -> dict:
+        row = {
+            "trial": self.trial_id,
+            "status": self.status,
+            "sessions": self.sessions,
+            "ave_len": self.ave_len,
+            "max_len": self.max_len,
+            "cpu_time": self.cpu_time,
+            "error": self.error or "",
+        }
+        row.update(self.params)
+        return row
+
+
+def make_configs(base: RunConfig, trials: list) -> list:
+    """
+    The run config of every trial: `base` with the trial values applied (validated here,
+    before anything is scheduled)
+    """
+    configs = []
+    for params in trials:
+        config = base
+        for key, value in params.items():
+            config = config.override(key, value)
+        configs.append(config)
+    return configs
+
+
+def run_trial(trial_id: int, params: dict, config: RunConfig, cpu_budget=None, stopper=None,
+              window=100) -> TrialResult:
+    """
+    Train one agent on one Board (single thread) for config.train.sessions episodes
+    cpu_budget: stop after this many CPU seconds (None: no limit)
+    stopper   : MedianStopper asked every episode (None: no early stopping)
+    ave_len   : mean snake length of the last `window` episodes
+    """
+    torch.set_num_threads(1)
+    start = time.process_time()
+
+    train = config.train
+    env_seed, agent_seed, buffer_seed = np.random.SeedSequence(train.seed).spawn(3)
+    env = Board(seed=env_seed, **config.board_options())
+    agent = make_agent(config.agent.kind, seed=agent_seed, **config.agent_options())
+    buffer = None
+    if train.replay:
+        buffer = ReplayBuffer(capacity=train.buffer_size, seed=buffer_seed)
+
+    ave_len = MovingAverage(window)
+    max_len = 0
+    status = "complete"
+    episodes = play_episodes(env, agent, buffer, train.batch_size)
+    for session, (snake_len, *_) in enumerate(episodes, start=1):
+        ave_len.add(snake_len)
+        max_len = max(max_len, snake_len)
+        if session == train.sessions:
+            break
+        if cpu_budget is not None and cpu_budget <= time.process_time() - start:
+            status = "budget"
+            break
+        if stopper is not None and stopper.should_stop(trial_id, session, ave_len.mean):
+            status = "pruned"
+            break
+    episodes.close()
+
+    return TrialResult(trial_id, params, status, session, ave_len.mean, max_len,
+                       time.process_time() - start)
+
+
+def _safe_trial(trial_id, params, config, cpu_budget, stopper, window) -> TrialResult:
+    try:
+        return run_trial(trial_id, params, config, cpu_budget, stopper, window)
+    except Exception as e:
+        return TrialResult(trial_id, params, "failed", 0, math.nan, 0, 0.0, error=repr(e))
+
+
+def run_sweep(
+        base: RunConfig,
+        trials: list,
+        workers: int = 0,
+        cpu_budget: float = None,
+        prune_interval: int = 0,
+        prune_warmup: int = 0,
+        prune_min_trials: int = 3,
+        window: int = 100,
+        on_result=None,
+) -> list:
+    """
+    Run every trial (a {"section.name": value} dict applied to `base`)
+    workers       : size of the process pool, one thread per trial (0: in this process)
+    cpu_budget    : CPU seconds per trial (None: no limit)
+    prune_interval: median stopping rule every N sessions (0: off), see MedianStopper
+    on_result     : called with each TrialResult as it finishes
+    return the results in trial order
+    """
+    configs = make_configs(base, trials)
+
+    if workers <= 0:
+        stopper = None
+        if 0 < prune_interval:
+            stopper = MedianStopper({}, prune_interval, prune_warmup, prune_min_trials)
+        results = []
+        for trial_id, (params, config) in enumerate(zip(trials, configs)):
+            result = _safe_trial(trial_id, params, config, cpu_budget, stopper, window)
+            if on_result is not None:
+                on_result(result)
+            results.append(result)
+        return results
+
+    ctx = mp.get_context("spawn")
+    results = [None] * len(trials)
+    with ctx.Manager() as manager:
+        stopper = None
+        if 0 < prune_interval:
+            stopper = MedianStopper(manager.dict(), prune_interval, prune_warmup,
+                                    prune_min_trials)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_safe_trial, trial_id, params, config, cpu_budget, stopper, window)
+                for trial_id, (params, config) in enumerate(zip(trials, configs))
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if on_result is not None:
+                    on_result(result)
+                results[result.trial_id] = result
+    return results
+
+
+def format_table(results: list, top: int = None) -> str:
+    """
+    Results ranked by final average length, failed trials last
+    """
+    ranked = sorted(results, key=lambda r: -r.ave_len if not math.isnan(r.ave_len) else math.inf)
+    if top is not None:
+        ranked = ranked[:top]
+    keys = list(results[0].params) if results else []
+    lines = [f"{'trial':>5} {'status':9} {'sessions':>8} {'ave_len':>8} {'max_len':>7} "
+             f"{'cpu':>8}  " + "  ".join(keys)]
+    for result in ranked:
+        params = "  ".join(f"{result.params[key]}" for key in keys)
+        lines.append(f"{result.trial_id:5d} {result.status:9} {result.sessions:8d} "
+                     f"{result.ave_len:8.2f} {result.max_len:7d} {result.cpu_time:7.1f}s  "
+                     f"{params}")
+    return "\n".join(lines)
+
+
+def write_table(results: list, path: str):
+    """
+    One row per trial, CSV or JSONL by extension
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".csv", ".jsonl"):
+        raise ValueError(f"Error: Sweep results must be .csv or .jsonl: {path}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    rows = [result.as_row() for result in results]
+    with open(path, "w", newline="") as f:
+        if extension == ".jsonl":
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            return
+        if not rows:
+            return
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
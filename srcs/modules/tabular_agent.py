@@ -0,0 +1,292 @@
+import functools
+import numpy as np
+
+from .agent import QLearningAgent
+from .environment import NUM_DIRECTIONS, NUM_FEATURES
+from .profiler import PhaseTimer
+
+
+AGENT_KINDS = ["dqn", "tabular"]
+
+
+def num_state_keys(board_size: int) -> int:
+    """
+    Number of distinct keys of pack_states() on a board of this size
+    """
+    return (NUM_FEATURES * (board_size + 1)) ** NUM_DIRECTIONS
+
+
+@functools.lru_cache(maxsize=None)
+def _key_weights(board_size: int):
+    """
+    pack_states() keys as states @ distance_weights + (states > 0) @ feature_weights
+    """
+    base = NUM_FEATURES * (board_size + 1)
+    powers = np.repeat(base ** np.arange(NUM_DIRECTIONS, dtype=np.int64), NUM_FEATURES)
+    features = np.tile(np.arange(NUM_FEATURES, dtype=np.int64), NUM_DIRECTIONS)
+    return powers, features * (board_size + 1) * powers
+
+
+def pack_states(states: np.ndarray, board_size: int) -> np.ndarray:
+    """
+    Integer keys of encoded states (batch, 16), see Board._encode_state:
+    each direction holds one distance 1..board_size in the feature of the first object
+    on its ray (all zero without a snake), a digit feature * (board_size + 1) + distance
+    in base NUM_FEATURES * (board_size + 1)
+    return (batch,) int64 keys
+    """
+    states = np.asarray(states).reshape(-1, NUM_DIRECTIONS * NUM_FEATURES).astype(np.int64)
+    if len(states) and board_size < states.max():
+        raise ValueError(f"Error: State does not come from a {board_size}x{board_size} board")
+    distance_weights, feature_weights = _key_weights(board_size)
+    return states @ distance_weights + (states > 0) @ feature_weights
+
+
+def unpack_keys(keys: np.ndarray, board_size: int) -> np.ndarray:
+    """
+    Encoded states (batch, 16) float32 of pack_states() keys
+    """
+    keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+    base = NUM_FEATURES * (board_size + 1)
+    digits = keys[:, np.newaxis] // (base ** np.arange(NUM_DIRECTIONS, dtype=np.int64)) % base
+    features, distances = np.divmod(digits, board_size + 1)
+    rays = np.zeros((len(keys), NUM_DIRECTIONS, NUM_FEATURES), dtype=np.float32)
+    rows, directions = np.indices(digits.shape)
+    rays[rows, directions, features] = distances
+    return rays.reshape(len(keys), -1)
+
+
+class DenseQTable:
+    """
+    Q values of every key in one (keys, actions) array, untouched rows cost no memory
+    until written on systems with lazily zeroed pages
+    """
+    def __init__(self, num_keys: int, action_size: int):
+        self.values = np.zeros((num_keys, action_size), dtype=np.float32)
+        self.visited = np.zeros(num_keys, dtype=bool)
+
+    def get(self, keys: np.ndarray) -> np.ndarray:
+        return self.values[keys]
+
+    def add(self, keys: np.ndarray, actions: np.ndarray, deltas: np.ndarray):
+        np.add.at(self.values, (keys, actions), deltas)
+        self.visited[keys] = True
+
+    def keys(self) -> np.ndarray:
+        return np.flatnonzero(self.visited)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.visited))
+
+    def state_dict(self) -> dict:
+        keys = self.keys()
+        return {"keys": keys, "values": self.values[keys]}
+
+    def load_state_dict(self, state: dict):
+        # np.zeros, not np.zeros_like: only np.zeros gets lazily zeroed pages
+        self.values = np.zeros(self.values.shape, dtype=self.values.dtype)
+        self.visited = np.zeros(self.visited.shape, dtype=self.visited.dtype)
+        self.values[state["keys"]] = state["values"]
+        self.visited[state["keys"]] = True
+
+
+class DictQTable:
+    """
+    Q values of the visited keys only, for boards whose key space is too large
+    """
+    def __init__(self, action_size: int):
+        self.action_size = action_size
+        self.table = {}
+        self._zeros = np.zeros(action_size, dtype=np.float32)
+
+    def get(self, keys: np.ndarray) -> np.ndarray:
+        return np.array([self.table.get(key, self._zeros) for key in keys.tolist()],
+                        dtype=np.float32).reshape(-1, self.action_size)
+
+    def add(self, keys: np.ndarray, actions: np.ndarray, deltas: np.ndarray):
+        for key, action, delta in zip(keys.tolist(), actions.tolist(), deltas.tolist()):
+            row = self.table.get(key)
+            if row is None:
+                row = self.table[key] = self._zeros.copy()
+            row[action] += delta
+
+    def keys(self) -> np.ndarray:
+        return np.fromiter(self.table, dtype=np.int64, count=len(self.table))
+
+    def __len__(self):
+        return len(self.table)
+
+    def state_dict(self) -> dict:
+        keys = self.keys()
+        return {"keys": keys, "values": self.get(keys)}
+
+    def load_state_dict(self, state: dict):
+        keys = state["keys"].tolist()
+        self.table = {key: row.copy() for key, row in zip(keys, state["values"])}
+
+
+class TabularQAgent:
+    """
+    Q-learning on a table indexed by pack_states() keys, with the interface of
+    QLearningAgent (get_action, get_actions, update, update_batch, state_dict)
+    table: "dense" (one array over every key), "dict" (visited keys only) or
+           "auto" (dense up to max_dense_keys keys)
+    """
+    def __init__(
+            self,
+            board_size=10,
+            seed=None,
+            gamma=0.9,
+            lr=0.1,
+            epsilon=0.1,
+            epsilon_min=0.01,
+            epsilon_decay=0.995,
+            table="auto",
+            max_dense_keys=1 << 22,
+    ):
+        if not 0.0 <= gamma <= 1.0:
+            raise ValueError(f"Error: gamma must be in [0, 1]: {gamma}")
+        if not 0.0 < lr <= 1.0:
+            raise ValueError(f"Error: lr must be in (0, 1]: {lr}")
+        if not 0.0 <= epsilon_min <= epsilon <= 1.0:
+            raise ValueError(f"Error: Need 0 <= epsilon_min <= epsilon <= 1: "
+                             f"{epsilon_min}, {epsilon}")
+        if not 0.0 < epsilon_decay <= 1.0:
+            raise ValueError(f"Error: epsilon_decay must be in (0, 1]: {epsilon_decay}")
+        if table not in ("auto", "dense", "dict"):
+            raise ValueError(f"Error: table must be auto, dense or dict: {table}")
+
+        self.board_size = board_size
+        self.gamma = gamma
+        self.lr = lr
+
+        self.epsilon = epsilon
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+
+        self.action_size = 4
+        self.state_features = NUM_DIRECTIONS * NUM_FEATURES
+
+        self.rng = np.random.default_rng(seed)
+        # phases: action_selection, update
+        self.timer = PhaseTimer(enabled=False)
+
+        num_keys = num_state_keys(board_size)
+        if table == "auto":
+            table = "dense" if num_keys <= max_dense_keys else "dict"
+        if table == "dense":
+            self.table = DenseQTable(num_keys, self.action_size)
+        else:
+            self.table = DictQTable(self.action_size)
+        self.num_updates = 0
+
+    def _greedy(self, q: np.ndarray) -> int:
+        # unvisited states are all zero: break ties at random rather than always UP
+        best = np.flatnonzero(q == q.max())
+        return int(best[0] if len(best) == 1 else best[self.rng.integers(len(best))])
+
+    def q_values(self, state: np.ndarray) -> np.ndarray:
+        return self.table.get(pack_states(state, self.board_size))[0]
+
+    def get_action(self, state: np.ndarray) -> int:
+        with self.timer.phase("action_selection"):
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+            if self.rng.random() < self.epsilon:
+                return int(self.rng.integers(self.action_size))
+            return self._greedy(self.q_values(state))
+
+    def get_actions(self, states: np.ndarray) -> np.ndarray:
+        """
+        Epsilon-greedy actions for a batch of states, epsilon decays once per action
+        """
+        with self.timer.phase("action_selection"):
+            keys = pack_states(states, self.board_size)
+            num = len(keys)
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay ** num)
+
+            explore = self.rng.random(num) < self.epsilon
+            actions = self.rng.integers(self.action_size, size=num)
+            qs = self.table.get(keys[~explore])
+            actions[~explore] = [self._greedy(q) for q in qs]
+            return actions
+
+    def update(
+            self,
+            state: np.ndarray,
+            action: int,
+            reward: float,
+            next_state: np.ndarray,
+            done: bool
+    ):
+        loss, _ = self.update_batch(state, action, reward, next_state, done)
+        return loss
+
+    def update_batch(
+            self,
+            states: np.ndarray,
+            actions: np.ndarray,
+            rewards: np.ndarray,
+            next_states: np.ndarray,
+            dones: np.ndarray
+    ):
+        """
+        Q(s, a) += lr * (r + gamma * max_a' Q(s', a') - Q(s, a)) for every transition,
+        repeated (s, a) pairs add up their steps
+        return mean squared TD error, td_errors (batch,)
+        """
+        with self.timer.phase("update"):
+            keys = pack_states(states, self.board_size)
+            next_keys = pack_states(next_states, self.board_size)
+            actions = np.asarray(actions, dtype=np.int64).reshape(-1)
+            rewards = np.asarray(rewards, dtype=np.float32).reshape(-1)
+            dones = np.asarray(dones, dtype=np.float32).reshape(-1)
+
+            next_q = self.table.get(next_keys).max(axis=1) * (1.0 - dones)
+            q = self.table.get(keys)[np.arange(len(keys)), actions]
+            td_errors = rewards + self.gamma * next_q - q
+            self.table.add(keys, actions, self.lr * td_errors)
+            self.num_updates += 1
+        return float(np.mean(td_errors ** 2)), td_errors
+
+    def state_dict(self) -> dict:
+        return {
+            "board_size": self.board_size,
+            "table": self.table.state_dict(),
+            "epsilon": self.epsilon,
+            "num_updates": self.num_updates,
+            "rng": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state: dict):
+        if state["board_size"] != self.board_size:
+            raise ValueError(f"Error: Table of a {state['board_size']}x{state['board_size']} "
+                             f"board, not {self.board_size}x{self.board_size}")
+        self.table.load_state_dict(state["table"])
+        self.epsilon = state["epsilon"]
+        self.num_updates = state["num_updates"]
+        self.rng.bit_generator.state = state["rng"]
+
+
+def make_agent(kind="dqn", seed=None, **options):
+    """
+    QLearningAgent ("dqn") or TabularQAgent ("tabular") built from `options`
+    """
+    if kind == "tabular":
+        return TabularQAgent(seed=seed, **options)
+    if kind == "dqn":
+        return QLearningAgent(seed=seed, **options)
+    raise ValueError(f"Error: Unknown agent kind: {kind} (expected one of {AGENT_KINDS})")
+
+
+def warm_start(agent: QLearningAgent, table_agent: TabularQAgent, epochs=20,
+               batch_size=256) -> float:
+    """
+    Fit the QNet of `agent` (a QLearningAgent) to the Q values of every visited state
+    of `table_agent`
+    return the mean loss of the last epoch
+    """
+    keys = table_agent.table.keys()
+    if len(keys) == 0:
+        raise ValueError("Error: The table has no visited state to start from")
+    states = unpack_keys(keys, table_agent.board_size)
+    return agent.fit_q_values(states, table_agent.table.get(keys), epochs, batch_size)
@@ -0,0 +1,49 @@
+from .environment import Board, MoveTo
+from .profiler import PhaseTimer
+from .replay_buffer import ReplayBuffer
+
+
+def play_episodes(
+        env: Board,
+        agent,
+        buffer: ReplayBuffer = None,
+        batch_size: int = 32,
+        timer: PhaseTimer = None,
+):
+    """
+    Play and learn on `env` one episode after another, without end
+    agent : QLearningAgent or TabularQAgent
+    buffer: learn from sampled batches once it holds batch_size transitions
+            (None: learn from every transition as it happens)
+    yield (snake length, total reward, steps, average loss, last state) of every episode,
+    before the next reset: `env` still shows the finished game
+    """
+    if timer is None:
+        timer = PhaseTimer(enabled=False)
+    while True:
+        state = env.reset()
+        total_loss = 0
+        total_reward = 0
+        itr = 0
+        done = False
+
+        while not done:
+            action = agent.get_action(state)
+            next_state, reward, done = env.step(MoveTo.from_id(action))
+
+            # a truncated episode is cut, not lost: keep bootstrapping from next_state
+            if buffer is None:
+                loss = agent.update(state, action, reward, next_state, env.terminated)
+            else:
+                with timer.phase("replay"):
+                    buffer.add(state, action, reward, next_state, env.terminated)
+                    batch = buffer.sample(batch_size) if batch_size <= len(buffer) else None
+                loss = 0
+                if batch is not None:
+                    loss, _ = agent.update_batch(*batch)
+            total_loss += loss
+            total_reward += reward
+            itr += 1
+            state = next_state
+
+        yield len(env.snake), total_reward, itr, total_loss / itr, state
@@ -0,0 +1,175 @@
+import os
+import struct
+
+from .environment import Board, MoveTo
+
+
+MAGIC = b"SNKT"
+VERSION = 3
+
+# magic, version, board_size, max_steps, max_steps_without_eating (0: no limit),
+# green and red apple counts, rewards (just move, green apple, red apple, game over)
+_HEADER = struct.Struct("<4sHHIIII4d")
+# number of actions, then the PCG64 state the board was reset from:
+# state, increment, has_uint32, uinteger
+_EPISODE = struct.Struct("<I16s16sBI")
+
+REWARDS = ["reward_just_move", "reward_eat_green_apple", "reward_eat_red_apple",
+           "reward_game_over"]
+
+
+def _pack_episode(rng_state: dict, num_actions: int) -> bytes:
+    if rng_state["bit_generator"] != "PCG64":
+        raise ValueError(f"Error: Unsupported bit generator: {rng_state['bit_generator']}")
+    return _EPISODE.pack(
+        num_actions,
+        rng_state["state"]["state"].to_bytes(16, "little"),
+        rng_state["state"]["inc"].to_bytes(16, "little"),
+        rng_state["has_uint32"],
+        rng_state["uinteger"],
+    )
+
+
+def _unpack_rng_state(state: bytes, inc: bytes, has_uint32: int, uinteger: int) -> dict:
+    return {
+        "bit_generator": "PCG64",
+        "state": {
+            "state": int.from_bytes(state, "little"),
+            "inc": int.from_bytes(inc, "little"),
+        },
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+
+
+class Episode:
+    """
+    One recorded game: the RNG state the board was reset from and the MoveTo ids played
+    """
+    __slots__ = ("rng_state", "actions")
+
+    def __init__(self, rng_state: dict, actions: bytes):
+        self.rng_state = rng_state
+        self.actions = actions
+
+    def __len__(self):
+        return len(self.actions)
+
+
+class TrajectoryWriter:
+    """
+    Episode file:
+      header : magic, version, and the size, step limits, apples and rewards of `board`
+      episode: 41 bytes to rebuild the start of the game, then one uint8 per action
+    """
+    def __init__(self, path: str, board: Board):
+        self.path = path
+        self.num_episodes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(
+            MAGIC,
+            VERSION,
+            board.board_size,
+            board.max_steps or 0,
+            board.max_steps_without_eating or 0,
+            board.NUM_OF_GREEN_APPLES,
+            board.NUM_OF_RED_APPLES,
+            board.REWARD_JUST_MOVE,
+            board.REWARD_EAT_GREEN_APPLE,
+            board.REWARD_EAT_RED_APPLE,
+            board.REWARD_GAME_OVER,
+        ))
+
+    def write(self, board: Board):
+        """
+        Write the episode played on `board` since its last reset
+        The board must record its actions (Board(record_actions=True)).
+        """
+        if not board.record_actions:
+            raise ValueError("Error: The board does not record its actions")
+        self.write_episode(board.episode_rng_state, board.recorded_actions)
+
+    def write_episode(self, rng_state: dict, actions: bytes):
+        self._file.write(_pack_episode(rng_state, len(actions)))
+        self._file.write(actions)
+        self.num_episodes += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Iterate over the episodes of a TrajectoryWriter file and replay them
+    """
+    def __init__(self, path: str):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Error: Trajectory file not found: {path}")
+
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Error: Truncated trajectory file: {path}")
+        magic, version, *options = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Error: Not a trajectory file: {path}")
+        if version != VERSION:
+            raise ValueError(f"Error: Unsupported trajectory version: {version}")
+
+        (board_size, max_steps, max_steps_without_eating, num_green_apples, num_red_apples,
+         *rewards) = options
+        self.board_size = board_size
+        self.max_steps = max_steps or None
+        self.max_steps_without_eating = max_steps_without_eating or None
+        self.board_options = {
+            "board_size": board_size,
+            "max_steps": self.max_steps,
+            "max_steps_without_eating": self.max_steps_without_eating,
+            "num_green_apples": num_green_apples,
+            "num_red_apples": num_red_apples,
+        }
+        for name, reward in zip(REWARDS, rewards):
+            self.board_options[name] = reward
+
+    def make_board(self) -> Board:
+        return Board(**self.board_options)
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(_HEADER.size)
+            while True:
+                record = f.read(_EPISODE.size)
+                if len(record) == 0:
+                    return
+                if len(record) < _EPISODE.size:
+                    raise ValueError(f"Error: Truncated episode in {self.path}")
+                num_actions, *rng_state = _EPISODE.unpack(record)
+                actions = f.read(num_actions)
+                if len(actions) < num_actions:
+                    raise ValueError(f"Error: Truncated episode in {self.path}")
+                yield Episode(_unpack_rng_state(*rng_state), actions)
+
+    def replay(self, episode: Episode, board: Board = None):
+        """
+        Play `episode` again on `board` (a new board by default)
+        yield (state, action, reward, next_state, done, truncated) per step
+        """
+        if board is None:
+            board = self.make_board()
+        board.rng.bit_generator.state = episode.rng_state
+        state = board.reset()
+        for action in episode.actions:
+            next_state, reward, done = board.step(MoveTo.from_id(action))
+            yield state, action, reward, next_state, done, board.truncated
+            state = next_state
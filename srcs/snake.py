@@ -1,14 +1,26 @@
-import copy
-
-from modules.parser import str_expected, int_expected
-from modules.environment import Board
+from modules.parser import (
+    str_expected, int_expected, int_range, float_range, validate_extention
+)
+from modules.config import RunConfig, apply_overrides, load_config
+from modules.environment import Board, MAX_BOARD_SIZE
+from modules.batch_environment import BatchBoard
 from modules.agent import QLearningAgent
+from modules.tabular_agent import TabularQAgent, make_agent, warm_start as warm_start_agent
+from modules.replay_buffer import ReplayBuffer
+from modules.actor_learner import ActorLearner
+from modules.checkpoint import save_checkpoint, load_checkpoint
+from modules.evaluation import evaluate_checkpoint
+from modules.profiler import PhaseTimer
+from modules.metrics import MetricsSink
+from modules.trajectory import TrajectoryWriter
+from modules.training import play_episodes
 
 import sys
+import time
+import itertools
 import argparse
 import matplotlib.pyplot as plt
-
-import torch
+import numpy as np
 
 from distutils.util import strtobool
 from tqdm import tqdm
@@ -17,62 +29,94 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
-def train(visual):
-    env = Board()
-    agent = QLearningAgent()
+def train(
+        visual,
+        sessions=10000,
+        random_state=None,
+        replay=False,
+        batch_size=32,
+        buffer_size=10000,
+        save=None,
+        load=None,
+        save_interval=100,
+        board_options=None,
+        agent_options=None,
+        profile=False,
+        trace=None,
+        metrics=None,
+        record=None,
+        agent_kind="dqn",
+        warm_start=None,
+):
+    """
+    board_options: Board arguments (size, apples, rewards, step limits)
+    agent_options: arguments of the agent_kind agent (see make_agent)
+    warm_start   : tabular checkpoint the QNet is fitted to before training
+    """
+    board_options = board_options or {}
+    env_seed, agent_seed, buffer_seed = np.random.SeedSequence(random_state).spawn(3)
+    env = Board(
+        seed=env_seed,
+        record_actions=True,  # the best episode can be replayed from its snapshot
+        **board_options,
+    )
+    writer = TrajectoryWriter(record, env) if record is not None else None
+    agent = make_agent(agent_kind, seed=agent_seed, **(agent_options or {}))
+    if warm_start is not None:
+        warm_start_from(warm_start, agent, env.board_size)
+    buffer = ReplayBuffer(capacity=buffer_size, seed=buffer_seed) if replay else None
+    timer = make_timer(profile, trace)
+    env.timer = agent.timer = timer
 
-    sessions = 10000
-    visualization_interval = sessions // 10
+    visualization_interval = max(1, sessions // 10)
 
+    session_count = 0
     max_len = 0
     max_len_itrs = 0
     max_len_rewards = 0
+    max_snapshot = None
+    metrics_sink = MetricsSink(metrics, window=visualization_interval)
+    if load is not None:
+        counters = load_checkpoint(load, agent, env=env, buffer=buffer, metrics=metrics_sink)
+        session_count = counters["session"]
+        max_len = counters["max_len"]
+        max_len_itrs = counters["max_len_itrs"]
+        max_len_rewards = counters["max_len_rewards"]
+        max_snapshot = counters.get("max_snapshot")
+    start_session = session_count
+    saved_session = None
+
+    def checkpoint():
+        nonlocal saved_session
+        counters = {
+            "session": session_count,
+            "max_len": max_len,
+            "max_len_itrs": max_len_itrs,
+            "max_len_rewards": max_len_rewards,
+            "max_snapshot": max_snapshot,
+        }
+        save_checkpoint(save, agent, counters, env=env, buffer=buffer, metrics=metrics_sink)
+        saved_session = session_count
 
-    max_board = None
-    loss_history = []
-    reward_history = []
-    snake_len_history = []
-    ave_len_history = []
-
-    for session in tqdm(range(sessions), desc="Training"):
-        state = env.reset()
-        total_loss = 0
-        total_reward = 0
-        itr = 0
-        done = False
-
-        # MAX_STEPS_PER_EPISODE = 100
-        while not done:
-            action = agent.get_action(state)
-            next_state, reward, done = env.step(action)
-
-            loss = agent.update(state, action, reward, next_state, done)
-            total_loss += loss
-            total_reward += reward
-            itr += 1
-            state = next_state
-
-        # if done and itr < MAX_STEPS_PER_EPISODE:
-        #     total_reward -= (MAX_STEPS_PER_EPISODE - itr)
-
-        average_loss = total_loss / itr
-        loss_history.append(average_loss)
-        reward_history.append(total_reward)
-        snake_len_history.append(len(env.snake))
-
-        recent_interval = min(visualization_interval, len(snake_len_history))
-        recent_average_len = sum(snake_len_history[-recent_interval:]) / recent_interval
-        ave_len_history.append(recent_average_len)
-
-        if max_len < len(env.snake):
-            max_len = len(env.snake)
+    progress = tqdm(range(start_session, sessions), initial=start_session, total=sessions,
+                    desc="Training")
+    episodes = play_episodes(env, agent, buffer, batch_size, timer)
+    for session, (snake_len, total_reward, itr, average_loss, state) in zip(progress, episodes):
+        if writer is not None:
+            writer.write(env)
+
+        row = metrics_sink.record(session + 1, average_loss, total_reward, snake_len, itr)
+        recent_average_len = row["ave_len"]
+        recent_interval = metrics_sink.ave_len.count
+
+        if max_len < snake_len:
+            max_len = snake_len
             max_len_itrs = itr
             max_len_rewards = total_reward
-            max_board = copy.deepcopy(env)
+            max_snapshot = env.snapshot()
 
         if visual == "on" and (session + 1 == 1 or (session + 1) % visualization_interval == 0):
-            q_values = agent.qnet(torch.tensor(state, dtype=torch.float32)).detach().numpy()
-            env.draw_with_q_values(q_values)
+            env.draw_with_q_values(agent.q_values(state))
             print(f"\nSession [{session + 1} / {sessions + 1}]")
             print(f"Itrs         : {itr}")
             print(f"Total Reward : {total_reward}")
@@ -81,34 +125,333 @@ def train(visual):
             print(f"Least Ave Len: {recent_average_len:.2f} at least {recent_interval} sessions")
             print(f"{'-' * 50}\n")
 
+        if timer.enabled and (session + 1) % visualization_interval == 0:
+            print(f"\nProfile after {session + 1} sessions:\n{timer.format_summary()}\n")
+
+        session_count = session + 1
+        if save is not None and session_count % save_interval == 0:
+            checkpoint()
+
+    # also when the loaded checkpoint had already reached `sessions`
+    if save is not None and saved_session != session_count:
+        checkpoint()
+
     print(f"max len: {max_len}")
-    print("board:")
-    max_board.draw()
+    if max_snapshot is not None:
+        max_board = Board(**board_options)
+        max_board.restore(max_snapshot)
+        print(f"board ({len(max_snapshot.actions)} actions recorded):")
+        max_board.draw()
+    finish_profile(timer, trace)
+    metrics_sink.close()
+    if writer is not None:
+        writer.close()
+        print(f"trajectories: {record} ({writer.num_episodes} episodes)")
+
+    plot_history(metrics_sink)
+
+
+def train_parallel(
+        visual,
+        workers,
+        sessions=10000,
+        random_state=None,
+        batch_size=32,
+        buffer_size=10000,
+        save=None,
+        load=None,
+        save_interval=100,
+        board_options=None,
+        agent_options=None,
+        profile=False,
+        trace=None,
+        metrics=None,
+        warm_start=None,
+):
+    """
+    Actor processes play, this process learns (see ActorLearner)
+    """
+    agent_seed, learner_seed = np.random.SeedSequence(random_state).spawn(2)
+    agent = QLearningAgent(seed=agent_seed, **(agent_options or {}))
+    if warm_start is not None:
+        warm_start_from(warm_start, agent, (board_options or {}).get("board_size", 10))
+    # only the learner is profiled, the actors run in other processes
+    timer = make_timer(profile, trace)
+    agent.timer = timer
+    learner = ActorLearner(
+        agent,
+        workers=workers,
+        batch_size=batch_size,
+        buffer_size=buffer_size,
+        seed=learner_seed,
+        env_options=board_options,
+        agent_options=agent_options,
+    )
+
+    start_session = 0
+    max_len = 0
+    metrics_sink = MetricsSink(metrics, window=max(1, sessions // 10))
+    if load is not None:
+        counters = load_checkpoint(load, agent, buffer=learner.buffer, metrics=metrics_sink)
+        start_session = counters["session"]
+        max_len = counters.get("max_len", 0)
+        learner.num_steps = counters["num_steps"]
+        learner.num_updates = counters["num_updates"]
+
+    def checkpoint(session, max_len):
+        if save is not None and (session % save_interval == 0 or sessions <= session):
+            counters = {
+                "session": session,
+                "max_len": max_len,
+                "num_steps": learner.num_steps,
+                "num_updates": learner.num_updates,
+            }
+            save_checkpoint(save, agent, counters, buffer=learner.buffer, metrics=metrics_sink)
+
+    start = time.perf_counter()
+    run = learner.run(sessions - start_session)
+    episodes = ((*stat, learner.last_loss) for stat in run)
+    if sessions <= start_session:
+        checkpoint(start_session, max_len)  # nothing was left to run, -save is still written
+    monitor_episodes(
+        visual, episodes, sessions, desc=f"Training ({workers} workers)", metrics_sink=metrics_sink,
+        start_session=start_session, max_len=max_len, on_episode=checkpoint, timer=timer
+    )
+    run.close()  # stop the actors
+
+    elapsed = time.perf_counter() - start
+    print(f"env steps: {learner.num_steps} ({learner.num_steps / elapsed:.0f} steps/s), "
+          f"updates: {learner.num_updates}")
+    finish_profile(timer, trace)
+    plot_history(metrics_sink)
+
+
+def train_vectorized(
+        visual,
+        envs,
+        sessions=10000,
+        random_state=None,
+        batch_size=32,
+        buffer_size=10000,
+        save=None,
+        load=None,
+        save_interval=100,
+        board_options=None,
+        agent_options=None,
+        profile=False,
+        trace=None,
+        metrics=None,
+        agent_kind="dqn",
+        warm_start=None,
+):
+    """
+    `envs` games in one BatchBoard, actions chosen with one batched forward pass
+    """
+    env_seed, agent_seed, buffer_seed = np.random.SeedSequence(random_state).spawn(3)
+    env = BatchBoard(num_envs=envs, seed=env_seed, **(board_options or {}))
+    agent = make_agent(agent_kind, seed=agent_seed, **(agent_options or {}))
+    if warm_start is not None:
+        warm_start_from(warm_start, agent, env.board_size)
+    buffer = ReplayBuffer(capacity=buffer_size, seed=buffer_seed)
+    timer = make_timer(profile, trace)
+    env.timer = agent.timer = timer
+
+    num_steps = 0
+
+    def play():
+        nonlocal num_steps
+        loss = 0
+        total_rewards = np.zeros(envs)
+        states = env.reset()
+        while True:
+            actions = agent.get_actions(states)
+            next_states, rewards, dones = env.step(actions)
+            with timer.phase("replay"):
+                # finished boards were reset: bootstrap from their last state, not the new game
+                last_states = np.where(dones[:, np.newaxis], env.final_states, next_states)
+                buffer.add_batch(states, actions, rewards, last_states, dones & ~env.truncated)
+                batch = buffer.sample(batch_size) if batch_size <= len(buffer) else None
+            if batch is not None:
+                loss, _ = agent.update_batch(*batch)
+
+            num_steps += envs
+            total_rewards += rewards
+            for i in np.flatnonzero(dones):
+                yield env.final_lengths[i], total_rewards[i], env.final_steps[i], loss
+                total_rewards[i] = 0
+            states = next_states
+
+    start_session = 0
+    max_len = 0
+    metrics_sink = MetricsSink(metrics, window=max(1, sessions // 10))
+    if load is not None:
+        # games that were in progress when the checkpoint was written start over
+        counters = load_checkpoint(load, agent, env=env, buffer=buffer, metrics=metrics_sink)
+        start_session = counters["session"]
+        max_len = counters.get("max_len", 0)
+
+    def checkpoint(session, max_len):
+        if save is not None and (session % save_interval == 0 or sessions <= session):
+            save_checkpoint(save, agent, {"session": session, "max_len": max_len}, env=env,
+                            buffer=buffer, metrics=metrics_sink)
 
+    start = time.perf_counter()
+    if sessions <= start_session:
+        checkpoint(start_session, max_len)  # nothing was left to run, -save is still written
+    monitor_episodes(
+        visual, play(), sessions, desc=f"Training ({envs} envs)", metrics_sink=metrics_sink,
+        start_session=start_session, max_len=max_len, on_episode=checkpoint, timer=timer
+    )
+
+    elapsed = time.perf_counter() - start
+    print(f"env steps: {num_steps} ({num_steps / elapsed:.0f} steps/s)")
+    finish_profile(timer, trace)
+    plot_history(metrics_sink)
+
+
+def monitor_episodes(
+        visual, episodes, sessions, desc, metrics_sink, start_session=0, max_len=0,
+        on_episode=None, timer=None
+):
+    """
+    Record (snake length, total reward, steps, loss) of episodes until `sessions` are done
+    metrics_sink : MetricsSink the episodes are recorded to (closed at the end)
+    start_session, max_len: where a resumed run left off
+    on_episode(number of finished sessions, max len) is called after every episode
+    timer        : enabled PhaseTimer whose summary is printed periodically
+    """
+    visualization_interval = max(1, sessions // 10)
+
+    progress = tqdm(itertools.islice(episodes, sessions - start_session),
+                    initial=start_session, total=sessions, desc=desc)
+    for session, (snake_len, total_reward, itr, loss) in enumerate(progress, start=start_session):
+        row = metrics_sink.record(session + 1, loss, total_reward, snake_len, itr)
+        recent_average_len = row["ave_len"]
+        recent_interval = metrics_sink.ave_len.count
+        max_len = max(max_len, snake_len)
+
+        if visual == "on" and (session + 1 == 1 or (session + 1) % visualization_interval == 0):
+            print(f"\nSession [{session + 1} / {sessions + 1}]")
+            print(f"Itrs         : {itr}")
+            print(f"Total Reward : {total_reward}")
+            print(f"Loss         : {loss:.1f}")
+            print(f"Max Len      : {max_len}")
+            print(f"Least Ave Len: {recent_average_len:.2f} at least {recent_interval} sessions")
+            print(f"{'-' * 50}\n")
+
+        if timer is not None and timer.enabled and (session + 1) % visualization_interval == 0:
+            print(f"\nProfile after {session + 1} sessions:\n{timer.format_summary()}\n")
+
+        if on_episode is not None:
+            on_episode(session + 1, max_len)
+
+    print(f"max len: {max_len}")
+    metrics_sink.close()
+
+
+def warm_start_from(path, agent, board_size):
+    """
+    Fit the QNet of `agent` to the table of the TabularQAgent checkpoint at `path`
+    """
+    if not isinstance(agent, QLearningAgent):
+        raise ValueError("Error: -warm_start fits the QNet of a dqn agent")
+    table_agent = TabularQAgent(board_size=board_size)
+    load_checkpoint(path, table_agent)
+    loss = warm_start_agent(agent, table_agent)
+    print(f"warm start: {len(table_agent.table)} states of {path} (loss {loss:.3f})")
+
+
+def make_timer(profile, trace):
+    """
+    Shared PhaseTimer of the env and the agent, a Chrome trace implies profiling
+    """
+    return PhaseTimer(enabled=profile or trace is not None, trace=trace is not None)
+
+
+def finish_profile(timer, trace):
+    if not timer.enabled:
+        return
+    print(f"\nProfile:\n{timer.format_summary()}")
+    if trace is not None:
+        timer.write_trace(trace)
+        print(f"Chrome trace: {trace} ({len(timer.events)} events)")
+
+
+def plot_history(metrics_sink: MetricsSink):
+    """
+    Plot the decimated history of the run
+    """
+    history = metrics_sink.columns()
+    episodes = history["session"]
     fig, (ax1, ax2, ax3, ax4) = plt.subplots(4, 1, figsize=(10, 10))
 
     ax1.set_xlabel('Episode')
     ax1.set_ylabel('Loss')
-    ax1.plot(loss_history)
+    ax1.plot(episodes, history["loss"])
 
     ax2.set_xlabel('Episode')
     ax2.set_ylabel('Total Reward')
-    ax2.plot(reward_history)
+    ax2.plot(episodes, history["reward"])
 
     ax3.set_xlabel('Episode')
     ax3.set_ylabel('Length')
-    ax3.plot(snake_len_history)
+    ax3.plot(episodes, history["length"])
 
     ax4.set_xlabel('Episode')
     ax4.set_ylabel('Ave Length')
-    ax4.plot(ave_len_history)
+    ax4.plot(episodes, history["ave_len"])
 
     plt.tight_layout()
     plt.show()
 
 
-def main(visual, random_state: int = 42):
-    train(visual)
+def evaluate(load, episodes, workers=0, random_state=None, record=None, board_options=None,
+             agent_options=None):
+    """
+    Greedy rollouts of the `load` checkpoint, no training, no drawing
+    """
+    if load is None:
+        raise ValueError("Error: -eval needs a checkpoint to -load")
+    report = evaluate_checkpoint(
+        load, episodes, agent_options=agent_options, workers=workers, seed=random_state,
+        record=record, **(board_options or {})
+    )
+    report.print()
+    return report
+
+
+def main(visual, config: RunConfig = None, eval_mode=False, eval_episodes=1000, **run_options):
+    """
+    config     : board, agent and training length of the run (defaults without one)
+    run_options: save, load, profile, trace, metrics, record, warm_start
+    """
+    config = config or RunConfig()
+    workers = config.train.workers
+    envs = config.train.envs
+    if config.agent.kind == "tabular" and (eval_mode or 0 < workers):
+        raise ValueError("Error: A tabular agent trains in this process only (no -eval, -workers)")
+    train_options = {
+        "sessions": config.train.sessions,
+        "random_state": config.train.seed,
+        "batch_size": config.train.batch_size,
+        "buffer_size": config.train.buffer_size,
+        "save_interval": config.train.save_interval,
+        "board_options": config.board_options(),
+        "agent_options": config.agent_options(),
+        **run_options,
+    }
+    if eval_mode:
+        evaluate(run_options.get("load"), eval_episodes, workers, config.train.seed,
+                 run_options.get("record"), train_options["board_options"],
+                 train_options["agent_options"])
+    elif 0 < workers:
+        train_options.pop("record", None)  # only single board training records games
+        train_parallel(visual, workers, **train_options)  # actors always feed a replay buffer
+    elif 1 < envs:
+        train_options.pop("record", None)
+        train_vectorized(visual, envs, agent_kind=config.agent.kind, **train_options)
+    else:
+        train(visual, replay=config.train.replay, agent_kind=config.agent.kind, **train_options)
 
 
 def parse_arguments():
@@ -131,27 +474,197 @@ def parse_arguments():
         type=str,
         help="Path to model save"
     )
+    parser.add_argument(
+        "-config",
+        type=validate_extention([".toml"]),
+        help="TOML run config with [board], [agent] and [train] tables"
+    )
+    parser.add_argument(
+        "-set",
+        action="append",
+        default=[],
+        metavar="SECTION.NAME=VALUE",
+        help="Override one run config option, repeatable (applied after the other flags)"
+    )
+    parser.add_argument(
+        "-board_size",
+        type=int_range(2, MAX_BOARD_SIZE),
+        help="Width and height of the board [board.board_size]"
+    )
     parser.add_argument(
         "-sessions",
         type=int_expected([1, 10, 100]),
-        default=10,
-        help="Path to model save"
+        help="Number of training sessions [train.sessions]"
     )
     parser.add_argument(
         "-eval",
         type=strtobool,
         default=0,
-        help="Eval mode: true or false"
+        help="Eval mode: greedy rollouts of the -load checkpoint, true or false"
+    )
+    parser.add_argument(
+        "-eval_episodes",
+        type=int_range(1, 10_000_000),
+        default=1000,
+        help="Number of greedy episodes in eval mode"
+    )
+    parser.add_argument(
+        "-replay",
+        type=strtobool,
+        help="Train from an experience replay buffer: true or false [train.replay]"
+    )
+    parser.add_argument(
+        "-batch_size",
+        type=int_range(1, 4096),
+        help="Minibatch size of replay updates [train.batch_size]"
+    )
+    parser.add_argument(
+        "-buffer_size",
+        type=int_range(1, 10_000_000),
+        help="Capacity of the replay buffer [train.buffer_size]"
+    )
+    parser.add_argument(
+        "-target_update",
+        type=int_range(0, 1_000_000),
+        help="Hard-sync the target network every N updates (0: off) [agent.target_update]"
+    )
+    parser.add_argument(
+        "-tau",
+        type=float_range(0.0, 1.0),
+        help="Soft target network update factor (0: off) [agent.tau]"
+    )
+    parser.add_argument(
+        "-double_dqn",
+        type=strtobool,
+        help="Double DQN targets: true or false [agent.double_dqn]"
+    )
+    parser.add_argument(
+        "-workers",
+        type=int_range(0, 256),
+        help="Number of actor processes (0: single process training), "
+             "eval rollout processes [train.workers]"
+    )
+    parser.add_argument(
+        "-envs",
+        type=int_range(1, 65536),
+        help="Number of games played in lockstep in one process [train.envs]"
+    )
+    parser.add_argument(
+        "-save_interval",
+        type=int_range(1, 1_000_000_000),
+        help="Write the -save checkpoint every N sessions [train.save_interval]"
+    )
+    parser.add_argument(
+        "-max_steps",
+        type=int_range(0, 1_000_000_000),
+        help="Truncate an episode after N steps (0: no limit) [board.max_steps]"
+    )
+    parser.add_argument(
+        "-max_steps_without_eating",
+        type=int_range(0, 1_000_000_000),
+        help="Truncate an episode after N steps without a green apple (0: no limit) "
+             "[board.max_steps_without_eating]"
+    )
+    parser.add_argument(
+        "-profile",
+        type=strtobool,
+        default=0,
+        help="Print the time spent per hot path phase: true or false"
+    )
+    parser.add_argument(
+        "-trace",
+        type=validate_extention([".json"]),
+        help="Write the hot path phases as a Chrome trace JSON file"
+    )
+    parser.add_argument(
+        "-metrics",
+        type=validate_extention([".csv", ".jsonl"]),
+        help="Append one line per episode to this CSV or JSONL file"
+    )
+    parser.add_argument(
+        "-warm_start",
+        type=str,
+        help="Fit the QNet to this tabular agent checkpoint before training"
+    )
+    parser.add_argument(
+        "-record",
+        type=validate_extention([".traj"]),
+        help="Write every episode (start RNG state and actions) to this trajectory file"
     )
     return parser.parse_args()
 
 
+# flags that override one run config option, None when not given
+CONFIG_FLAGS = {
+    "sessions": "train.sessions",
+    "replay": "train.replay",
+    "batch_size": "train.batch_size",
+    "buffer_size": "train.buffer_size",
+    "workers": "train.workers",
+    "envs": "train.envs",
+    "save_interval": "train.save_interval",
+    "target_update": "agent.target_update",
+    "tau": "agent.tau",
+    "double_dqn": "agent.double_dqn",
+    "board_size": "board.board_size",
+    "max_steps": "board.max_steps",
+    "max_steps_without_eating": "board.max_steps_without_eating",
+}
+
+
+def build_config(args) -> RunConfig:
+    """
+    Run config of the -config file (defaults without one), then the flags, then -set
+    """
+    config = load_config(args.config)
+    for flag, key in CONFIG_FLAGS.items():
+        value = getattr(args, flag)
+        if value is not None:
+            config = config.override(key, value)
+    return apply_overrides(config, args.set)
+
+
 if __name__ == "__main__":
     args = parse_arguments()
+    try:
+        config = build_config(args)
+    except (OSError, ValueError) as e:
+        sys.exit(e)
+    board, agent, train_config = config.board, config.agent, config.train
     print("args:")
     print(f" visual  : {args.visual}")
+    print(f" config  : {args.config} (overrides: {args.set})")
     print(f" load    : {args.load}")
-    print(f" save    : {args.save}")
-    print(f" sessions: {args.sessions}")
-    print(f" eval    : {bool(args.eval)}")
-    main(visual=args.visual)
+    print(f" save    : {args.save} (every {train_config.save_interval} sessions)")
+    print(f" sessions: {train_config.sessions} (seed: {train_config.seed})")
+    print(f" eval    : {bool(args.eval)} (episodes: {args.eval_episodes})")
+    print(f" replay  : {train_config.replay} "
+          f"(batch: {train_config.batch_size}, buffer: {train_config.buffer_size})")
+    print(f" workers : {train_config.workers}")
+    print(f" envs    : {train_config.envs}")
+    print(f" board   : {board.board_size}x{board.board_size}, "
+          f"apples {board.num_green_apples} green / {board.num_red_apples} red")
+    print(f" rewards : move {board.reward_just_move}, green {board.reward_eat_green_apple}, "
+          f"red {board.reward_eat_red_apple}, game over {board.reward_game_over}")
+    print(f" limits  : {board.max_steps} steps, {board.max_steps_without_eating} without eating")
+    print(f" agent   : {agent.kind}, gamma {agent.gamma}, lr {agent.lr}, epsilon {agent.epsilon} "
+          f"(min {agent.epsilon_min}, decay {agent.epsilon_decay}), "
+          f"hidden {agent.hidden_sizes}")
+    print(f" target  : update {agent.target_update}, tau {agent.tau}, double {agent.double_dqn}")
+    print(f" profile : {bool(args.profile)} (trace: {args.trace})")
+    print(f" metrics : {args.metrics}")
+    print(f" record  : {args.record}")
+    print(f" warm    : {args.warm_start}")
+    main(
+        visual=args.visual,
+        config=config,
+        eval_mode=bool(args.eval),
+        eval_episodes=args.eval_episodes,
+        save=args.save,
+        load=args.load,
+        profile=bool(args.profile),
+        trace=args.trace,
+        metrics=args.metrics,
+        record=args.record,
+        warm_start=args.warm_start,
+    )
@@ -0,0 +1,165 @@
+from modules.parser import str_expected, int_range, float_range, validate_extention
+from modules.config import load_config
+from modules.sweep import flatten_space, grid, random_search, run_sweep, format_table, write_table
+
+import sys
+import argparse
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def load_space(path: str) -> dict:
+    """
+    Search space TOML file, one table per run config section:
+        [agent]
+        lr = {low = 0.0001, high = 0.1, log = true}
+        hidden_sizes = [[100, 16], [64, 32]]
+    """
+    with open(path, "rb") as f:
+        return flatten_space(tomllib.load(f))
+
+
+def main(space_path, search="grid", trials=20, seed=0, config=None, overrides=(), workers=0,
+         cpu_budget=None, prune_interval=0, prune_warmup=0, window=100, output=None, top=None):
+    base = load_config(config, overrides)
+    space = load_space(space_path)
+    if search == "grid":
+        trial_params = grid(space)
+    else:
+        trial_params = random_search(space, trials, seed=seed)
+
+    print(f"{len(trial_params)} trials of {base.train.sessions} sessions, {workers} workers, "
+          f"cpu budget: {cpu_budget or 'none'}")
+
+    def on_result(result):
+        print(f"trial {result.trial_id:4d}: {result.status:8} after {result.sessions} sessions, "
+              f"ave len {result.ave_len:.2f} ({result.cpu_time:.1f}s) {result.params}"
+              + (f" {result.error}" if result.error else ""))
+
+    results = run_sweep(
+        base,
+        trial_params,
+        workers=workers,
+        cpu_budget=cpu_budget,
+        prune_interval=prune_interval,
+        prune_warmup=prune_warmup,
+        window=window,
+        on_result=on_result,
+    )
+    print(f"\n{format_table(results, top=top)}")
+    if output is not None:
+        write_table(results, output)
+        print(f"results: {output}")
+    return results
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Snake hyperparameter sweep"
+    )
+    parser.add_argument(
+        "-space",
+        type=validate_extention([".toml"]),
+        required=True,
+        help="TOML search space: lists of choices or {low, high, log} ranges per option"
+    )
+    parser.add_argument(
+        "-search",
+        type=str_expected(["grid", "random"]),
+        default="grid",
+        help="grid: every combination, random: -trials draws"
+    )
+    parser.add_argument(
+        "-trials",
+        type=int_range(1, 100_000),
+        default=20,
+        help="Number of random search trials"
+    )
+    parser.add_argument(
+        "-seed",
+        type=int_range(0, 2**32 - 1),
+        default=0,
+        help="Seed of the random search"
+    )
+    parser.add_argument(
+        "-config",
+        type=validate_extention([".toml"]),
+        help="Base run config the trials start from"
+    )
+    parser.add_argument(
+        "-set",
+        action="append",
+        default=[],
+        metavar="SECTION.NAME=VALUE",
+        help="Override one option of the base run config, repeatable"
+    )
+    parser.add_argument(
+        "-workers",
+        type=int_range(0, 256),
+        default=0,
+        help="Trials run in parallel, one CPU thread each (0: one after the other)"
+    )
+    parser.add_argument(
+        "-cpu_budget",
+        type=float_range(0.0, 1e9),
+        default=0.0,
+        help="CPU seconds per trial (0: no limit)"
+    )
+    parser.add_argument(
+        "-prune_interval",
+        type=int_range(0, 1_000_000_000),
+        default=0,
+        help="Stop trials below the median every N sessions (0: off)"
+    )
+    parser.add_argument(
+        "-prune_warmup",
+        type=int_range(0, 1_000_000_000),
+        default=0,
+        help="Sessions before the first pruning decision"
+    )
+    parser.add_argument(
+        "-window",
+        type=int_range(1, 1_000_000),
+        default=100,
+        help="Episodes in the final average length"
+    )
+    parser.add_argument(
+        "-output",
+        type=validate_extention([".csv", ".jsonl"]),
+        help="Write the results table to a CSV or JSONL file"
+    )
+    parser.add_argument(
+        "-top",
+        type=int_range(1, 100_000),
+        help="Only print the N best trials"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    try:
+        main(
+            args.space,
+            search=args.search,
+            trials=args.trials,
+            seed=args.seed,
+            config=args.config,
+            overrides=args.set,
+            workers=args.workers,
+            cpu_budget=args.cpu_budget or None,
+            prune_interval=args.prune_interval,
+            prune_warmup=args.prune_warmup,
+            window=args.window,
+            output=args.output,
+            top=args.top,
+        )
+    except (OSError, ValueError) as e:
+        sys.exit(e)
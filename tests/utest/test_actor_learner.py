@@ -0,0 +1,29 @@
+from srcs.modules.actor_learner import ActorLearner
+from srcs.modules.agent import QLearningAgent
+
+import pytest
+import torch
+
+
+class TestActorLearner:
+    def test_run_with_workers(self):
+        agent = QLearningAgent(seed=0)
+        initial = [p.clone() for p in agent.qnet.parameters()]
+        learner = ActorLearner(agent, workers=2, batch_size=16, chunk_size=16, seed=0)
+
+        episodes = list(learner.run(episodes=20))
+        assert len(episodes) == 20
+        for snake_len, total_reward, itr in episodes:
+            assert 0 <= snake_len
+            assert 0 < itr
+
+        assert 0 < learner.num_steps
+        assert 0 < learner.num_updates
+        assert len(learner.buffer) == min(learner.num_steps, learner.buffer.capacity)
+        assert not all(torch.equal(p, q) for p, q in zip(agent.qnet.parameters(), initial))
+        # actors are stopped when the run ends
+        assert learner._processes == []
+
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            ActorLearner(QLearningAgent(seed=0), workers=0)
@@ -0,0 +1,84 @@
+from srcs.modules.agent import FusedQNet, QLearningAgent, QNet
+from srcs.modules.environment import Board, MoveTo
+
+import numpy as np
+import pytest
+import torch
+
+
+class TestFusedQNet:
+    @pytest.mark.parametrize("hidden_sizes, batch_size", [
+        ((100, 16), 1),
+        ((100, 16), 64),
+        ((8,), 3),
+        ((32, 32, 8), 5), ])
+    def test_matches_qnet(self, hidden_sizes, batch_size):
+        torch.manual_seed(0)
+        qnet = QNet(16, hidden_sizes=hidden_sizes)
+        states = np.random.default_rng(0).random((batch_size, 16), dtype=np.float32) * 10
+        expected = qnet(torch.from_numpy(states)).detach().numpy()
+        fused = FusedQNet(qnet)
+        assert np.allclose(fused.forward(states), expected, atol=1e-5)
+        # the buffers are reused across batch sizes
+        assert np.allclose(fused.forward(states[:1]), expected[:1], atol=1e-5)
+        assert np.allclose(fused.forward(states), expected, atol=1e-5)
+
+    def test_snapshot_until_refresh(self):
+        torch.manual_seed(0)
+        qnet = QNet(16)
+        fused = FusedQNet(qnet)
+        states = np.ones((1, 16), dtype=np.float32)
+        before = fused.forward(states).copy()
+
+        with torch.no_grad():
+            for parameter in qnet.parameters():
+                parameter.add_(0.1)
+        assert np.array_equal(fused.forward(states), before)
+
+        fused.refresh(qnet)
+        expected = qnet(torch.from_numpy(states)).detach().numpy()
+        assert np.allclose(fused.forward(states), expected, atol=1e-5)
+
+
+class TestFusedInferenceAgent:
+    def test_same_actions_as_torch(self):
+        agents = [QLearningAgent(seed=0, epsilon=0.0, epsilon_min=0.0),
+                  QLearningAgent(seed=0, epsilon=0.0, epsilon_min=0.0, fused_inference=True)]
+        board = Board(seed=0)
+        state = board.reset()
+        for _ in range(200):
+            actions = [agent.get_action(state) for agent in agents]
+            assert actions[0] == actions[1]
+            next_state, reward, done = board.step(MoveTo.from_id(actions[0]))
+            for agent in agents:
+                agent.update(state, actions[0], reward, next_state, board.terminated)
+            state = board.reset() if done else next_state
+
+        states = np.stack([Board(seed=seed).reset()[0] for seed in range(32)])
+        assert np.array_equal(agents[0].get_actions(states), agents[1].get_actions(states))
+
+    def test_external_weight_changes(self):
+        agent = QLearningAgent(seed=0, epsilon=0.0, epsilon_min=0.0, fused_inference=True)
+        other = QLearningAgent(seed=1)
+        state = np.ones((1, 16), dtype=np.float32)
+        agent.get_action(state)
+
+        agent.qnet.load_state_dict(other.qnet.state_dict())
+        expected = other.qnet.l1.weight.detach().numpy().T
+        agent.get_action(state)
+        assert not np.array_equal(agent.fused_qnet.weights[0], expected)
+
+        agent.weights_changed()
+        agent.get_action(state)
+        assert np.array_equal(agent.fused_qnet.weights[0], expected)
+
+    def test_load_state_dict_refreshes(self):
+        agent = QLearningAgent(seed=0, fused_inference=True)
+        other = QLearningAgent(seed=1)
+        agent.get_action(np.ones((1, 16), dtype=np.float32))
+        agent.load_state_dict(other.state_dict())
+        agent.epsilon = 0.0
+        agent.epsilon_min = 0.0
+        agent.get_action(np.ones((1, 16), dtype=np.float32))
+        assert np.array_equal(agent.fused_qnet.weights[-1],
+                              other.qnet.l3.weight.detach().numpy().T)
@@ -0,0 +1,45 @@
+from srcs.modules.agent import QLearningAgent
+
+import numpy as np
+import pytest
+import torch
+
+
+BATCH_SIZE = 32
+
+
+@pytest.fixture
+def states():
+    return np.random.default_rng(0).integers(0, 10, size=(BATCH_SIZE, 16)).astype(np.float32)
+
+
+class TestAgentGetActions:
+    def test_greedy_actions_match_qnet(self, states):
+        agent = QLearningAgent(seed=0)
+        agent.epsilon = agent.epsilon_min = 0.0
+
+        actions = agent.get_actions(states)
+        with torch.no_grad():
+            expected = agent.qnet(torch.from_numpy(states)).argmax(dim=1).numpy()
+        assert actions.shape == (BATCH_SIZE,)
+        assert np.array_equal(actions, expected)
+        assert all(agent.get_action(state[np.newaxis, :]) == a for state, a in zip(states, actions))
+
+    def test_random_actions(self, states):
+        agent = QLearningAgent(seed=0)
+        agent.epsilon = agent.epsilon_min = 1.0
+
+        actions = np.concatenate([agent.get_actions(states) for _ in range(20)])
+        assert set(actions.tolist()) == {0, 1, 2, 3}
+
+    def test_epsilon_decays_once_per_action(self, states):
+        agent = QLearningAgent(seed=0)
+        epsilon = agent.epsilon
+        agent.get_actions(states)
+        assert agent.epsilon == pytest.approx(epsilon * agent.epsilon_decay ** BATCH_SIZE)
+
+    def test_same_seed_same_actions(self, states):
+        agents = [QLearningAgent(seed=3) for _ in range(2)]
+        for agent in agents:
+            agent.epsilon = agent.epsilon_min = 0.5
+        assert np.array_equal(agents[0].get_actions(states), agents[1].get_actions(states))
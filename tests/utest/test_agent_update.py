@@ -0,0 +1,112 @@
+from srcs.modules.agent import QLearningAgent
+
+import numpy as np
+import pytest
+import torch
+
+
+BATCH_SIZE = 8
+
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(0)
+    return (
+        rng.integers(0, 10, size=(BATCH_SIZE, 16)).astype(np.float32),
+        rng.integers(0, 4, size=BATCH_SIZE),
+        rng.choice([-1.0, 50.0, -20.0, -100.0], size=BATCH_SIZE).astype(np.float32),
+        rng.integers(0, 10, size=(BATCH_SIZE, 16)).astype(np.float32),
+        rng.random(BATCH_SIZE) < 0.3,
+    )
+
+
+class TestAgentUpdate:
+    def test_update_batch_returns_loss_and_td_errors(self, batch):
+        agent = QLearningAgent(seed=0)
+        loss, td_errors = agent.update_batch(*batch)
+        assert td_errors.shape == (BATCH_SIZE,)
+        assert loss == pytest.approx(np.mean(td_errors ** 2), rel=1e-5)
+
+    def test_td_errors_of_terminal_transitions(self, batch):
+        states, actions, rewards, next_states, _ = batch
+        dones = np.ones(BATCH_SIZE, dtype=bool)
+        agent = QLearningAgent(seed=0)
+        with torch.no_grad():
+            q = agent.qnet(torch.from_numpy(states))[np.arange(BATCH_SIZE), actions].numpy()
+
+        _, td_errors = agent.update_batch(states, actions, rewards, next_states, dones)
+        assert np.allclose(td_errors, rewards - q, atol=1e-4)
+
+    def test_update_equals_batch_of_one(self, batch):
+        states, actions, rewards, next_states, dones = batch
+        single = QLearningAgent(seed=1)
+        batched = QLearningAgent(seed=1)
+
+        loss = single.update(
+            states[:1], int(actions[0]), float(rewards[0]), next_states[:1], bool(dones[0])
+        )
+        batch_loss, _ = batched.update_batch(
+            states[:1], actions[:1], rewards[:1], next_states[:1], dones[:1]
+        )
+        assert loss == pytest.approx(batch_loss)
+        for expected, actual in zip(single.qnet.parameters(), batched.qnet.parameters()):
+            assert torch.equal(expected, actual)
+
+    def test_repeated_updates_reduce_loss(self, batch):
+        agent = QLearningAgent(seed=2)
+        first_loss, _ = agent.update_batch(*batch)
+        for _ in range(200):
+            loss, _ = agent.update_batch(*batch)
+        assert loss < first_loss
+
+
+def _same_weights(a: torch.nn.Module, b: torch.nn.Module) -> bool:
+    return all(torch.equal(p, q) for p, q in zip(a.parameters(), b.parameters()))
+
+
+class TestAgentTargetNetwork:
+    def test_no_target_network_by_default(self):
+        assert QLearningAgent(seed=0).target_qnet is None
+
+    def test_hard_sync(self, batch):
+        agent = QLearningAgent(seed=0, target_update=3)
+        initial = [p.clone() for p in agent.target_qnet.parameters()]
+
+        agent.update_batch(*batch)
+        agent.update_batch(*batch)
+        # frozen between syncs
+        assert all(torch.equal(p, q) for p, q in zip(agent.target_qnet.parameters(), initial))
+        assert not _same_weights(agent.target_qnet, agent.qnet)
+
+        agent.update_batch(*batch)
+        assert _same_weights(agent.target_qnet, agent.qnet)
+
+    def test_soft_sync(self, batch):
+        agent = QLearningAgent(seed=0, tau=0.1)
+        before = [p.clone() for p in agent.target_qnet.parameters()]
+        agent.update_batch(*batch)
+        for old, target, online in zip(before, agent.target_qnet.parameters(),
+                                       agent.qnet.parameters()):
+            assert torch.allclose(target, 0.9 * old + 0.1 * online, atol=1e-6)
+
+    def test_target_network_is_not_trained(self, batch):
+        agent = QLearningAgent(seed=0, target_update=1000)
+        agent.update_batch(*batch)
+        assert all(p.grad is None for p in agent.target_qnet.parameters())
+
+    def test_double_dqn_bootstrap(self):
+        agent = QLearningAgent(seed=0, target_update=1000, double_dqn=True)
+        for p in agent.target_qnet.parameters():
+            torch.nn.init.normal_(p)
+        next_states = torch.rand(BATCH_SIZE, 16) * 10
+
+        with torch.no_grad():
+            next_actions = agent.qnet(next_states).argmax(dim=1)
+            expected = agent.target_qnet(next_states)[torch.arange(BATCH_SIZE), next_actions]
+            actual = agent._bootstrap_q(next_states)
+        assert torch.allclose(actual, expected)
+
+    @pytest.mark.parametrize("options", [{"target_update": -1}, {"tau": 1.5}, {"tau": -0.1}])
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            QLearningAgent(**options)
@@ -35,6 +35,26 @@ class TestSnakeArgument:
         assert args.sessions == 10
         assert not args.eval
 
+    def test_config_from_flags(self, tmp_path):
+        path = tmp_path / "run.toml"
+        path.write_text("[board]\nboard_size = 20\n[train]\nsessions = 500\nenvs = 4\n")
+        sys.argv = dict_to_argv(self.filename, {
+            **self.base_args, "config": str(path), "board_size": "12", "tau": "0.5",
+            "max_steps_without_eating": "0",
+        }) + ["-set", "agent.hidden_sizes=[32, 8]", "-set", "train.envs=8"]
+        config = snake.build_config(snake.parse_arguments())
+        assert config.board.board_size == 12
+        assert config.board_options()["max_steps_without_eating"] is None
+        assert config.agent.tau == 0.5
+        assert config.agent.hidden_sizes == [32, 8]
+        assert config.train.sessions == 10
+        assert config.train.envs == 8
+
+    def test_config_defaults_without_flags(self):
+        sys.argv = dict_to_argv(self.filename, {"visual": "off"})
+        config = snake.build_config(snake.parse_arguments())
+        assert config == snake.RunConfig()
+
     @pytest.mark.parametrize("field, value, expected_error", [
         ("visual",  "",            SystemExit),
         ("visual",  " ",           SystemExit),
@@ -64,7 +84,27 @@ class TestSnakeArgument:
         ("eval",    "-1",   SystemExit),
         ("eval",    "10",   SystemExit),
         ("eval",    "ok",   SystemExit),
-        ("eval",    "non",  SystemExit), ])
+        ("eval",    "non",  SystemExit),
+
+        ("replay",      "ok",   SystemExit),
+        ("batch_size",  "0",    SystemExit),
+        ("batch_size",  "4097", SystemExit),
+        ("batch_size",  "a",    SystemExit),
+        ("buffer_size", "0",    SystemExit),
+        ("buffer_size", "1.5",  SystemExit),
+        ("workers",     "-1",   SystemExit),
+        ("workers",     "257",  SystemExit),
+        ("envs",        "0",    SystemExit),
+        ("save_interval", "0",  SystemExit),
+        ("eval_episodes", "0",  SystemExit),
+        ("max_steps",   "-1",   SystemExit),
+        ("max_steps_without_eating", "-1", SystemExit),
+        ("trace",       "trace.txt",   SystemExit),
+        ("metrics",     "metrics.txt", SystemExit),
+        ("record",      "games.bin",   SystemExit),
+        ("config",      "run.yaml",    SystemExit),
+        ("board_size",  "1",    SystemExit),
+        ("board_size",  "1001", SystemExit), ])
     def test_invalid_arguments(self, field, value, expected_error):
         invalid_args = self.base_args.copy()
         invalid_args[field] = value
@@ -91,7 +131,29 @@ class TestSnakeArgument:
         ("eval", "yes",     True),
         ("eval", "false",   False),
         ("eval", "0",       False),
-        ("eval", "no",      False), ])
+        ("eval", "no",      False),
+
+        ("replay",      "true", True),
+        ("replay",      "0",    False),
+        ("batch_size",  "1",    1),
+        ("batch_size",  "4096", 4096),
+        ("buffer_size", "1",    1),
+        ("buffer_size", "10000000", 10000000),
+        ("workers",     "0",    0),
+        ("workers",     "16",   16),
+        ("envs",        "256",  256),
+        ("save_interval", "1",  1),
+        ("eval_episodes", "20000", 20000),
+        ("max_steps",   "0",    0),
+        ("max_steps",   "500",  500),
+        ("max_steps_without_eating", "100", 100),
+        ("trace",       "trace.json",  "trace.json"),
+        ("metrics",     "metrics.csv", "metrics.csv"),
+        ("metrics",     "metrics.jsonl", "metrics.jsonl"),
+        ("record",      "games.traj",  "games.traj"),
+        ("config",      "run.toml",    "run.toml"),
+        ("board_size",  "20",   20),
+        ("board_size",  "1000", 1000), ])
     def test_valid_argument_variations(self, field, value, expected):
         valid_args = self.base_args.copy()
         valid_args[field] = value
@@ -0,0 +1,131 @@
+from srcs.modules.batch_environment import (
+    BatchBoard, GREEN_APPLE, RED_APPLE, SNAKE_HEAD, SNAKE_BODY
+)
+from srcs.modules.environment import Board, MoveTo
+
+import numpy as np
+import pytest
+
+
+NUM_ENVS = 16
+
+
+@pytest.fixture
+def batch_board():
+    return BatchBoard(num_envs=NUM_ENVS, board_size=10, seed=42)
+
+
+def _random_actions(rng, num_envs):
+    return rng.integers(0, 4, size=num_envs)
+
+
+class TestBatchBoard:
+    def test_output_shapes(self, batch_board):
+        states = batch_board.reset()
+        assert states.shape == (NUM_ENVS, 16)
+        assert states.dtype == np.float32
+
+        actions = _random_actions(np.random.default_rng(0), NUM_ENVS)
+        states, rewards, dones = batch_board.step(actions)
+        assert states.shape == (NUM_ENVS, 16)
+        assert rewards.shape == (NUM_ENVS,)
+        assert dones.shape == (NUM_ENVS,)
+        assert dones.dtype == bool
+
+    def test_board_invariants(self, batch_board):
+        rng = np.random.default_rng(0)
+        for _ in range(300):
+            batch_board.step(_random_actions(rng, NUM_ENVS))
+            for i in range(NUM_ENVS):
+                grid = batch_board.grid[i, :batch_board.num_cells]
+                assert np.count_nonzero(grid == SNAKE_HEAD) == 1
+                assert np.count_nonzero(grid == SNAKE_BODY) == batch_board.lengths[i] - 1
+                assert np.count_nonzero(grid == GREEN_APPLE) == batch_board.NUM_OF_GREEN_APPLES
+                assert np.count_nonzero(grid == RED_APPLE) == batch_board.NUM_OF_RED_APPLES
+                assert len(batch_board.snake(i)) == batch_board.lengths[i]
+
+    def test_encode_states_matches_board(self, batch_board):
+        """
+        Every batched state equals the single Board encoding of the same position
+        """
+        rng = np.random.default_rng(1)
+        board = Board(board_size=10)
+        states = batch_board.reset()
+        for _ in range(100):
+            for i in range(NUM_ENVS):
+                board.snake = batch_board.snake(i)
+                board.green_apples = batch_board.apples(i, GREEN_APPLE)
+                board.red_apples = batch_board.apples(i, RED_APPLE)
+                board.update_board()
+                assert np.array_equal(board._encode_state()[0], states[i])
+            states, _, _ = batch_board.step(_random_actions(rng, NUM_ENVS))
+
+    def test_rewards_and_auto_reset(self, batch_board):
+        rng = np.random.default_rng(2)
+        expected_rewards = {
+            batch_board.REWARD_JUST_MOVE,
+            batch_board.REWARD_EAT_GREEN_APPLE,
+            batch_board.REWARD_EAT_RED_APPLE,
+            batch_board.REWARD_GAME_OVER,
+        }
+        num_done = 0
+        for _ in range(200):
+            _, rewards, dones = batch_board.step(_random_actions(rng, NUM_ENVS))
+            assert set(rewards.tolist()) <= expected_rewards
+            assert np.all(rewards[dones] == batch_board.REWARD_GAME_OVER)
+            assert np.all(batch_board.steps[dones] == 0)
+            assert np.all(batch_board.lengths >= 1)
+            num_done += np.count_nonzero(dones)
+        assert 0 < num_done
+
+    def test_same_seed_same_games(self):
+        rng = np.random.default_rng(3)
+        actions = [_random_actions(rng, NUM_ENVS) for _ in range(50)]
+        boards = [BatchBoard(num_envs=NUM_ENVS, seed=7) for _ in range(2)]
+        for action in actions:
+            results = [board.step(action) for board in boards]
+            for expected, actual in zip(results[0], results[1]):
+                assert np.array_equal(expected, actual)
+
+    def test_step_limits_truncate(self):
+        batch_board = BatchBoard(num_envs=NUM_ENVS, seed=5, max_steps=5)
+        rng = np.random.default_rng(4)
+        num_truncated = 0
+        for _ in range(30):
+            _, rewards, dones = batch_board.step(_random_actions(rng, NUM_ENVS))
+            truncated = batch_board.truncated
+            assert np.all(dones[truncated])
+            assert np.all(batch_board.final_steps[truncated] == 5)
+            assert np.all(rewards[dones & ~truncated] == batch_board.REWARD_GAME_OVER)
+            assert np.all(batch_board.steps < 5)
+            num_truncated += np.count_nonzero(truncated)
+        assert 0 < num_truncated
+
+    def test_final_states_are_the_boards_before_reset(self):
+        """
+        A finished game is reset inside step(): final_states holds its last state,
+        as the same move on a single Board without step limits sees it
+        """
+        batch_board = BatchBoard(num_envs=NUM_ENVS, board_size=10, seed=6, max_steps=3)
+        rng = np.random.default_rng(6)
+        num_checked = 0
+        for _ in range(30):
+            boards = []
+            for i in range(NUM_ENVS):
+                board = Board(board_size=10, seed=0)
+                board.snake = batch_board.snake(i)
+                board.green_apples = batch_board.apples(i, GREEN_APPLE)
+                board.red_apples = batch_board.apples(i, RED_APPLE)
+                board.update_board()
+                boards.append(board)
+
+            actions = _random_actions(rng, NUM_ENVS)
+            states, rewards, dones = batch_board.step(actions)
+            for i in np.flatnonzero(batch_board.truncated):
+                if rewards[i] != batch_board.REWARD_JUST_MOVE:
+                    continue  # an eaten apple respawns at a random cell
+                expected, _, _ = boards[i].step(MoveTo.from_id(actions[i]))
+                assert np.array_equal(batch_board.final_states[i], expected[0])
+                assert not np.array_equal(states[i], expected[0])
+                num_checked += 1
+        assert 0 < num_checked
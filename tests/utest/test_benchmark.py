@@ -0,0 +1,32 @@
+from srcs import benchmark
+
+import json
+import pytest
+
+
+class TestBenchmark:
+    @pytest.mark.parametrize("board_size", [2, 4, 10])
+    def test_hamiltonian_cycle(self, board_size):
+        cycle = benchmark.hamiltonian_cycle(board_size)
+        assert len(set(cycle)) == len(cycle) == board_size * board_size
+        for current, following in zip(cycle, cycle[1:] + cycle[:1]):
+            assert abs(current[0] - following[0]) + abs(current[1] - following[1]) == 1
+
+    def test_hamiltonian_cycle_needs_even_board(self):
+        with pytest.raises(ValueError):
+            benchmark.hamiltonian_cycle(5)
+
+    def test_cycle_walker_never_ends(self):
+        walker = benchmark.CycleWalker(board_size=4, snake_len=15)
+        for _ in range(100):
+            _, _, done = walker.step()
+            assert not done
+        assert len(walker.board.snake) == 15
+
+    def test_run_is_machine_readable(self):
+        report = benchmark.run(board_sizes=[4], min_time=0.001, repeat=2, pattern="board")
+        ids = [result["id"] for result in report["results"]]
+        assert "board_reset[board_size=4]" in ids
+        assert "board_step[board_size=4,snake_len=8]" in ids
+        assert all(0 < result["median"] for result in report["results"])
+        assert json.loads(json.dumps(report)) == report
@@ -0,0 +1,129 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.checkpoint import save_checkpoint, load_checkpoint
+from srcs.modules.environment import Board, MoveTo
+from srcs.modules.metrics import MetricsSink
+from srcs.modules.replay_buffer import ReplayBuffer
+from srcs import snake
+
+import numpy as np
+import os
+import pytest
+import torch
+
+
+def _train(agent: QLearningAgent, env: Board, buffer: ReplayBuffer, steps: int):
+    """
+    Play and learn, return the actions taken
+    """
+    taken = []
+    state = env.reset()
+    for _ in range(steps):
+        action = agent.get_action(state)
+        next_state, reward, done = env.step(MoveTo.from_id(action))
+        buffer.add(state, action, reward, next_state, done)
+        agent.update_batch(*buffer.sample(8))
+        taken.append(action)
+        state = env.reset() if done else next_state
+    return taken
+
+
+def _make(seed):
+    return (
+        QLearningAgent(seed=seed, target_update=5),
+        Board(seed=seed),
+        ReplayBuffer(capacity=64, seed=seed),
+    )
+
+
+class TestCheckpoint:
+    def test_resume_is_exact(self, tmp_path):
+        path = str(tmp_path / "model.pt")
+        agent, env, buffer = _make(seed=0)
+        _train(agent, env, buffer, steps=100)
+        save_checkpoint(path, agent, {"session": 3}, env=env, buffer=buffer)
+        expected_actions = _train(agent, env, buffer, steps=100)
+
+        resumed_agent, resumed_env, resumed_buffer = _make(seed=1)
+        counters = load_checkpoint(path, resumed_agent, env=resumed_env, buffer=resumed_buffer)
+        actual_actions = _train(resumed_agent, resumed_env, resumed_buffer, steps=100)
+
+        assert counters == {"session": 3}
+        assert actual_actions == expected_actions
+        assert resumed_agent.epsilon == agent.epsilon
+        assert resumed_agent.num_updates == agent.num_updates
+        for expected, actual in zip(agent.qnet.parameters(), resumed_agent.qnet.parameters()):
+            assert torch.equal(expected, actual)
+        assert np.array_equal(resumed_buffer.states, buffer.states)
+
+    def test_save_is_atomic(self, tmp_path):
+        path = str(tmp_path / "sub" / "model.pt")
+        agent = QLearningAgent(seed=0)
+        save_checkpoint(path, agent, {"session": 1})
+        save_checkpoint(path, agent, {"session": 2})
+        assert os.listdir(tmp_path / "sub") == ["model.pt"]
+        assert load_checkpoint(path, QLearningAgent(seed=1)) == {"session": 2}
+
+    def test_load_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_checkpoint(str(tmp_path / "nothing.pt"), QLearningAgent(seed=0))
+
+    def test_buffer_too_small(self, tmp_path):
+        path = str(tmp_path / "model.pt")
+        agent, env, buffer = _make(seed=0)
+        _train(agent, env, buffer, steps=50)
+        save_checkpoint(path, agent, {}, buffer=buffer)
+        with pytest.raises(ValueError):
+            load_checkpoint(path, QLearningAgent(seed=0), buffer=ReplayBuffer(capacity=10))
+
+
+class TestTrainResume:
+    @pytest.fixture(autouse=True)
+    def no_plot(self, monkeypatch):
+        monkeypatch.setattr(snake, "plot_history", lambda metrics_sink: None)
+
+    def _train(self, **options):
+        snake.train("off", random_state=0, board_options={"board_size": 6}, **options)
+
+    def test_resume_keeps_best_and_metrics(self, tmp_path):
+        path = str(tmp_path / "model.pt")
+        self._train(sessions=6, save=path, save_interval=3)
+        first = load_checkpoint(path, QLearningAgent(seed=0))
+        assert first["session"] == 6
+        assert first["max_snapshot"] is not None
+        assert len(first["max_snapshot"].snake) == first["max_len"]
+
+        self._train(sessions=10, save=path, load=path, save_interval=3)
+        metrics = MetricsSink()
+        resumed = load_checkpoint(path, QLearningAgent(seed=0), metrics=metrics)
+        assert resumed["session"] == 10
+        assert first["max_len"] <= resumed["max_len"]
+        assert metrics.stats["length"].count == 10
+        assert metrics.history.points[0][0] == 1
+
+    @pytest.mark.parametrize("train, options", [
+        (snake.train_vectorized, {"envs": 4}),
+        (snake.train_parallel, {"workers": 1}), ])
+    def test_multi_env_resume_keeps_metrics(self, tmp_path, train, options):
+        path = str(tmp_path / "model.pt")
+        board_options = {"board_size": 6}
+        train("off", sessions=6, save=path, save_interval=3, random_state=0,
+              board_options=board_options, **options)
+        first = load_checkpoint(path, QLearningAgent(seed=0))
+        assert first["session"] == 6
+        assert 0 < first["max_len"]
+
+        train("off", sessions=10, save=path, load=path, save_interval=3, random_state=0,
+              board_options=board_options, **options)
+        metrics = MetricsSink()
+        resumed = load_checkpoint(path, QLearningAgent(seed=0), metrics=metrics)
+        assert resumed["session"] == 10
+        assert first["max_len"] <= resumed["max_len"]
+        assert metrics.stats["length"].count == 10
+        assert metrics.history.points[0][0] == 1
+
+    def test_finished_checkpoint_is_still_saved(self, tmp_path):
+        path = str(tmp_path / "model.pt")
+        resumed_path = str(tmp_path / "resumed.pt")
+        self._train(sessions=4, save=path)
+        self._train(sessions=3, save=resumed_path, load=path)
+        assert load_checkpoint(resumed_path, QLearningAgent(seed=0))["session"] == 4
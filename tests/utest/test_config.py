@@ -0,0 +1,117 @@
+from srcs.modules.config import (
+    AgentConfig, BoardConfig, RunConfig, TrainConfig, apply_overrides, load_config
+)
+from srcs.modules.environment import Board, MAX_BOARD_SIZE
+from srcs.modules.agent import QLearningAgent
+
+import pytest
+
+
+class TestRunConfig:
+    def test_defaults_match_the_classes(self):
+        config = RunConfig()
+        board = Board(**config.board_options())
+        assert board.board_size == 10
+        assert board.NUM_OF_GREEN_APPLES == 2
+        assert board.NUM_OF_RED_APPLES == 1
+        assert board.max_steps is None
+        assert board.max_steps_without_eating == 200
+
+        agent = QLearningAgent(**config.agent_options())
+        assert agent.qnet.hidden_sizes == (100, 16)
+        assert config.train.sessions == 10000
+
+    def test_max_board_size_builds(self):
+        config = RunConfig().override("board.board_size", MAX_BOARD_SIZE)
+        board = Board(**config.board_options())
+        assert board.reset().shape == (1, 16)
+
+    def test_load_toml(self, tmp_path):
+        path = tmp_path / "run.toml"
+        path.write_text(
+            "[board]\n"
+            "board_size = 20\n"
+            "num_red_apples = 0\n"
+            "reward_just_move = -0.5\n"
+            "max_steps_without_eating = 0\n"
+            "[agent]\n"
+            "hidden_sizes = [64, 32, 8]\n"
+            "double_dqn = true\n"
+            "[train]\n"
+            "sessions = 123\n"
+        )
+        config = load_config(str(path))
+        assert config.board.board_size == 20
+        assert config.board.num_red_apples == 0
+        assert config.board.reward_just_move == -0.5
+        assert config.board_options()["max_steps_without_eating"] is None
+        assert config.agent_options()["hidden_sizes"] == (64, 32, 8)
+        assert config.agent.double_dqn is True
+        assert config.train.sessions == 123
+        assert config.train.seed == 42
+
+    def test_overrides(self, tmp_path):
+        path = tmp_path / "run.toml"
+        path.write_text("[board]\nboard_size = 20\n")
+        config = load_config(str(path), overrides=[
+            "board.board_size=8", "agent.hidden_sizes=[32, 8]", "train.replay=yes",
+            "agent.lr = 0.001",
+        ])
+        assert config.board.board_size == 8
+        assert config.agent.hidden_sizes == [32, 8]
+        assert config.train.replay is True
+        assert config.agent.lr == 0.001
+
+        config = apply_overrides(config, ["board.board_size=12"])
+        assert config.board.board_size == 12
+
+    def test_override_returns_a_copy(self):
+        config = RunConfig()
+        changed = config.override("train.sessions", 5)
+        assert changed.train.sessions == 5
+        assert config.train.sessions == 10000
+
+    @pytest.mark.parametrize("text", [
+        "[board]\nsize = 10\n",
+        "[boards]\nboard_size = 10\n",
+        "board = 10\n",
+        "[board]\nboard_size = 1\n",
+        "[board]\nboard_size = 1001\n",
+        "[board]\nboard_size = 10.5\n",
+        "[board]\nnum_green_apples = -1\n",
+        "[board]\nboard_size = 2\n",
+        "[agent]\ngamma = 2.0\n",
+        "[agent]\nlr = 0\n",
+        "[agent]\nepsilon = 0.01\nepsilon_min = 0.1\n",
+        "[agent]\nhidden_sizes = []\n",
+        "[agent]\ndouble_dqn = \"maybe\"\n",
+        "[train]\nsessions = 0\n",
+        "[train]\nworkers = true\n",
+        "[board\n", ])
+    def test_invalid_files(self, tmp_path, text):
+        path = tmp_path / "run.toml"
+        path.write_text(text)
+        with pytest.raises(ValueError):
+            load_config(str(path))
+
+    @pytest.mark.parametrize("override", [
+        "board.board_size",
+        "board_size=10",
+        "game.board_size=10",
+        "board.board_size=big",
+        "train.envs=0", ])
+    def test_invalid_overrides(self, override):
+        with pytest.raises(ValueError):
+            load_config(overrides=[override])
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_config(str(tmp_path / "missing.toml"))
+
+    def test_sections_validate_directly(self):
+        with pytest.raises(ValueError):
+            BoardConfig(board_size=0)
+        with pytest.raises(ValueError):
+            AgentConfig(tau=-1)
+        with pytest.raises(ValueError):
+            TrainConfig(batch_size=5000)
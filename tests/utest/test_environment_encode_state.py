@@ -0,0 +1,109 @@
+from srcs.modules.environment import Board, BoardElements, MoveTo, ray_cells
+
+import numpy as np
+import pytest
+import random
+from collections import deque
+
+
+def _encode_state_by_walking(board: Board):
+    """
+    Reference encoder: walk every ray from the head cell by cell
+    """
+    state = np.zeros((4, 4), dtype=np.float32)
+    if len(board.snake) == 0:
+        return state.flatten()[np.newaxis, :]
+
+    features = {
+        BoardElements.SNAKE_BODY.code: 1,
+        BoardElements.GREEN_APPLE.code: 2,
+        BoardElements.RED_APPLE.code: 3,
+    }
+    head_y, head_x = board.snake[0]
+    for to in MoveTo:
+        dy, dx = to.direction
+        y, x = head_y, head_x
+        distance = 0
+        while True:
+            y += dy
+            x += dx
+            distance += 1
+            if not (0 <= y < board.board_size and 0 <= x < board.board_size):
+                state[to.id, 0] = distance
+                break
+            code = board.board[y, x]
+            if code in features:
+                state[to.id, features[code]] = distance
+                break
+    return state.flatten()[np.newaxis, :]
+
+
+class TestEnvironmentEncodeState:
+    def test_known_state(self):
+        """
+          0123456789 x
+        0 __________
+        1 __________
+        2 __________
+        3 __________
+        4 _____R____
+        5 ___SS>____
+        6 ____GG____
+        7 __________
+        8 __________
+        9 __________
+        y
+        """
+        board = Board(board_size=10)
+        board.snake = deque([(5, 5), (5, 4), (5, 3)])
+        board.green_apples = [(6, 4), (6, 5)]
+        board.red_apples = [(4, 5)]
+
+        state = board._encode_state()
+        expected = np.array([
+            [0, 0, 0, 1],  # UP   : red apple
+            [0, 0, 1, 0],  # DOWN : green apple
+            [0, 1, 0, 0],  # LEFT : body
+            [5, 0, 0, 0],  # RIGHT: wall
+        ], dtype=np.float32).reshape(1, 16)
+        assert state.shape == (1, 16)
+        assert state.dtype == np.float32
+        assert np.array_equal(state, expected)
+
+    def test_empty_snake(self):
+        board = Board(board_size=10)
+        board.snake = deque()
+        assert np.array_equal(board._encode_state(), np.zeros((1, 16), dtype=np.float32))
+
+    @pytest.mark.parametrize("board_size", [5, 10, 20])
+    def test_matches_walking_encoder(self, board_size):
+        rng = random.Random(board_size)
+        board = Board(board_size=board_size, seed=board_size)
+        actions = list(MoveTo)
+        state = board._encode_state()
+        for _ in range(1000):
+            assert np.array_equal(state, _encode_state_by_walking(board))
+            state, _, done = board.step(action=rng.choice(actions))
+            if done:
+                state = board.reset()
+
+    @pytest.mark.parametrize("board_size", [2, 3, 7])
+    def test_ray_cells_match_walking(self, board_size):
+        num_cells = board_size * board_size
+        heads = np.arange(num_cells)
+        rays = ray_cells(board_size, *np.divmod(heads, board_size))
+        assert rays.shape == (num_cells, 4, board_size)
+        for head in heads:
+            y, x = divmod(int(head), board_size)
+            for to in MoveTo:
+                dy, dx = to.direction
+                expected = []
+                for distance in range(1, board_size + 1):
+                    ny, nx = y + dy * distance, x + dx * distance
+                    inside = 0 <= ny < board_size and 0 <= nx < board_size
+                    expected.append(ny * board_size + nx if inside else num_cells)
+                assert rays[head, to.id].tolist() == expected
+
+    def test_ray_cells_of_one_head(self):
+        assert ray_cells(3, 1, 1).shape == (4, 3)
+        assert np.array_equal(ray_cells(3, 1, 1), ray_cells(3, np.array([1]), np.array([1]))[0])
@@ -0,0 +1,74 @@
+from srcs.modules.environment import Board, BoardElements, MoveTo
+
+import numpy as np
+import pytest
+import random
+from collections import deque
+
+
+def _rebuilt_board(board: Board) -> np.ndarray:
+    expected = Board(board_size=board.board_size)
+    expected.snake = board.snake.copy()
+    expected.green_apples = board.green_apples
+    expected.red_apples = board.red_apples
+    return expected.board
+
+
+class TestEnvironmentIncrementalUpdate:
+    @pytest.mark.parametrize("board_size", [5, 10, 20])
+    def test_random_play_matches_full_rebuild(self, board_size):
+        """
+        debug mode raises if an incremental step differs from update_board()
+        """
+        rng = random.Random(board_size)
+        board = Board(board_size=board_size, debug=True, seed=board_size)
+        actions = list(MoveTo)
+        for _ in range(2000):
+            _, _, done = board.step(action=rng.choice(actions))
+            if done:
+                board.reset()
+
+    def test_eat_green_apple_patches_cells(self):
+        board = Board(board_size=10)
+        board.snake = deque([(5, 5), (5, 4), (5, 3)])
+        board.green_apples = [(6, 4), (6, 5)]
+        board.red_apples = [(4, 5)]
+
+        board.step(action=MoveTo.DOWN)
+        assert board.board[6, 5] == BoardElements.SNAKE_HEAD.code
+        assert board.board[5, 5] == BoardElements.SNAKE_BODY.code
+        assert board.board[5, 3] == BoardElements.SNAKE_BODY.code
+        assert np.array_equal(board.board, _rebuilt_board(board))
+
+    def test_snake_vanishes_on_red_apple(self):
+        board = Board(board_size=10)
+        board.snake = deque([(5, 5)])
+        board.green_apples = [(0, 0), (0, 1)]
+        board.red_apples = [(5, 6)]
+
+        _, reward, done = board.step(action=MoveTo.RIGHT)
+        assert done
+        assert reward == board.REWARD_GAME_OVER
+        assert np.count_nonzero(board.board == BoardElements.SNAKE_HEAD.code) == 0
+        assert np.count_nonzero(board.board == BoardElements.SNAKE_BODY.code) == 0
+        assert np.array_equal(board.board, _rebuilt_board(board))
+
+    def test_assignment_resyncs_board(self):
+        board = Board(board_size=10)
+        board.red_apples = [(9, 9)]
+        assert board.board[9, 9] == BoardElements.RED_APPLE.code
+        assert np.count_nonzero(board.board == BoardElements.RED_APPLE.code) == 1
+
+    def test_put_apple_on_last_free_cell(self):
+        board = Board(board_size=3)
+        board.green_apples = []
+        board.red_apples = []
+        board.snake = deque([(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0), (2, 0), (2, 1)])
+        assert board._free_cells == [8]
+
+        board._put_apple(apple=BoardElements.GREEN_APPLE)
+        assert board.green_apples == [(2, 2)]
+        assert board._free_cells == []
+
+        with pytest.raises(ValueError):
+            board._put_apple(apple=BoardElements.RED_APPLE)
@@ -0,0 +1,92 @@
+from srcs.modules.agent import QLearningAgent, QNet
+from srcs.modules.batch_environment import BatchBoard
+from srcs.modules.environment import Board, MoveTo, MAX_BOARD_SIZE
+
+import numpy as np
+import pytest
+from collections import deque
+
+
+class TestEnvironmentOptions:
+    @pytest.mark.parametrize("board_size, num_green_apples, num_red_apples", [
+        (5, 1, 0),
+        (7, 4, 2),
+        (20, 2, 1),
+        (3, 3, 3), ])
+    def test_apple_counts(self, board_size, num_green_apples, num_red_apples):
+        board = Board(board_size=board_size, seed=0, num_green_apples=num_green_apples,
+                      num_red_apples=num_red_apples)
+        assert len(board.green_apples) == num_green_apples
+        assert len(board.red_apples) == num_red_apples
+        assert board.reset().shape == (1, 16)
+        assert len(board.green_apples) == num_green_apples
+        assert len(board.red_apples) == num_red_apples
+
+    def test_rewards(self):
+        board = Board(board_size=10, seed=0, reward_just_move=-0.5, reward_eat_green_apple=7,
+                      reward_game_over=-3)
+        board.snake = deque([(5, 5), (5, 6), (5, 7)])
+        board.green_apples = [(5, 3), (0, 1)]
+        board.red_apples = [(9, 9)]
+
+        assert board.step(MoveTo.LEFT)[1] == -0.5
+        assert board.step(MoveTo.LEFT)[1] == 7
+        _, reward, done = board.step(MoveTo.RIGHT)
+        assert reward == -3
+        assert done
+
+    @pytest.mark.parametrize("options", [
+        {"board_size": 1},
+        {"board_size": MAX_BOARD_SIZE + 1},
+        {"num_green_apples": -1},
+        {"num_red_apples": -1},
+        {"board_size": 2, "num_green_apples": 1, "num_red_apples": 1},
+        {"max_steps": 0},
+        {"max_steps_without_eating": -5}, ])
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            Board(**options)
+        with pytest.raises(ValueError):
+            BatchBoard(num_envs=2, **options)
+
+    def test_max_board_size(self):
+        board = Board(board_size=MAX_BOARD_SIZE, seed=0)
+        state, _, _ = board.step(MoveTo.UP)
+        assert state.shape == (1, 16)
+        env = BatchBoard(num_envs=2, board_size=MAX_BOARD_SIZE, seed=0)
+        env.reset()
+        states, _, _ = env.step(np.zeros(2, dtype=np.int64))
+        assert states.shape == (2, 16)
+
+    def test_batch_board_options(self):
+        env = BatchBoard(num_envs=4, board_size=6, seed=0, num_green_apples=3, num_red_apples=0,
+                         reward_just_move=-2)
+        env.reset()
+        _, rewards, dones = env.step(np.zeros(4, dtype=np.int64))
+        assert rewards.shape == (4,)
+        assert set(rewards[~dones]) <= {-2, env.REWARD_EAT_GREEN_APPLE}
+
+
+class TestAgentOptions:
+    def test_hidden_sizes(self):
+        agent = QLearningAgent(seed=0, hidden_sizes=(32, 16, 8))
+        assert [name for name, _ in agent.qnet.named_children()] == ["l1", "l2", "l3", "l4"]
+        assert agent.qnet.l4.out_features == 4
+        loss = agent.update(np.zeros((1, 16), dtype=np.float32), 0, 1.0,
+                            np.zeros((1, 16), dtype=np.float32), False)
+        assert np.isfinite(loss)
+
+    def test_default_state_dict_keys(self):
+        keys = list(QNet(16).state_dict())
+        assert keys == ["l1.weight", "l1.bias", "l2.weight", "l2.bias", "l3.weight", "l3.bias"]
+
+    @pytest.mark.parametrize("options", [
+        {"gamma": 1.5},
+        {"lr": 0},
+        {"epsilon": 0.01, "epsilon_min": 0.1},
+        {"epsilon_decay": 0},
+        {"hidden_sizes": ()},
+        {"hidden_sizes": (16, 0)}, ])
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            QLearningAgent(**options)
@@ -0,0 +1,87 @@
+from srcs.modules.environment import Board, MoveTo
+
+import numpy as np
+import pickle
+import pytest
+import random
+
+
+def _play(board: Board, actions: list):
+    results = []
+    for action in actions:
+        state, reward, done = board.step(action)
+        results.append((state.copy(), reward, done))
+        if done:
+            break
+    return results
+
+
+def _random_actions(seed: int, num: int) -> list:
+    rng = random.Random(seed)
+    return [rng.choice(list(MoveTo)) for _ in range(num)]
+
+
+def _assert_same_game(expected: Board, actual: Board):
+    assert np.array_equal(expected.board, actual.board)
+    assert expected.snake == actual.snake
+    assert expected.green_apples == actual.green_apples
+    assert expected.red_apples == actual.red_apples
+    assert expected.done == actual.done
+
+
+class TestEnvironmentSnapshot:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_restore_continues_the_game(self, seed):
+        board = Board(seed=seed, debug=True)
+        _play(board, _random_actions(seed, 5))
+        snapshot = board.snapshot()
+
+        actions = _random_actions(seed + 100, 50)
+        expected = _play(board, actions)
+
+        restored = Board(seed=seed + 1, debug=True)
+        restored.restore(snapshot)
+        actual = _play(restored, actions)
+
+        assert len(actual) == len(expected)
+        for (e_state, e_reward, e_done), (a_state, a_reward, a_done) in zip(expected, actual):
+            assert np.array_equal(e_state, a_state)
+            assert (e_reward, e_done) == (a_reward, a_done)
+        _assert_same_game(board, restored)
+
+    def test_snapshot_is_a_copy(self):
+        board = Board(seed=0)
+        snapshot = board.snapshot()
+        cells = snapshot.cells.copy()
+        _play(board, _random_actions(0, 10))
+        assert np.array_equal(snapshot.cells, cells)
+
+    def test_replay_reproduces_the_episode(self):
+        board = Board(seed=3, record_actions=True)
+        board.reset()
+        _play(board, _random_actions(3, 200))
+        snapshot = board.snapshot()
+        assert len(snapshot.actions) == board.steps
+
+        replayed = Board(seed=4)
+        results = list(replayed.replay(snapshot))
+        assert len(results) == len(snapshot.actions)
+        _assert_same_game(board, replayed)
+
+    def test_replay_needs_recorded_actions(self):
+        board = Board(seed=0)
+        with pytest.raises(ValueError):
+            list(board.replay(board.snapshot()))
+
+    def test_pickle(self):
+        board = Board(seed=5, record_actions=True)
+        _play(board, _random_actions(5, 20))
+        snapshot = pickle.loads(pickle.dumps(board.snapshot()))
+
+        replayed = Board(seed=6)
+        list(replayed.replay(snapshot))
+        _assert_same_game(board, replayed)
+
+    def test_board_size_mismatch(self):
+        with pytest.raises(ValueError):
+            Board(board_size=5).restore(Board(board_size=10).snapshot())
@@ -0,0 +1,65 @@
+from srcs.modules.environment import Board, MoveTo
+
+import pytest
+from collections import deque
+
+
+def _straight_board(**limits) -> Board:
+    """
+    Snake heading left with room for 5 moves, apples out of the way
+    """
+    board = Board(board_size=10, seed=0, **limits)
+    board.snake = deque([(5, 5), (5, 6), (5, 7)])
+    board.green_apples = [(0, 0), (0, 1)]
+    board.red_apples = [(9, 9)]
+    return board
+
+
+class TestEnvironmentTruncation:
+    def test_no_limit_by_default(self):
+        board = _straight_board()
+        for _ in range(5):
+            _, _, done = board.step(MoveTo.LEFT)
+            assert not done
+        assert board.steps == 5
+
+    def test_max_steps(self):
+        board = _straight_board(max_steps=3)
+        dones = [board.step(MoveTo.LEFT)[2] for _ in range(3)]
+        assert dones == [False, False, True]
+        assert board.truncated
+        assert not board.terminated
+
+    def test_max_steps_without_eating(self):
+        board = _straight_board(max_steps_without_eating=2)
+        board.green_apples = [(5, 4), (0, 1)]
+
+        _, reward, done = board.step(MoveTo.LEFT)
+        assert reward == board.REWARD_EAT_GREEN_APPLE
+        assert board.steps_without_eating == 0
+        assert not done
+
+        dones = [board.step(MoveTo.UP)[2] for _ in range(2)]
+        assert dones == [False, True]
+        assert board.truncated
+
+    def test_death_is_not_truncation(self):
+        board = _straight_board(max_steps=1)
+        _, reward, done = board.step(MoveTo.RIGHT)  # into its own body
+        assert done
+        assert reward == board.REWARD_GAME_OVER
+        assert board.terminated
+        assert not board.truncated
+
+    def test_reset_clears_counters(self):
+        board = _straight_board(max_steps=1)
+        board.step(MoveTo.LEFT)
+        board.reset()
+        assert not board.done
+        assert not board.truncated
+        assert board.steps == board.steps_without_eating == 0
+
+    @pytest.mark.parametrize("limits", [{"max_steps": 0}, {"max_steps_without_eating": -1}])
+    def test_invalid_limits(self, limits):
+        with pytest.raises(ValueError):
+            Board(**limits)
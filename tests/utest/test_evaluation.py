@@ -0,0 +1,53 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.checkpoint import save_checkpoint
+from srcs.modules.evaluation import evaluate, evaluate_checkpoint, PERCENTILES
+
+import numpy as np
+import pytest
+
+
+class TestEvaluation:
+    def test_report(self):
+        agent = QLearningAgent(seed=0)
+        report = evaluate(agent.qnet, episodes=20, board_size=5, seed=0)
+        summary = report.summary()
+
+        assert summary["episodes"] == 20
+        assert len(report.lengths) == len(report.rewards) == len(report.steps) == 20
+        assert np.all(report.steps <= 10 * 5 * 5)
+        for name in ["length", "reward", "steps"]:
+            stats = summary[name]
+            values = [stats[f"p{p}"] for p in PERCENTILES]
+            assert stats["min"] <= values[0]
+            assert values == sorted(values)
+            assert values[-1] <= stats["max"]
+
+    def test_is_deterministic(self):
+        agent = QLearningAgent(seed=0)
+        first = evaluate(agent.qnet, episodes=10, board_size=5, seed=3)
+        second = evaluate(agent.qnet, episodes=10, board_size=5, seed=3)
+        assert np.array_equal(first.lengths, second.lengths)
+        assert np.array_equal(first.rewards, second.rewards)
+
+    def test_does_not_touch_the_agent(self):
+        agent = QLearningAgent(seed=0)
+        epsilon = agent.epsilon
+        evaluate(agent.qnet, episodes=5, board_size=5, seed=0)
+        assert agent.epsilon == epsilon
+        assert all(p.grad is None for p in agent.qnet.parameters())
+
+    def test_truncates_endless_episodes(self):
+        agent = QLearningAgent(seed=0)
+        report = evaluate(agent.qnet, episodes=5, board_size=5, max_steps=1, seed=0)
+        assert np.all(report.steps == 1)
+
+    def test_process_pool(self, tmp_path):
+        path = str(tmp_path / "model.pt")
+        save_checkpoint(path, QLearningAgent(seed=0), {"session": 0})
+
+        report = evaluate_checkpoint(path, episodes=9, workers=2, board_size=5, seed=0)
+        assert report.summary()["episodes"] == 9
+
+    def test_invalid_episodes(self):
+        with pytest.raises(ValueError):
+            evaluate(QLearningAgent(seed=0).qnet, episodes=0)
@@ -0,0 +1,72 @@
+from srcs.modules.gym_env import SnakeEnv, make_vector_env
+
+import numpy as np
+import pytest
+from gymnasium.utils.env_checker import check_env
+
+
+def _rollout(env: SnakeEnv, seed: int, actions: list):
+    observation, _ = env.reset(seed=seed)
+    observations = [observation]
+    for action in actions:
+        observation, _, terminated, truncated, _ = env.step(action)
+        observations.append(observation)
+        if terminated or truncated:
+            break
+    return observations
+
+
+class TestSnakeEnv:
+    def test_passes_gymnasium_checks(self):
+        check_env(SnakeEnv(), skip_render_check=True)
+
+    def test_spaces(self):
+        env = SnakeEnv(board_size=8)
+        observation, info = env.reset(seed=0)
+        assert env.observation_space.contains(observation)
+        assert env.action_space.n == 4
+        assert info["length"] == 3
+
+    def test_seed_reproduces_the_game(self):
+        actions = list(np.random.default_rng(0).integers(0, 4, size=50))
+        first = _rollout(SnakeEnv(), 7, actions)
+        second = _rollout(SnakeEnv(), 7, actions)
+        assert len(first) == len(second)
+        assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+    def test_truncation(self):
+        env = SnakeEnv(max_steps=1)
+        env.reset(seed=0)
+        for action in range(4):
+            env.reset(seed=0)
+            _, reward, terminated, truncated, _ = env.step(action)
+            if not terminated:
+                assert truncated
+                return
+        pytest.fail("every action ended the game")
+
+    def test_ansi_render(self):
+        env = SnakeEnv(render_mode="ansi")
+        env.reset(seed=0)
+        assert "Current Board State" in env.render()
+
+
+class TestVectorEnv:
+    @pytest.mark.parametrize("asynchronous", [False, True])
+    def test_step_shapes(self, asynchronous):
+        envs = make_vector_env(3, asynchronous=asynchronous, board_size=6)
+        try:
+            observations, _ = envs.reset(seed=0)
+            assert observations.shape == (3, 16)
+            for _ in range(20):
+                observations, rewards, terminated, truncated, _ = envs.step(
+                    envs.action_space.sample()
+                )
+            assert observations.shape == (3, 16)
+            assert rewards.shape == terminated.shape == truncated.shape == (3,)
+        finally:
+            envs.close()
+
+    def test_invalid_num_envs(self):
+        with pytest.raises(ValueError):
+            make_vector_env(0)
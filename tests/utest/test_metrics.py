@@ -0,0 +1,77 @@
+from srcs.modules.metrics import RunningStats, MovingAverage, Decimator, MetricsSink
+
+import csv
+import json
+import numpy as np
+import pytest
+
+
+class TestRunningStats:
+    def test_matches_numpy(self):
+        values = np.random.default_rng(0).normal(3.0, 2.0, size=1000)
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+        assert stats.count == 1000
+        assert stats.mean == pytest.approx(values.mean())
+        assert stats.std == pytest.approx(values.std())
+        assert stats.min == values.min()
+        assert stats.max == values.max()
+
+
+class TestMovingAverage:
+    @pytest.mark.parametrize("window", [1, 7, 100])
+    def test_matches_window_mean(self, window):
+        values = np.random.default_rng(window).integers(0, 50, size=300)
+        average = MovingAverage(window)
+        for i, value in enumerate(values):
+            mean = average.add(value)
+            recent = values[max(0, i + 1 - window):i + 1]
+            assert mean == pytest.approx(recent.mean())
+            assert average.count == len(recent)
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            MovingAverage(0)
+
+
+class TestDecimator:
+    def test_bounded_and_evenly_spaced(self):
+        decimator = Decimator(max_points=16)
+        for i in range(1000):
+            decimator.add(i)
+        assert len(decimator.points) < 16
+        steps = np.diff(decimator.points)
+        assert np.all(steps == decimator.stride)
+        assert decimator.points[0] == 0
+
+
+class TestMetricsSink:
+    @pytest.mark.parametrize("extension", [".csv", ".jsonl"])
+    def test_streams_and_appends(self, tmp_path, extension):
+        path = str(tmp_path / f"metrics{extension}")
+        for start in [0, 3]:
+            with MetricsSink(path, window=2) as sink:
+                for session in range(start + 1, start + 4):
+                    sink.record(session, loss=0.5, reward=-1.0, length=session, steps=10)
+
+        with open(path) as f:
+            if extension == ".csv":
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f]
+        assert [int(row["session"]) for row in rows] == [1, 2, 3, 4, 5, 6]
+        assert float(rows[1]["ave_len"]) == 1.5
+
+    def test_in_memory(self):
+        sink = MetricsSink(window=10, max_points=8)
+        for session in range(1, 101):
+            sink.record(session, loss=0.0, reward=session, length=3, steps=1)
+        assert sink.stats["reward"].mean == pytest.approx(50.5)
+        columns = sink.columns()
+        assert len(columns["session"]) < 8
+        assert columns["session"][0] == 1
+
+    def test_invalid_extension(self, tmp_path):
+        with pytest.raises(ValueError):
+            MetricsSink(str(tmp_path / "metrics.txt"))
@@ -0,0 +1,68 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.batch_environment import BatchBoard
+from srcs.modules.environment import Board, MoveTo
+from srcs.modules.profiler import PhaseTimer
+
+import json
+import numpy as np
+
+
+class TestPhaseTimer:
+    def test_disabled_records_nothing(self):
+        timer = PhaseTimer(enabled=False)
+        with timer.phase("env_step"):
+            pass
+        assert timer.totals == {}
+        assert timer.summary()["phases"] == {}
+
+    def test_accumulates_phases(self):
+        timer = PhaseTimer()
+        for _ in range(3):
+            with timer.phase("env_step"):
+                pass
+        with timer.phase("forward"):
+            pass
+
+        phases = timer.summary()["phases"]
+        assert phases["env_step"]["count"] == 3
+        assert phases["forward"]["count"] == 1
+        assert 0.0 <= phases["env_step"]["total"]
+        assert "env_step" in timer.format_summary()
+
+    def test_chrome_trace(self, tmp_path):
+        path = tmp_path / "trace.json"
+        timer = PhaseTimer(trace=True, max_events=2)
+        for _ in range(3):
+            with timer.phase("encode_state"):
+                pass
+        timer.write_trace(str(path))
+
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        assert len(events) == 2
+        assert timer.counts["encode_state"] == 3
+        assert all(event["ph"] == "X" and event["name"] == "encode_state" for event in events)
+        assert all(0 <= event["dur"] for event in events)
+
+    def test_board_and_agent_phases(self):
+        timer = PhaseTimer()
+        board = Board(seed=0)
+        agent = QLearningAgent(seed=0)
+        board.timer = agent.timer = timer
+
+        state = board.reset()
+        action = agent.get_action(state)
+        next_state, reward, done = board.step(MoveTo.from_id(action))
+        agent.update(state, action, reward, next_state, done)
+
+        expected = {"env_step", "encode_state", "action_selection", "forward", "backward",
+                    "optimizer"}
+        assert set(timer.totals) == expected
+        assert all(count == 1 for count in timer.counts.values())
+
+    def test_batch_board_phases(self):
+        timer = PhaseTimer()
+        board = BatchBoard(num_envs=4, seed=0)
+        board.timer = timer
+        board.step(np.zeros(4, dtype=np.int64))
+        assert set(timer.totals) == {"env_step", "encode_state"}
@@ -0,0 +1,73 @@
+from srcs.modules.replay_buffer import ReplayBuffer
+from srcs.modules.agent import QLearningAgent
+
+import numpy as np
+import pytest
+
+
+def _transition(i):
+    state = np.full((1, 16), i, dtype=np.float32)
+    next_state = np.full((1, 16), i + 1, dtype=np.float32)
+    return state, i % 4, float(i), next_state, i % 2 == 0
+
+
+class TestReplayBuffer:
+    def test_add_and_wrap_around(self):
+        buffer = ReplayBuffer(capacity=4)
+        for i in range(6):
+            buffer.add(*_transition(i))
+
+        assert len(buffer) == 4
+        assert buffer.ptr == 2
+        # slots 0 and 1 were overwritten by transitions 4 and 5
+        assert buffer.rewards.tolist() == [4.0, 5.0, 2.0, 3.0]
+        assert np.all(buffer.next_states[1] == 6)
+
+    def test_add_batch_wrap_around(self):
+        buffer = ReplayBuffer(capacity=5)
+        buffer.add(*_transition(0))
+        num = 7
+        buffer.add_batch(
+            np.arange(num, dtype=np.float32)[:, np.newaxis].repeat(16, axis=1),
+            np.arange(num) % 4,
+            np.arange(num, dtype=np.float32),
+            np.zeros((num, 16), dtype=np.float32),
+            np.zeros(num, dtype=bool),
+        )
+        assert len(buffer) == 5
+        assert buffer.ptr == 3
+        assert sorted(buffer.rewards.tolist()) == [2.0, 3.0, 4.0, 5.0, 6.0]
+
+    def test_sample_shapes(self):
+        buffer = ReplayBuffer(capacity=100, seed=0)
+        for i in range(10):
+            buffer.add(*_transition(i))
+
+        states, actions, rewards, next_states, dones = buffer.sample(32)
+        assert states.shape == (32, 16) and states.dtype == np.float32
+        assert actions.shape == (32,) and actions.dtype == np.int64
+        assert rewards.shape == (32,)
+        assert next_states.shape == (32, 16)
+        assert dones.shape == (32,) and dones.dtype == bool
+        # every sample comes from a stored transition
+        assert np.all(next_states[:, 0] == states[:, 0] + 1)
+        assert np.all(rewards < 10)
+
+    def test_sample_from_empty_buffer(self):
+        with pytest.raises(ValueError):
+            ReplayBuffer(capacity=10).sample(1)
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            ReplayBuffer(capacity=0)
+
+    def test_agent_update_with_minibatch(self):
+        buffer = ReplayBuffer(capacity=100, seed=0)
+        for i in range(50):
+            buffer.add(*_transition(i))
+
+        agent = QLearningAgent(seed=0)
+        loss, td_errors = agent.update_batch(*buffer.sample(16))
+        assert isinstance(loss, float)
+        assert np.isfinite(loss)
+        assert td_errors.shape == (16,)
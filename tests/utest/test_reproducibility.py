@@ -0,0 +1,51 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.environment import Board, MoveTo
+
+import numpy as np
+import torch
+
+
+def _play(board: Board, actions: list):
+    trajectory = [board.board.copy()]
+    for action in actions:
+        _, _, done = board.step(action=action)
+        trajectory.append(board.board.copy())
+        if done:
+            board.reset()
+    return trajectory
+
+
+class TestReproducibility:
+    def test_same_seed_same_board(self):
+        actions = [MoveTo.from_id(i) for i in np.random.default_rng(0).integers(0, 4, 500)]
+        expected = _play(Board(seed=42), actions)
+        actual = _play(Board(seed=42), actions)
+        assert all(np.array_equal(e, a) for e, a in zip(expected, actual))
+
+    def test_reset_with_seed(self):
+        board = Board(seed=1)
+        board.reset(seed=7)
+        other = Board(seed=2)
+        other.reset(seed=7)
+        assert board.snake == other.snake
+        assert board.green_apples == other.green_apples
+        assert board.red_apples == other.red_apples
+
+    def test_same_seed_same_agent(self):
+        state = np.zeros((1, 16), dtype=np.float32)
+        agents = [QLearningAgent(seed=42) for _ in range(2)]
+        for expected, actual in zip(agents[0].qnet.parameters(), agents[1].qnet.parameters()):
+            assert torch.equal(expected, actual)
+
+        agents[0].epsilon = agents[1].epsilon = 1.0
+        agents[0].epsilon_decay = agents[1].epsilon_decay = 1.0
+        expected = [agents[0].get_action(state) for _ in range(100)]
+        actual = [agents[1].get_action(state) for _ in range(100)]
+        assert expected == actual
+
+    def test_agent_does_not_touch_global_rng(self):
+        torch.manual_seed(0)
+        expected = torch.rand(1)
+        torch.manual_seed(0)
+        QLearningAgent(seed=1)
+        assert torch.equal(torch.rand(1), expected)
@@ -0,0 +1,154 @@
+from srcs.modules.config import RunConfig, load_config
+from srcs.modules.sweep import (
+    MedianStopper, flatten_space, grid, make_configs, random_search, run_sweep, format_table,
+    write_table
+)
+
+import csv
+import json
+import math
+import pytest
+
+
+def _base(sessions=6) -> RunConfig:
+    return load_config(overrides=[f"train.sessions={sessions}", "board.board_size=5",
+                                  "agent.hidden_sizes=[8]"])
+
+
+class TestSearchSpace:
+    def test_grid(self):
+        space = flatten_space({"agent": {"lr": [0.1, 0.01], "hidden_sizes": [[8], [16, 8]]},
+                               "board": {"board_size": [5, 6, 7]}})
+        trials = grid(space)
+        assert len(trials) == 12
+        assert trials[0] == {"agent.lr": 0.1, "agent.hidden_sizes": [8], "board.board_size": 5}
+        assert len({json.dumps(t) for t in trials}) == 12
+
+    def test_random_search(self):
+        space = flatten_space({"agent": {"lr": {"low": 1e-4, "high": 1e-1, "log": True},
+                                         "gamma": {"low": 0.8, "high": 0.99},
+                                         "target_update": {"low": 0, "high": 10},
+                                         "double_dqn": [True, False]}})
+        trials = random_search(space, 50, seed=0)
+        assert trials == random_search(space, 50, seed=0)
+        for trial in trials:
+            assert 1e-4 <= trial["agent.lr"] <= 1e-1
+            assert 0.8 <= trial["agent.gamma"] <= 0.99
+            assert isinstance(trial["agent.target_update"], int)
+            assert 0 <= trial["agent.target_update"] <= 10
+            assert trial["agent.double_dqn"] in (True, False)
+        make_configs(RunConfig(), trials)
+
+    @pytest.mark.parametrize("data", [
+        {"agent": 0.1},
+        {"agent": {"lr": []}},
+        {"agent": {"lr": 0.1}},
+        {"agent": {"lr": {"low": 0.1}}},
+        {"agent": {"lr": {"low": 0.1, "high": 0.01}}},
+        {"agent": {"lr": {"low": 0.0, "high": 0.1, "log": True}}},
+        {"agent": {"lr": {"low": 0.0, "high": 0.1, "step": 0.01}}}, ])
+    def test_invalid_space(self, data):
+        with pytest.raises(ValueError):
+            flatten_space(data)
+
+    def test_grid_needs_choices(self):
+        with pytest.raises(ValueError):
+            grid(flatten_space({"agent": {"lr": {"low": 0.001, "high": 0.1}}}))
+
+    def test_trials_are_validated_up_front(self):
+        with pytest.raises(ValueError):
+            make_configs(RunConfig(), [{"agent.lr": 0.01}, {"agent.gamma": 3.0}])
+        with pytest.raises(ValueError):
+            make_configs(RunConfig(), [{"agent.learning_rate": 0.01}])
+
+
+class TestMedianStopper:
+    def test_below_median_stops(self):
+        stopper = MedianStopper({}, interval=10, min_trials=2)
+        assert not stopper.should_stop(0, 10, 5.0)
+        assert not stopper.should_stop(1, 10, 4.0)
+        assert not stopper.should_stop(2, 10, 6.0)
+        assert stopper.should_stop(3, 10, 4.4)
+        assert not stopper.should_stop(3, 15, 1.0)  # between reports
+
+    def test_warmup(self):
+        stopper = MedianStopper({}, interval=10, warmup=20, min_trials=1)
+        stopper.should_stop(0, 10, 5.0)
+        assert not stopper.should_stop(1, 10, 1.0)
+        stopper.should_stop(0, 20, 5.0)
+        assert stopper.should_stop(1, 20, 1.0)
+
+
+class TestRunSweep:
+    def test_in_process(self, tmp_path):
+        trials = grid(flatten_space({"agent": {"lr": [0.01, 0.001]}}))
+        seen = []
+        results = run_sweep(_base(), trials, window=3, on_result=seen.append)
+        assert [r.trial_id for r in results] == [0, 1]
+        assert len(seen) == 2
+        for result in results:
+            assert result.status == "complete"
+            assert result.sessions == 6
+            assert 0 < result.ave_len <= result.max_len
+
+        table = format_table(results)
+        assert "agent.lr" in table.splitlines()[0]
+        assert len(table.splitlines()) == 3
+
+        path = tmp_path / "sweep.csv"
+        write_table(results, str(path))
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert [row["agent.lr"] for row in rows] == ["0.01", "0.001"]
+
+        path = tmp_path / "sweep.jsonl"
+        write_table(results, str(path))
+        assert json.loads(path.read_text().splitlines()[1])["agent.lr"] == 0.001
+
+    def test_same_seed_same_result(self):
+        trials = [{"agent.lr": 0.01}, {"agent.lr": 0.01}]
+        first, second = run_sweep(_base(), trials)
+        assert first.ave_len == second.ave_len
+        assert first.max_len == second.max_len
+
+    def test_cpu_budget(self):
+        results = run_sweep(_base(sessions=100_000), [{}], cpu_budget=0.05)
+        assert results[0].status == "budget"
+        assert results[0].sessions < 100_000
+
+    def test_pruning(self):
+        trials = [{"agent.lr": 0.01}] * 3 + [{"agent.epsilon": 1.0, "agent.epsilon_decay": 1.0}]
+        results = run_sweep(_base(sessions=40), trials, prune_interval=10, window=10)
+        statuses = [result.status for result in results]
+        assert statuses.count("complete") >= 1
+        assert set(statuses) <= {"complete", "pruned"}
+
+    def test_process_pool(self):
+        trials = grid(flatten_space({"agent": {"lr": [0.01, 0.001]}}))
+        parallel = run_sweep(_base(), trials, workers=2, prune_interval=3)
+        serial = run_sweep(_base(), trials)
+        assert [r.trial_id for r in parallel] == [0, 1]
+        for p, s in zip(parallel, serial):
+            assert p.status in ("complete", "pruned")
+            if p.status == "complete":
+                assert p.ave_len == s.ave_len
+
+    def test_board_that_cannot_be_set_up_fails_up_front(self):
+        # a 2x2 board has no room for the snake and 2 green and 1 red apple
+        with pytest.raises(ValueError):
+            run_sweep(_base(), [{"agent.lr": 0.01}, {"board.board_size": 2}])
+
+    def test_invalid_output(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_table([], str(tmp_path / "sweep.txt"))
+
+    def test_failed_trial_is_reported(self, monkeypatch):
+        from srcs.modules import sweep
+
+        def broken(*args):
+            raise RuntimeError("boom")
+        monkeypatch.setattr(sweep, "run_trial", broken)
+        results = run_sweep(_base(), [{}])
+        assert results[0].status == "failed"
+        assert "boom" in results[0].error
+        assert math.isnan(results[0].ave_len)
@@ -0,0 +1,207 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.batch_environment import BatchBoard
+from srcs.modules.checkpoint import load_checkpoint, save_checkpoint
+from srcs.modules.config import load_config
+from srcs.modules.environment import Board, MoveTo
+from srcs.modules.tabular_agent import (
+    DenseQTable, DictQTable, TabularQAgent, make_agent, num_state_keys, pack_states,
+    unpack_keys, warm_start
+)
+from srcs import snake
+
+import numpy as np
+import pytest
+import random
+
+
+def _random_states(board_size: int, num_steps: int, seed=0) -> np.ndarray:
+    rng = random.Random(seed)
+    board = Board(board_size=board_size, seed=seed)
+    states = [board.reset()]
+    for _ in range(num_steps):
+        state, _, done = board.step(rng.choice(list(MoveTo)))
+        states.append(state)
+        if done:
+            states.append(board.reset())
+    return np.concatenate(states)
+
+
+class TestStateKeys:
+    @pytest.mark.parametrize("board_size", [3, 5, 10, 20])
+    def test_round_trip(self, board_size):
+        states = _random_states(board_size, 500)
+        keys = pack_states(states, board_size)
+        assert keys.dtype == np.int64
+        assert ((0 <= keys) & (keys < num_state_keys(board_size))).all()
+        assert np.array_equal(unpack_keys(keys, board_size), states)
+
+    def test_distinct_states_distinct_keys(self):
+        states = _random_states(6, 2000)
+        keys = pack_states(states, 6)
+        assert len(np.unique(states, axis=0)) == len(np.unique(keys))
+
+    def test_empty_snake(self):
+        keys = pack_states(np.zeros((1, 16), dtype=np.float32), 10)
+        assert keys[0] == 0
+        assert not unpack_keys(keys, 10).any()
+
+    def test_batch_board_states(self):
+        states = BatchBoard(num_envs=8, board_size=7, seed=0).reset()
+        assert np.array_equal(unpack_keys(pack_states(states, 7), 7), states)
+
+    def test_wrong_board_size(self):
+        states = _random_states(10, 100)
+        with pytest.raises(ValueError):
+            pack_states(states, 3)
+
+
+class TestTabularQAgent:
+    def test_table_kinds(self):
+        assert isinstance(TabularQAgent(board_size=10).table, DenseQTable)
+        assert isinstance(TabularQAgent(board_size=20).table, DictQTable)
+        assert isinstance(TabularQAgent(board_size=5, table="dict").table, DictQTable)
+        with pytest.raises(ValueError):
+            TabularQAgent(table="tree")
+
+    @pytest.mark.parametrize("options", [
+        {"gamma": -0.1},
+        {"lr": 0.0},
+        {"lr": 1.5},
+        {"epsilon": 0.01, "epsilon_min": 0.1},
+        {"epsilon_decay": 0.0}, ])
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            TabularQAgent(**options)
+
+    def test_update_rule(self):
+        agent = TabularQAgent(board_size=10, lr=0.5, gamma=0.9)
+        states = _random_states(10, 2)
+        state, next_state = states[:1], states[1:2]
+
+        loss = agent.update(state, 2, 10.0, next_state, False)
+        assert loss == pytest.approx(100.0)
+        assert agent.q_values(state)[2] == pytest.approx(5.0)
+
+        agent.update(next_state, 1, 4.0, state, False)
+        assert agent.q_values(next_state)[1] == pytest.approx(0.5 * (4.0 + 0.9 * 5.0))
+
+        # no bootstrap from a terminal transition
+        agent.update(state, 0, -1.0, next_state, True)
+        assert agent.q_values(state)[0] == pytest.approx(-0.5)
+        assert len(agent.table) == 2
+
+    def test_greedy_action(self):
+        agent = TabularQAgent(board_size=10, seed=0, epsilon=0.0, epsilon_min=0.0)
+        state = _random_states(10, 0)
+        agent.update(state, 3, 1.0, state, True)
+        assert all(agent.get_action(state) == 3 for _ in range(10))
+        assert (agent.get_actions(np.repeat(state, 5, axis=0)) == 3).all()
+
+    def test_dense_and_dict_agree(self):
+        agents = [TabularQAgent(board_size=6, seed=0, table=table) for table in ("dense", "dict")]
+        board = Board(board_size=6, seed=0)
+        state = board.reset()
+        for _ in range(2000):
+            actions = [agent.get_action(state) for agent in agents]
+            assert actions[0] == actions[1]
+            next_state, reward, done = board.step(MoveTo.from_id(actions[0]))
+            for agent in agents:
+                agent.update(state, actions[0], reward, next_state, board.terminated)
+            state = board.reset() if done else next_state
+
+        dense, sparse = (agent.table for agent in agents)
+        assert np.array_equal(np.sort(dense.keys()), np.sort(sparse.keys()))
+        assert np.allclose(dense.get(dense.keys()), sparse.get(dense.keys()))
+
+    def test_batch_update_with_repeats(self):
+        agent = TabularQAgent(board_size=10, lr=0.5)
+        states = np.repeat(_random_states(10, 0), 3, axis=0)
+        loss, td_errors = agent.update_batch(states, [1, 1, 2], [2.0, 2.0, 4.0], states,
+                                             [True, True, True])
+        assert td_errors.shape == (3,)
+        assert loss == pytest.approx((4 + 4 + 16) / 3)
+        assert agent.q_values(states[:1])[1] == pytest.approx(2.0)
+        assert agent.q_values(states[:1])[2] == pytest.approx(2.0)
+
+    @pytest.mark.parametrize("table", ["dense", "dict"])
+    def test_checkpoint(self, tmp_path, table):
+        agent = TabularQAgent(board_size=6, seed=0, table=table)
+        states = _random_states(6, 50)
+        agent.update_batch(states[:-1], np.arange(len(states) - 1) % 4,
+                           np.ones(len(states) - 1), states[1:], np.zeros(len(states) - 1))
+        path = str(tmp_path / "table.pt")
+        save_checkpoint(path, agent, {"session": 1})
+
+        restored = TabularQAgent(board_size=6, table=table)
+        assert load_checkpoint(path, restored) == {"session": 1}
+        assert np.array_equal(np.sort(restored.table.keys()), np.sort(agent.table.keys()))
+        assert np.array_equal(restored.table.get(agent.table.keys()),
+                              agent.table.get(agent.table.keys()))
+        assert restored.epsilon == agent.epsilon
+
+        with pytest.raises(ValueError):
+            load_checkpoint(path, TabularQAgent(board_size=7))
+
+
+class TestWarmStart:
+    def test_fits_the_table(self):
+        table_agent = TabularQAgent(board_size=6, seed=0)
+        states = _random_states(6, 300)
+        rng = np.random.default_rng(0)
+        table_agent.update_batch(states[:-1], rng.integers(0, 4, len(states) - 1),
+                                 rng.normal(size=len(states) - 1), states[1:],
+                                 np.ones(len(states) - 1))
+
+        agent = QLearningAgent(seed=0, target_update=10)
+        first = warm_start(agent, table_agent, epochs=1)
+        last = warm_start(agent, table_agent, epochs=30)
+        assert last < first
+        keys = table_agent.table.keys()
+        state = unpack_keys(keys[:1], 6)
+        assert np.allclose(agent.q_values(state), table_agent.q_values(state), atol=0.5)
+        assert agent.target_qnet.state_dict()["l1.weight"].equal(agent.qnet.l1.weight)
+
+    def test_empty_table(self):
+        with pytest.raises(ValueError):
+            warm_start(QLearningAgent(seed=0), TabularQAgent(board_size=5))
+
+
+class TestMakeAgent:
+    def test_kinds(self):
+        assert isinstance(make_agent("dqn", seed=0, hidden_sizes=(8,)), QLearningAgent)
+        assert isinstance(make_agent("tabular", seed=0, board_size=5), TabularQAgent)
+        with pytest.raises(ValueError):
+            make_agent("policy_gradient")
+
+    def test_from_config(self):
+        config = load_config(overrides=["agent.kind=tabular", "board.board_size=7",
+                                        "agent.lr=0.2"])
+        agent = make_agent(config.agent.kind, seed=0, **config.agent_options())
+        assert isinstance(agent, TabularQAgent)
+        assert agent.board_size == 7
+        assert agent.lr == 0.2
+        with pytest.raises(ValueError):
+            load_config(overrides=["agent.kind=table"])
+
+
+class TestVisualTraining:
+    @pytest.mark.parametrize("kind", ["dqn", "tabular"])
+    def test_q_values_are_drawn(self, kind, monkeypatch, capsys):
+        monkeypatch.setattr(snake, "plot_history", lambda metrics_sink: None)
+        config = load_config(overrides=[f"agent.kind={kind}", "board.board_size=6"])
+        snake.train("on", sessions=2, random_state=0, board_options=config.board_options(),
+                    agent_options=config.agent_options(), agent_kind=kind)
+        output = capsys.readouterr().out
+        assert "Q-Values for each direction:" in output
+        for to in MoveTo:
+            assert f" {to.name}: " in output
+
+    @pytest.mark.parametrize("agent", [QLearningAgent(seed=0), TabularQAgent(board_size=6)])
+    def test_draw_with_q_values(self, agent, capsys):
+        board = Board(board_size=6, seed=0)
+        qs = agent.q_values(board.reset())
+        assert qs.shape == (agent.action_size,)
+        board.draw_with_q_values(qs)
+        output = capsys.readouterr().out
+        for to, q in zip(MoveTo, qs):
+            assert f" {to.name}: {q:.3f}" in output
@@ -0,0 +1,69 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.batch_environment import BatchBoard
+from srcs.modules.environment import Board
+from srcs.modules.replay_buffer import ReplayBuffer
+from srcs.modules.tabular_agent import TabularQAgent
+from srcs.modules.training import play_episodes
+from srcs import snake
+
+import itertools
+import numpy as np
+import pytest
+
+
+class TestPlayEpisodes:
+    @pytest.mark.parametrize("replay", [False, True])
+    def test_yields_finished_games(self, replay):
+        env = Board(board_size=6, seed=0, max_steps_without_eating=30)
+        agent = QLearningAgent(seed=0)
+        buffer = ReplayBuffer(capacity=256, seed=0) if replay else None
+        for snake_len, total_reward, itr, loss, state in itertools.islice(
+                play_episodes(env, agent, buffer, batch_size=8), 5):
+            assert env.done
+            assert snake_len == len(env.snake)
+            assert 0 < itr
+            assert np.isfinite(loss)
+            assert state.shape == (1, 16)
+        assert 0 < agent.num_updates
+        if replay:
+            assert 0 < len(buffer)
+
+    def test_same_seed_same_games(self):
+        def games():
+            env = Board(board_size=6, seed=1, max_steps_without_eating=30)
+            episodes = play_episodes(env, TabularQAgent(board_size=6, seed=1))
+            return [episode[:3] for episode in itertools.islice(episodes, 10)]
+        assert games() == games()
+
+
+class TestTrainVectorized:
+    def test_truncated_games_bootstrap_from_their_last_state(self, monkeypatch):
+        steps = []
+        stored = []
+
+        class RecordingBoard(BatchBoard):
+            def step(self, actions):
+                states, rewards, dones = super().step(actions)
+                steps.append((states.copy(), dones.copy(), self.truncated.copy(),
+                              self.final_states.copy()))
+                return states, rewards, dones
+
+        class RecordingBuffer(ReplayBuffer):
+            def add_batch(self, states, actions, rewards, next_states, dones):
+                stored.append((next_states.copy(), dones.copy()))
+                super().add_batch(states, actions, rewards, next_states, dones)
+
+        monkeypatch.setattr(snake, "BatchBoard", RecordingBoard)
+        monkeypatch.setattr(snake, "ReplayBuffer", RecordingBuffer)
+        monkeypatch.setattr(snake, "plot_history", lambda metrics_sink: None)
+        snake.train_vectorized("off", envs=4, sessions=20, random_state=0, batch_size=8,
+                               board_options={"board_size": 6, "max_steps": 3})
+
+        num_truncated = 0
+        for (states, dones, truncated, final_states), (next_states, stored_dones) in zip(
+                steps, stored):
+            assert np.array_equal(next_states[truncated], final_states[truncated])
+            assert np.array_equal(next_states[~dones], states[~dones])
+            assert not np.any(stored_dones[truncated])
+            num_truncated += np.count_nonzero(truncated)
+        assert 0 < num_truncated
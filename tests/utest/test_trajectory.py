@@ -0,0 +1,112 @@
+from srcs.modules.agent import QLearningAgent
+from srcs.modules.environment import Board, MoveTo
+from srcs.modules.evaluation import evaluate
+from srcs.modules.trajectory import TrajectoryReader, TrajectoryWriter
+
+import numpy as np
+import pytest
+import random
+
+
+def _record_games(path: str, num_episodes: int, **board_options):
+    """
+    Play random games and return (snake, total reward, steps) of each
+    """
+    rng = random.Random(0)
+    board = Board(seed=0, record_actions=True, **board_options)
+    games = []
+    with TrajectoryWriter(path, board) as writer:
+        for _ in range(num_episodes):
+            board.reset()
+            total_reward = 0
+            done = False
+            while not done:
+                _, reward, done = board.step(rng.choice(list(MoveTo)))
+                total_reward += reward
+            writer.write(board)
+            games.append((list(board.snake), total_reward, board.steps))
+    return games
+
+
+class TestTrajectory:
+    def test_replay_is_deterministic(self, tmp_path):
+        path = str(tmp_path / "games.traj")
+        games = _record_games(path, num_episodes=20, max_steps_without_eating=30)
+
+        reader = TrajectoryReader(path)
+        assert reader.board_size == 10
+        assert reader.max_steps is None
+        assert reader.max_steps_without_eating == 30
+
+        episodes = list(reader)
+        assert len(episodes) == len(games)
+        board = reader.make_board()
+        for episode, (snake, total_reward, steps) in zip(episodes, games):
+            transitions = list(reader.replay(episode, board))
+            assert len(transitions) == len(episode) == steps
+            assert sum(t[2] for t in transitions) == total_reward
+            assert transitions[-1][4]
+            assert list(board.snake) == snake
+
+    def test_board_options_round_trip(self, tmp_path):
+        path = str(tmp_path / "games.traj")
+        games = _record_games(path, num_episodes=10, board_size=7, num_green_apples=4,
+                              num_red_apples=0, reward_just_move=-0.1,
+                              reward_eat_green_apple=10)
+
+        reader = TrajectoryReader(path)
+        board = reader.make_board()
+        assert board.board_size == 7
+        assert board.NUM_OF_GREEN_APPLES == 4
+        assert board.NUM_OF_RED_APPLES == 0
+        assert board.REWARD_JUST_MOVE == -0.1
+        assert board.REWARD_EAT_GREEN_APPLE == 10
+        for episode, (snake, total_reward, _) in zip(reader, games):
+            transitions = list(reader.replay(episode, board))
+            assert sum(t[2] for t in transitions) == pytest.approx(total_reward)
+            assert list(board.snake) == snake
+
+    def test_one_byte_per_action(self, tmp_path):
+        path = tmp_path / "games.traj"
+        games = _record_games(str(path), num_episodes=5)
+        num_actions = sum(steps for _, _, steps in games)
+        assert path.stat().st_size == 56 + 5 * 41 + num_actions
+
+    def test_more_apples_than_uint16(self, tmp_path):
+        path = str(tmp_path / "games.traj")
+        board = Board(board_size=300, num_green_apples=70_000, num_red_apples=1, seed=0)
+        TrajectoryWriter(path, board).close()
+        assert TrajectoryReader(path).board_options["num_green_apples"] == 70_000
+
+    def test_evaluation_records(self, tmp_path):
+        path = str(tmp_path / "eval.traj")
+        report = evaluate(QLearningAgent(seed=0).qnet, episodes=6, board_size=6, seed=0,
+                          record=path)
+
+        reader = TrajectoryReader(path)
+        lengths = []
+        for episode in reader:
+            board = reader.make_board()
+            list(reader.replay(episode, board))
+            lengths.append(len(board.snake))
+        assert np.array_equal(lengths, report.lengths)
+
+    def test_invalid_files(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            TrajectoryReader(str(tmp_path / "missing.traj"))
+
+        path = tmp_path / "bad.traj"
+        path.write_bytes(b"NOPE" + bytes(12))
+        with pytest.raises(ValueError):
+            TrajectoryReader(str(path))
+
+        path = tmp_path / "cut.traj"
+        _record_games(str(path), num_episodes=2)
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ValueError):
+            list(TrajectoryReader(str(path)))
+
+    def test_board_must_record(self, tmp_path):
+        with TrajectoryWriter(str(tmp_path / "games.traj"), Board()) as writer:
+            with pytest.raises(ValueError):
+                writer.write(Board())